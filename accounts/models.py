@@ -1,6 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
-from boards.models import Board
+from boards.models import Board, BoardMembership
+from core.counters import CounterFieldsMixin
 from django.contrib.auth.base_user import BaseUserManager
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
@@ -46,7 +47,7 @@ def avatar_upload_path(instance, filename):
     new_filename = f"user_{instance.user.id}_{random_suffix}{ext}"
     return f"avatar/{month}/{new_filename}"
 
-class CustomUser(AbstractUser):
+class CustomUser(CounterFieldsMixin, AbstractUser):
     username = models.CharField(
         max_length=150, 
         unique=True,
@@ -106,18 +107,32 @@ class CustomUser(AbstractUser):
         verbose_name=_('Last name'),
         help_text=_('User\'s last name')
     )
+    # Denormalized counters, kept current by boards.signals (see boards.counters)
+    boards_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name=_('Boards count'),
+        help_text=_('Number of boards owned by the user')
+    )
+    memberships_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name=_('Memberships count'),
+        help_text=_('Number of accepted board memberships of the user')
+    )
     REQUIRED_FIELDS = ['username']
     USERNAME_FIELD = 'email'
+    counter_fields = ('boards_count', 'memberships_count')
 
     objects = CustomUserManager()
 
     def get_boards_count(self):
         """Number of boards owned by the user"""
-        return self.owned_boards.count()
+        return self.boards_count
     
     def get_memberships_count(self):
         """Number of board memberships of the user"""
-        return self.memberships.filter(status='accepted').count()
+        return self.memberships_count
     
     def generate_verification_token(self):
         """Generate a new email verification token"""
@@ -157,12 +172,14 @@ class CustomUser(AbstractUser):
 
     @property
     def all_boards(self):
-        owned = self.owned_boards.all()
-        member = Board.objects.filter(
-            memberships__user=self,
-            memberships__status='accepted'
-        )
-        return (owned | member).distinct()
+        """
+        Boards the user owns or is an accepted member of.
+        Filters on `id IN (owned ids UNION membership board ids)`: both halves
+        are index lookups and there is no join to de-duplicate with DISTINCT.
+        """
+        owned = Board.objects.filter(owner=self).values('pk')
+        joined = BoardMembership.objects.filter(user=self, status='accepted').values('board_id')
+        return Board.objects.filter(pk__in=owned.union(joined))
     def __str__(self):
         return self.username
 
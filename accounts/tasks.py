@@ -7,6 +7,8 @@ from django.conf import settings
 from django.core.files.base import ContentFile
 from PIL import Image
 import io
+import time
+from core.metrics import AVATAR_THUMBNAIL_SECONDS, EMAIL_SEND_SECONDS
 
 
 
@@ -23,6 +25,7 @@ def create_avatar_thumbnail(profile_id):
         if not profile.avatar:
             return _("No avatar found for profile {}").format(profile_id)
             
+        started = time.perf_counter()
         # Open the image
         image = Image.open(profile.avatar)
         
@@ -57,6 +60,7 @@ def create_avatar_thumbnail(profile_id):
         
         # Save the thumbnail alongside the original avatar
         default_storage.save(thumbnail_path, ContentFile(thumb_io.getvalue()))
+        AVATAR_THUMBNAIL_SECONDS.observe(time.perf_counter() - started)
         
         return _("Thumbnail created successfully for profile {}").format(profile_id)
         
@@ -86,14 +90,15 @@ def send_password_reset_email(self, user_id, reset_link):
         plain_message = render_to_string('emails/password_reset.txt', context)
         html_message = render_to_string('emails/password_reset.html', context)
 
-        send_mail(
-            subject=subject,
-            message=plain_message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
-            html_message=html_message,
-            fail_silently=False,
-        )
+        with EMAIL_SEND_SECONDS.time(task=self.name):
+            send_mail(
+                subject=subject,
+                message=plain_message,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                recipient_list=[user.email],
+                html_message=html_message,
+                fail_silently=False,
+            )
         return _("Password reset email sent to %(email)s") % {'email': user.email}
     except CustomUser.DoesNotExist:
         return _("User not found for password reset")
@@ -121,14 +126,15 @@ def send_email_verification(self, user_id, verification_link):
         plain_message = render_to_string('emails/email_verification.txt', context)
         html_message = render_to_string('emails/email_verification.html', context)
 
-        send_mail(
-            subject=subject,
-            message=plain_message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
-            html_message=html_message,
-            fail_silently=False,
-        )
+        with EMAIL_SEND_SECONDS.time(task=self.name):
+            send_mail(
+                subject=subject,
+                message=plain_message,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                recipient_list=[user.email],
+                html_message=html_message,
+                fail_silently=False,
+            )
         return _("Email verification sent to %(email)s") % {'email': user.email}
     except CustomUser.DoesNotExist:
         return _("User not found for email verification")
@@ -180,6 +180,40 @@ class AuthenticationFlowTests(APITestCase):
         
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         
+    def test_change_password_by_user_id_only_for_self(self):
+        """users/{id}/password/ changes the password of the user it names, if that is the caller"""
+        user = User.objects.create_user(
+            email='byid@example.com',
+            username='byiduser',
+            password='OldPass123!',
+            is_active=True
+        )
+        other = User.objects.create_user(
+            email='other@example.com',
+            username='otheruser',
+            password='OtherPass123!',
+            is_active=True
+        )
+
+        self.client.force_authenticate(user=user)
+
+        data = {
+            'old_password': 'OldPass123!',
+            'new_password1': 'NewPass123!',
+            'new_password2': 'NewPass123!'
+        }
+
+        response = self.client.post(f'/api/v1/users/{other.id}/password/', data)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        response = self.client.post(f'/api/v1/users/{user.id}/password/', data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        user.refresh_from_db()
+        other.refresh_from_db()
+        self.assertTrue(user.check_password('NewPass123!'))
+        self.assertTrue(other.check_password('OtherPass123!'))
+        
     def test_profile_update_with_duplicate_username_fails(self):
         """Profile update: duplicate username should error and nothing should be saved"""
         # Create two users
@@ -184,7 +184,13 @@ class ChangePasswordView(APIView):
         request_body=ChangePasswordSerializer, 
         responses={200: _('Password changed'), 400: _('Validation Error')}
     )
-    def post(self, request):
+    def post(self, request, pk=None):
+        # Users can only change their own password
+        if pk is not None and get_object_or_404(CustomUser, pk=pk) != request.user:
+            return Response(
+                {"detail": _("You do not have permission to update this user.")},
+                status=status.HTTP_403_FORBIDDEN
+            )
         serializer = ChangePasswordSerializer(
             data=request.data, 
             context={'request': request}
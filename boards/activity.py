@@ -0,0 +1,120 @@
+"""
+Board activity log writer.
+
+Views call `record_activity()` instead of creating `BoardActivity` rows
+inline, so logging does not add an INSERT per action to the request:
+- An entry is kept only once the surrounding transaction commits, so an action
+  that is rolled back is never logged.
+- Within a request (see `core.middleware.ActivityBufferMiddleware`) committed
+  entries are collected and written with one `bulk_create` when the view
+  returns; outside of a request each commit writes its own entries.
+- With `BOARD_ACTIVITY_ASYNC` the entries are handed to the
+  `write_board_activities` Celery task in batches of `BOARD_ACTIVITY_BATCH_SIZE`.
+- Entries are written after the action committed, so a failed write (or a
+  broker that is down) is logged and the entries are lost, but the response
+  of the action is not affected.
+"""
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+_request_buffer = ContextVar('board_activity_buffer', default=None)
+
+
+def record_activity(board, action, user=None, description=''):
+    """Log `action` on `board` once the current transaction commits"""
+    entry = {
+        'board_id': getattr(board, 'pk', board),
+        'action': action,
+        'user_id': getattr(user, 'pk', user),
+        # Render lazy translations in the language of the request
+        'description': str(description),
+        'created_at': timezone.now(),
+    }
+    buffer = _request_buffer.get()
+    if buffer is not None:
+        transaction.on_commit(lambda: buffer.add(entry))
+    else:
+        transaction.on_commit(lambda: flush_activities([entry]))
+
+
+class ActivityBuffer:
+    """Committed entries of one request, written together when it ends"""
+
+    def __init__(self):
+        self.entries = []
+        self.closed = False
+
+    def add(self, entry):
+        if self.closed:
+            # Committed after the block ended (e.g. by an outer transaction)
+            flush_activities([entry])
+        else:
+            self.entries.append(entry)
+
+    def close(self):
+        self.closed = True
+        if self.entries:
+            flush_activities(self.entries)
+
+
+@contextmanager
+def buffered_activities():
+    """Collect the activities committed inside the block and write them at its end"""
+    buffer = ActivityBuffer()
+    token = _request_buffer.set(buffer)
+    try:
+        yield buffer
+    finally:
+        _request_buffer.reset(token)
+        buffer.close()
+
+
+def flush_activities(entries):
+    """Write `entries` now, or queue them for the Celery writer; failures are logged"""
+    try:
+        if not getattr(settings, 'BOARD_ACTIVITY_ASYNC', False):
+            # In a savepoint, so a failed INSERT leaves any outer transaction usable
+            with transaction.atomic():
+                write_activities(entries)
+            return
+
+        from .tasks import write_board_activities
+
+        batch_size = getattr(settings, 'BOARD_ACTIVITY_BATCH_SIZE', 200)
+        payload = [{**entry, 'created_at': entry['created_at'].isoformat()} for entry in entries]
+        for start in range(0, len(payload), batch_size):
+            write_board_activities.delay(payload[start:start + batch_size])
+    except Exception:
+        # The action already committed: losing its log entries must not fail the response
+        logger.exception("Could not write %s board activities", len(entries))
+
+
+def write_activities(entries):
+    """Insert `entries` with a single bulk INSERT and publish them on the change feed"""
+    from .events import publish_event
+    from .models import BoardActivity
+
+    activities = BoardActivity.objects.bulk_create([
+        BoardActivity(**{
+            **entry,
+            'created_at': (parse_datetime(entry['created_at'])
+                           if isinstance(entry['created_at'], str) else entry['created_at']),
+        })
+        for entry in entries
+    ], batch_size=getattr(settings, 'BOARD_ACTIVITY_BATCH_SIZE', 200))
+
+    # bulk_create skips post_save, which publishes directly created activities
+    for activity in activities:
+        publish_event(
+            activity.board_id, 'activity', 'created', activity,
+            activity=activity.action, user=activity.user_id, description=activity.description,
+        )
+    return activities
@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class BoardsConfig(AppConfig):
@@ -7,3 +8,7 @@ class BoardsConfig(AppConfig):
     
     def ready(self):
         import boards.signals
+        from boards.counters import recount_after_migrate
+
+        # Counter columns added to existing rows start at 0; fill them in on deploy
+        post_migrate.connect(recount_after_migrate, sender=self)
@@ -0,0 +1,183 @@
+"""
+Archival of the board activity log.
+
+Activities older than `BOARD_ACTIVITY_RETENTION_DAYS` are moved out of the
+`BoardActivity` table into gzip-compressed NDJSON files on `default_storage`:
+
+    <BOARD_ACTIVITY_ARCHIVE_PATH>/board-<id>/<YYYY>-<MM>-<stamp>.ndjson.gz
+
+Each run adds one part per board and month; once a month is entirely past the
+retention cutoff its parts are compacted into a single file. Lines are sorted
+newest first like the live table, and readers drop duplicate ids, so a run
+interrupted between writing a part and deleting its rows is harmless.
+`BoardActivitiesView` pages into the archives when live rows run out.
+"""
+import gzip
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import BoardActivity
+
+ARCHIVE_SUFFIX = '.ndjson.gz'
+
+
+def archive_root():
+    return getattr(settings, 'BOARD_ACTIVITY_ARCHIVE_PATH', 'activity-archive').rstrip('/')
+
+
+def board_archive_dir(board_id):
+    return f'{archive_root()}/board-{board_id}'
+
+
+def retention_cutoff():
+    """Activities created before this moment are archived"""
+    return timezone.now() - timedelta(days=getattr(settings, 'BOARD_ACTIVITY_RETENTION_DAYS', 90))
+
+
+def next_month(month):
+    return (month.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def archived_files(board_id):
+    """`{"YYYY-MM": [file names]}` of a board, newest month first"""
+    directory = board_archive_dir(board_id)
+    if not default_storage.exists(directory):
+        return {}
+    _dirs, files = default_storage.listdir(directory)
+    months = {}
+    for name in sorted(files):
+        if name.endswith(ARCHIVE_SUFFIX):
+            months.setdefault(name[:7], []).append(name)
+    return dict(sorted(months.items(), reverse=True))
+
+
+def read_month(board_id, names):
+    """Entries of one archived month, newest first, without duplicates"""
+    entries = {}
+    for name in names:
+        with default_storage.open(f'{board_archive_dir(board_id)}/{name}', 'rb') as handle:
+            for line in gzip.decompress(handle.read()).splitlines():
+                if line:
+                    entry = json.loads(line)
+                    entries[entry['id']] = entry
+    return sorted(entries.values(), key=lambda entry: (entry['created_at'], entry['id']), reverse=True)
+
+
+def write_part(board_id, month_name, entries, stamp=None):
+    """Store `entries` as a new gzip NDJSON file of the month; returns its name"""
+    stamp = stamp or timezone.now().strftime('%Y%m%dT%H%M%S%f')
+    lines = [json.dumps(entry, ensure_ascii=False) for entry in entries]
+    payload = gzip.compress(('\n'.join(lines) + '\n').encode())
+    path = f'{board_archive_dir(board_id)}/{month_name}-{stamp}{ARCHIVE_SUFFIX}'
+    return default_storage.save(path, ContentFile(payload))
+
+
+def to_entry(activity):
+    return {
+        'id': activity.pk,
+        'board_id': activity.board_id,
+        'action': activity.action,
+        'user_id': activity.user_id,
+        'user_username': activity.user.username if activity.user else None,
+        'description': activity.description,
+        'created_at': activity.created_at.isoformat(),
+    }
+
+
+def from_entry(entry):
+    """Unsaved `BoardActivity` for an archived entry, usable by `BoardActivitySerializer`"""
+    user = None
+    if entry['user_id'] is not None:
+        user = get_user_model()(pk=entry['user_id'], username=entry['user_username'])
+    return BoardActivity(
+        pk=entry['id'], board_id=entry['board_id'], action=entry['action'], user=user,
+        description=entry['description'], created_at=parse_datetime(entry['created_at']),
+    )
+
+
+def archive_activities(cutoff=None, dry_run=False):
+    """
+    Move activities created before `cutoff` into the archives, one board and
+    month at a time. Returns `(archived rows, board-months)`.
+    """
+    cutoff = cutoff or retention_cutoff()
+    groups = list(
+        BoardActivity.objects.filter(created_at__lt=cutoff)
+        .annotate(month=TruncMonth('created_at'))
+        .order_by('board_id', 'month')
+        .values_list('board_id', 'month')
+        .distinct()
+    )
+    archived = 0
+    for board_id, month in groups:
+        rows = (BoardActivity.objects.select_related('user')
+                .filter(board_id=board_id, created_at__gte=month,
+                        created_at__lt=min(next_month(month), cutoff))
+                .order_by('-created_at', '-id'))
+        if dry_run:
+            archived += rows.count()
+            continue
+        entries = [to_entry(activity) for activity in rows.iterator(chunk_size=2000)]
+        if not entries:
+            continue
+        with transaction.atomic():
+            write_part(board_id, month.strftime('%Y-%m'), entries)
+            BoardActivity.objects.filter(pk__in=[entry['id'] for entry in entries]).delete()
+        archived += len(entries)
+        if next_month(month) <= cutoff:
+            compact_month(board_id, month.strftime('%Y-%m'))
+    return archived, len(groups)
+
+
+def compact_month(board_id, month_name):
+    """Merge the parts of a finished month into a single file"""
+    names = archived_files(board_id).get(month_name, [])
+    if len(names) < 2:
+        return
+    write_part(board_id, month_name, read_month(board_id, names))
+    # The merged file is written first: until the old parts are gone readers
+    # see every entry twice and drop the duplicates
+    for name in names:
+        default_storage.delete(f'{board_archive_dir(board_id)}/{name}')
+
+
+def delete_archives(board_id):
+    """Remove every archived activity of a board"""
+    for names in archived_files(board_id).values():
+        for name in names:
+            default_storage.delete(f'{board_archive_dir(board_id)}/{name}')
+
+
+def archived_page(board_id, before=None, limit=50, month=None):
+    """
+    Up to `limit` archived activities of a board older than the
+    `(created_at, id)` keyset position `before`, newest first. Reading starts
+    at the file of `month` ("YYYY-MM", the `archive_month` of the activity
+    at `before`), or of the month of `before` in the current time zone.
+    Each activity carries the `archive_month` it was read from.
+    """
+    if month is None and before is not None:
+        # Files are named after the month in the current time zone (TruncMonth)
+        month = timezone.localtime(before[0]).strftime('%Y-%m')
+    results = []
+    for month_name, names in archived_files(board_id).items():
+        if month is not None and month_name > month:
+            continue
+        for entry in read_month(board_id, names):
+            activity = from_entry(entry)
+            if before is not None and (activity.created_at, activity.pk) >= before:
+                continue
+            activity.archive_month = month_name
+            results.append(activity)
+            if len(results) >= limit:
+                return results
+    return results
@@ -0,0 +1,63 @@
+"""
+Bulk writes of board content (imports, duplication).
+
+Rows written with `bulk_create` skip the model signals, so the bookkeeping
+they do per row is done once per board by `bulk_written()`: counters,
+access caches, the board version and delta sync stamps, daily statistics
+and the search index.
+"""
+from django.apps import apps
+from django.contrib.auth import get_user_model
+
+from boards.changes import stamp_changes
+from boards.counters import add, recount
+from boards.models import Board, BoardMembership
+from boards.permissions import invalidate_board_access
+from boards.stats import record_task_stats
+from lists.models import List
+from tasks.models import Task, TaskComment
+
+User = get_user_model()
+
+
+def create_board(**fields):
+    """Save a new board without the default lists `boards.signals` gives it"""
+    board = Board(**fields)
+    Board.objects.bulk_create([board])
+    return board
+
+
+def bulk_written(board, user, board_created=False, member_ids=(), comments=False,
+                 created_tasks=0, completed_tasks=0):
+    """
+    Bring everything derived from the rows of `board` up to date after a bulk
+    write by `user`: `board_created` if the board itself was bulk-created,
+    `member_ids` of the memberships added, `comments` if comments were added,
+    and the number of tasks created (and completed) for the daily statistics.
+    """
+    lists = List.objects.filter(board=board)
+    recount(List, lists)
+    if comments:
+        recount(Task, Task.objects.filter(list__board=board, change_seq=0))
+    if board_created:
+        add(User, user.pk, boards_count=1)
+        invalidate_board_access(user.pk)
+    if member_ids:
+        recount(Board, Board.objects.filter(pk=board.pk))
+        recount(User, User.objects.filter(pk__in=member_ids))
+        for user_id in member_ids:
+            invalidate_board_access(user_id)
+
+    # Bulk-written rows are the only ones never stamped for delta sync, which
+    # also tells the search index which rows are new
+    if apps.is_installed('search'):
+        from search.signals import index_board
+        index_board(board.pk, new_rows_only=True)
+
+    Board.objects.filter(pk=board.pk).bump_version()
+    stamp_changes(lists.filter(change_seq=0))
+    stamp_changes(Task.objects.filter(list__board=board, change_seq=0))
+    stamp_changes(TaskComment.objects.filter(task__list__board=board, change_seq=0))
+    stamp_changes(BoardMembership.objects.filter(board=board, change_seq=0))
+
+    record_task_stats(board.pk, created=created_tasks, completed=completed_tasks)
@@ -0,0 +1,97 @@
+"""
+Delta sync of boards.
+
+Every write to a list, task, comment or membership bumps its board's
+`version` and stamps the row's `change_seq` with the new value (see
+`boards.signals`); hard deletes leave a `Tombstone` carrying the version of the
+delete. The version is bumped through the board row, which stays locked until
+the transaction commits, so sequences of a board are monotonic in commit
+order and the version doubles as the sync cursor: a client that has seen
+version N only needs rows and tombstones with `change_seq > N`.
+"""
+from django.db.models import OuterRef, Subquery
+
+from boards.models import Board, BoardMembership, Tombstone
+from lists.models import List
+from tasks.models import Task, TaskComment
+
+# Model -> (Board lookup, row field) resolving the board of a row
+BOARD_LOOKUPS = {
+    List: ('pk', 'board_id'),
+    BoardMembership: ('pk', 'board_id'),
+    Task: ('lists', 'list_id'),
+    TaskComment: ('lists__tasks', 'task_id'),
+}
+
+
+def stamp_changes(queryset):
+    """Set `change_seq` of the rows in `queryset` to their board's current version"""
+    lookup, field = BOARD_LOOKUPS[queryset.model]
+    version = Board.objects.filter(**{lookup: OuterRef(field)}).values('version')[:1]
+    return queryset.update(change_seq=Subquery(version))
+
+
+def record_change(instance):
+    """Bump the version of the row's board and stamp the row with it"""
+    lookup, field = BOARD_LOOKUPS[type(instance)]
+    Board.objects.filter(**{lookup: getattr(instance, field)}).bump_version()
+    stamp_changes(type(instance).objects.filter(pk=instance.pk))
+
+
+def record_deletion(kind, instance, board_id):
+    """Bump the board version and leave a tombstone for the deleted row"""
+    boards = Board.objects.filter(pk=board_id)
+    boards.bump_version()
+    Tombstone.objects.create(
+        board_id=board_id, kind=kind, object_id=instance.pk,
+        change_seq=Subquery(boards.values('version')[:1]),
+    )
+
+
+def record_deletions(kind, deleted):
+    """`record_deletion` of many rows at once; `deleted` holds `(object id, board id)` pairs"""
+    boards = Board.objects.filter(pk__in={board_id for _object_id, board_id in deleted})
+    boards.bump_version()
+    versions = dict(boards.values_list('pk', 'version'))
+    Tombstone.objects.bulk_create([
+        Tombstone(board_id=board_id, kind=kind, object_id=object_id, change_seq=versions[board_id])
+        for object_id, board_id in deleted
+    ])
+
+
+def delete_in_bulk(queryset):
+    """
+    Delete the rows of `queryset` without the per-row delete handlers of
+    `boards.signals` (tombstones, counters, daily stats and events); the
+    caller records those for all the rows at once.
+    """
+    queryset.handled_in_bulk = True
+    return queryset.delete()
+
+
+def deleted_in_bulk(origin):
+    """Whether a delete was started by `delete_in_bulk`"""
+    return getattr(origin, 'handled_in_bulk', False)
+
+
+def changed_since(queryset, since):
+    """Rows of `queryset` written after cursor `since` (all rows when None)"""
+    if since is None:
+        return queryset
+    return queryset.filter(change_seq__gt=since)
+
+
+def deleted_since(board_id, since):
+    """
+    Ids of the rows deleted from a board after cursor `since`, keyed like the
+    response sections: `{"lists": [...], "tasks": [...], ...}`
+    """
+    deleted = {f'{kind}s': [] for kind, _label in Tombstone.KIND_CHOICES}
+    if since is None:
+        # A full sync has nothing to remove
+        return deleted
+    rows = (Tombstone.objects.filter(board_id=board_id, change_seq__gt=since)
+            .order_by('change_seq').values_list('kind', 'object_id'))
+    for kind, object_id in rows:
+        deleted[f'{kind}s'].append(object_id)
+    return deleted
@@ -0,0 +1,114 @@
+"""
+Denormalized counters.
+
+Counts read on most requests are stored on the counted rows' parent instead
+of being computed with COUNT(*):
+
+- `Board.members_count`: accepted memberships
+- `List.tasks_count` / `List.completed_tasks_count`: tasks of the list
+- `Task.comments_count`: comments of the task
+- `CustomUser.boards_count` / `CustomUser.memberships_count`: owned boards
+  and accepted memberships
+
+`boards.signals` keeps them current: every save or delete of a counted row
+adds its delta with an `F()` UPDATE in the transaction of the change, and
+mirrors it on the parent instance cached on the row, if any. Rows removed
+by the cascade of their parent's delete are not counted down. Bulk QuerySet
+writes bypass the signals; their callers `recount()` the affected rows.
+`manage.py recount` repairs any drift, and every `manage.py migrate` runs it
+(`recount_after_migrate`), so counter columns added to existing rows start
+from the actual counts instead of 0.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count, F, OuterRef, QuerySet, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from boards.models import Board, BoardMembership
+from lists.models import List
+from tasks.models import Task, TaskComment
+
+User = get_user_model()
+
+# Model -> {counter field: (counted model, foreign key to the model, filters)}
+COUNTERS = {
+    Board: {
+        'members_count': (BoardMembership, 'board', {'status': 'accepted'}),
+    },
+    List: {
+        'tasks_count': (Task, 'list', {}),
+        'completed_tasks_count': (Task, 'list', {'is_completed': True}),
+    },
+    Task: {
+        'comments_count': (TaskComment, 'task', {}),
+    },
+    User: {
+        'boards_count': (Board, 'owner', {}),
+        'memberships_count': (BoardMembership, 'user', {'status': 'accepted'}),
+    },
+}
+
+
+def add(model, pk, **deltas):
+    """Add `deltas` to the counters of one row with a single UPDATE"""
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas or pk is None:
+        return
+    model.objects.filter(pk=pk).update(**{
+        # Never below zero, even if the stored value drifted
+        field: F(field) + delta if delta > 0 else Greatest(F(field) + delta, Value(0))
+        for field, delta in deltas.items()
+    })
+
+
+def adjust(instance, relation, **deltas):
+    """
+    Add `deltas` to the counters of the row `instance.<relation>` points to,
+    and to that row's instance if it is cached on `instance`.
+    """
+    field = instance._meta.get_field(relation)
+    add(field.related_model, getattr(instance, field.attname), **deltas)
+    if field.is_cached(instance):
+        related = field.get_cached_value(instance)
+        if related is not None:
+            for name, delta in deltas.items():
+                setattr(related, name, max(getattr(related, name) + delta, 0))
+
+
+def deleted_with(origin, *models):
+    """Whether a delete started from an instance or QuerySet of `models`"""
+    if isinstance(origin, QuerySet):
+        return issubclass(origin.model, models)
+    return isinstance(origin, models)
+
+
+def actual_count(model, field):
+    """Expression computing counter `field` of `model` rows from the counted rows"""
+    counted, foreign_key, filters = COUNTERS[model][field]
+    counts = (counted.objects.filter(**{foreign_key: OuterRef('pk')}, **filters)
+              .order_by().values(foreign_key).annotate(total=Count('pk')).values('total'))
+    return Coalesce(Subquery(counts), 0)
+
+
+def recount(model, queryset=None):
+    """
+    Recompute the counters of `queryset` (every row of `model` by default).
+    Returns `{counter field: number of rows corrected}`.
+    """
+    if queryset is None:
+        queryset = model.objects.all()
+    corrected = {}
+    for field in COUNTERS[model]:
+        actual = actual_count(model, field)
+        corrected[field] = queryset.exclude(**{field: actual}).update(**{field: actual})
+    return corrected
+
+
+def recount_after_migrate(using=DEFAULT_DB_ALIAS, **kwargs):
+    """post_migrate handler backfilling the counters (off with RECOUNT_AFTER_MIGRATE = False)"""
+    if not getattr(settings, 'RECOUNT_AFTER_MIGRATE', True):
+        return
+    with transaction.atomic(using=using):
+        for model in COUNTERS:
+            recount(model, model.objects.using(using).all())
@@ -0,0 +1,147 @@
+"""
+Board duplication and templates.
+
+A board is deep-copied with one `bulk_create` per model (board, lists, tasks,
+assignments) in one transaction: source rows are read with a
+single query per model and the ids of the copies are mapped from the source
+ids, so the number of queries does not grow with the size of the board.
+Comments, activities and memberships are not copied: nobody becomes a member
+of the copy without being invited.
+
+Boards flagged `is_template` are listed under /boards/templates/ and copied
+the same way. Copies of boards with more than `BOARD_DUPLICATE_ASYNC_THRESHOLD`
+tasks run in Celery as a `BoardDuplication` job the user polls.
+"""
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from boards.activity import record_activity
+from boards.bulk import bulk_written, create_board
+from boards.models import BoardDuplication
+from boards.utils import check_user_board_limit
+from lists.models import List
+from tasks.models import Task
+
+logger = logging.getLogger(__name__)
+
+
+class DuplicationError(ValueError):
+    """The board cannot be copied for this user"""
+
+
+def batch_size():
+    return getattr(settings, 'BOARD_DUPLICATE_BATCH_SIZE', 2000)
+
+
+def source_size(board):
+    """Number of tasks a copy of `board` would create, from the list counters"""
+    return List.objects.filter(board=board).aggregate(total=Sum('tasks_count'))['total'] or 0
+
+
+def runs_async(board, include_tasks=True):
+    return include_tasks and source_size(board) > getattr(settings, 'BOARD_DUPLICATE_ASYNC_THRESHOLD', 1000)
+
+
+def duplicate_board(source, user, title=None, include_tasks=True, include_assignments=False, as_template=False):
+    """
+    Copy `source` into a new board owned by `user` and return it.
+
+    - Lists are always copied; tasks (with their descriptions, priorities,
+      due dates, order and completion) unless `include_tasks` is false.
+    - `include_assignments` also copies the assignments of `user`, the only
+      member of the copy; those of other users are left out.
+    - Raises `DuplicationError` when the user has reached `MAX_BOARDS_PER_USER`.
+    """
+    can_create, _remaining = check_user_board_limit(user)
+    if not can_create:
+        raise DuplicationError(_("You have reached the maximum number of boards allowed."))
+    batch = batch_size()
+
+    with transaction.atomic():
+        board = create_board(
+            title=title or source.title, description=source.description, color=source.color,
+            is_template=as_template, owner=user,
+        )
+
+        source_lists = list(List.objects.filter(board=source).order_by('pk')
+                            .values_list('pk', 'title', 'position', 'rank', 'color'))
+        lists = List.objects.bulk_create([
+            List(board=board, title=title, position=position, rank=rank, color=color)
+            for _pk, title, position, rank, color in source_lists
+        ], batch_size=batch)
+        list_ids = {row[0]: list_obj.pk for row, list_obj in zip(source_lists, lists)}
+
+        task_ids = {}
+        completed = 0
+        if include_tasks:
+            source_tasks = list(Task.objects.filter(list__board=source).order_by('pk').values_list(
+                'pk', 'list_id', 'title', 'description', 'priority', 'due_date', 'position', 'rank',
+                'is_completed', 'completed_at',
+            ))
+            tasks = Task.objects.bulk_create([
+                Task(list_id=list_ids[list_id], title=title, description=description, priority=priority,
+                     due_date=due_date, position=position, rank=rank, is_completed=is_completed,
+                     completed_at=completed_at, created_by=user)
+                for (_pk, list_id, title, description, priority, due_date, position, rank,
+                     is_completed, completed_at) in source_tasks
+            ], batch_size=batch)
+            task_ids = {row[0]: task.pk for row, task in zip(source_tasks, tasks)}
+            completed = sum(row[8] for row in source_tasks)
+
+        if task_ids and include_assignments:
+            Assignment = Task.assigned_to.through
+            assigned = Assignment.objects.filter(
+                task__list__board=source, customuser_id=user.pk
+            ).values_list('task_id', flat=True)
+            Assignment.objects.bulk_create([
+                Assignment(task_id=task_ids[task_id], customuser_id=user.pk) for task_id in assigned
+            ], batch_size=batch)
+
+        bulk_written(
+            board, user, board_created=True, created_tasks=len(task_ids), completed_tasks=completed,
+        )
+        record_activity(
+            board=board,
+            action='create',
+            user=user,
+            description=_("%(user)s created the board from %(source)s") % {'user': user, 'source': source.title}
+        )
+    return board
+
+
+def start_duplication(source, user, **options):
+    """Queue a copy of `source` for Celery; returns the `BoardDuplication` to poll"""
+    from boards.tasks import duplicate_board_job
+
+    options.setdefault('title', source.title)
+    job = BoardDuplication.objects.create(source=source, user=user, **options)
+    transaction.on_commit(lambda: duplicate_board_job.delay(job.pk))
+    return job
+
+
+def run_duplication(duplication_id):
+    """Make the copy of a queued `BoardDuplication`, recording the outcome on it"""
+    # Claim the job so a redelivered message does not copy the board twice
+    if not BoardDuplication.objects.filter(pk=duplication_id, status='pending').update(status='running'):
+        return
+    job = BoardDuplication.objects.select_related('source__owner', 'user').get(pk=duplication_id)
+    try:
+        if job.source is None:
+            raise DuplicationError(_("The source board no longer exists."))
+        job.board = duplicate_board(
+            job.source, job.user, title=job.title, include_tasks=job.include_tasks,
+            include_assignments=job.include_assignments, as_template=job.as_template,
+        )
+        job.status = 'done'
+    except DuplicationError as error:
+        job.status, job.error = 'failed', str(error)
+    except Exception:
+        logger.exception("Could not duplicate board %s", job.source_id)
+        job.status, job.error = 'failed', str(_("The board could not be copied."))
+    job.finished_at = timezone.now()
+    job.save(update_fields=['board', 'status', 'error', 'finished_at'])
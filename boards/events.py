@@ -0,0 +1,162 @@
+"""
+Real-time change feed of boards.
+
+Writes to tasks, lists, comments, memberships and activities publish a compact
+JSON event on their board's channel once the transaction commits (see
+`boards.signals`). `BoardEventsView` streams a board's channel to its members
+as Server-Sent Events.
+
+The fan-out layer is chosen with `BOARD_EVENTS_BACKEND`:
+- `boards.events.InProcessBackend`: subscribers of the current process only;
+  for tests and single-process development servers.
+- `boards.events.RedisBackend`: Redis pub/sub on `BOARD_EVENTS_REDIS_URL`, so
+  every ASGI worker sees events published by any web or Celery process.
+"""
+import asyncio
+import json
+import logging
+import threading
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+def channel_name(board_id):
+    return f'board-events:{board_id}'
+
+
+class InProcessSubscription:
+    def __init__(self, backend, board_id, queue):
+        self.backend = backend
+        self.board_id = board_id
+        self.queue = queue
+
+    async def get(self, timeout):
+        """Next message, or None when nothing arrives within `timeout` seconds"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def close(self):
+        self.backend.unsubscribe(self.board_id, self.queue)
+
+
+class InProcessBackend:
+    """Delivers events to subscribers living in this process"""
+    max_queue_size = 1000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    async def subscribe(self, board_id):
+        queue = asyncio.Queue(maxsize=self.max_queue_size)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._subscribers.setdefault(board_id, set()).add((loop, queue))
+        return InProcessSubscription(self, board_id, queue)
+
+    def unsubscribe(self, board_id, queue):
+        with self._lock:
+            subscribers = self._subscribers.get(board_id, set())
+            subscribers.difference_update({entry for entry in subscribers if entry[1] is queue})
+            if not subscribers:
+                self._subscribers.pop(board_id, None)
+
+    def publish(self, board_id, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(board_id, ()))
+        for loop, queue in subscribers:
+            # Subscribers run on their own event loop; hand the message over thread-safely
+            loop.call_soon_threadsafe(self._deliver, queue, message)
+
+    @staticmethod
+    def _deliver(queue, message):
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # A stalled client loses events; it resyncs with a full reload
+            pass
+
+
+class RedisSubscription:
+    def __init__(self, client, pubsub):
+        self.client = client
+        self.pubsub = pubsub
+
+    async def get(self, timeout):
+        message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        if message is None:
+            return None
+        data = message['data']
+        return data.decode() if isinstance(data, bytes) else data
+
+    async def close(self):
+        await self.pubsub.aclose()
+        await self.client.aclose()
+
+
+class RedisBackend:
+    """Fans events out through Redis pub/sub"""
+
+    def __init__(self):
+        import redis
+
+        self.url = getattr(settings, 'BOARD_EVENTS_REDIS_URL', 'redis://localhost:6379/1')
+        self._client = redis.Redis.from_url(self.url)
+
+    async def subscribe(self, board_id):
+        import redis.asyncio
+
+        client = redis.asyncio.Redis.from_url(self.url)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(channel_name(board_id))
+        return RedisSubscription(client, pubsub)
+
+    def publish(self, board_id, message):
+        self._client.publish(channel_name(board_id), message)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """The configured event backend, created once per process"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                path = getattr(settings, 'BOARD_EVENTS_BACKEND', 'boards.events.InProcessBackend')
+                _backend = import_string(path)()
+    return _backend
+
+
+def publish_event(board_id, kind, action, instance, **data):
+    """
+    Publish `{"type", "action", "board", "id", ...data}` on the board's channel
+    after the current transaction commits.
+    """
+    if not getattr(settings, 'BOARD_EVENTS_ENABLED', True) or board_id is None:
+        return
+    message = json.dumps({
+        'type': kind,
+        'action': action,
+        'board': board_id,
+        'id': instance.pk,
+        **data,
+    }, cls=DjangoJSONEncoder)
+
+    def send():
+        try:
+            get_backend().publish(board_id, message)
+        except Exception:
+            # The feed is best effort: a failed publish must not fail the write
+            logger.exception("Could not publish event for board %s", board_id)
+
+    transaction.on_commit(send)
@@ -0,0 +1,133 @@
+"""
+Streaming board export.
+
+A board is exported as NDJSON, one JSON object per line with a `type`:
+
+    {"type": "export", "format": "trello-lite-board", "version": 1, ...}
+    {"type": "board", ...}
+    {"type": "membership", ...}   before the tasks their users are assigned to
+    {"type": "list", ...}         one per list
+    {"type": "task", ...}         one per task, `list` refers to a list id
+    {"type": "assignment", ...}   one per task assignee
+    {"type": "comment", ...}
+    {"type": "activity", ...}     live activities, then archived ones
+
+Users are sent with their id and email, so an export can be matched to the
+accounts of another installation. Rows are read with `.values().iterator()`
+in chunks of `BOARD_EXPORT_CHUNK_SIZE` and encoded as they are read, so
+memory use does not grow with the size of the board (archived activities
+are read one month at a time).
+"""
+import zlib
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.utils import timezone
+
+from boards.archive import archived_files, read_month
+from boards.models import BoardActivity, BoardMembership
+from lists.models import List
+from tasks.models import Task, TaskComment
+
+EXPORT_FORMAT = 'trello-lite-board'
+EXPORT_VERSION = 1
+
+# Bytes collected before a piece of the stream is handed out
+FLUSH_SIZE = 64 * 1024
+
+
+def chunk_size():
+    return getattr(settings, 'BOARD_EXPORT_CHUNK_SIZE', 2000)
+
+
+def _rows(record_type, queryset, *fields, **expressions):
+    for row in queryset.order_by('pk').values(*fields, **expressions).iterator(chunk_size=chunk_size()):
+        yield {'type': record_type, **row}
+
+
+def export_records(board):
+    """Every record of `board` as dicts, in the order an import needs them"""
+    yield {
+        'type': 'export',
+        'format': EXPORT_FORMAT,
+        'version': EXPORT_VERSION,
+        'board_version': board.version,
+        'exported_at': timezone.now(),
+    }
+    yield {
+        'type': 'board',
+        'id': board.pk,
+        'title': board.title,
+        'description': board.description,
+        'color': board.color,
+        'is_public': board.is_public,
+        'owner': board.owner_id,
+        'owner_email': board.owner.email,
+        'created_at': board.created_at,
+        'updated_at': board.updated_at,
+    }
+    yield from _rows(
+        'membership', BoardMembership.objects.filter(board=board),
+        'user', 'role', 'status', 'invited_by', 'response_at', 'created_at',
+        user_email=F('user__email'), invited_by_email=F('invited_by__email'),
+    )
+    yield from _rows(
+        'list', List.objects.filter(board=board),
+        'id', 'title', 'position', 'rank', 'color', 'created_at', 'updated_at',
+    )
+    yield from _rows(
+        'task', Task.objects.filter(list__board=board),
+        'id', 'list', 'title', 'description', 'priority', 'due_date', 'position', 'rank',
+        'is_completed', 'completed_at', 'created_by', 'created_at', 'updated_at',
+        created_by_email=F('created_by__email'),
+    )
+    yield from _rows(
+        'assignment', Task.assigned_to.through.objects.filter(task__list__board=board),
+        'task', user=F('customuser'), user_email=F('customuser__email'),
+    )
+    yield from _rows(
+        'comment', TaskComment.objects.filter(task__list__board=board),
+        'id', 'task', 'user', 'content', 'created_at', 'updated_at',
+        user_email=F('user__email'),
+    )
+    yield from _rows(
+        'activity', BoardActivity.objects.filter(board=board),
+        'id', 'action', 'user', 'description', 'created_at',
+    )
+    for names in archived_files(board.pk).values():
+        for entry in read_month(board.pk, names):
+            yield {
+                'type': 'activity', 'id': entry['id'], 'action': entry['action'], 'user': entry['user_id'],
+                'description': entry['description'], 'created_at': entry['created_at'], 'archived': True,
+            }
+
+
+def export_ndjson(board):
+    """The export of `board` as NDJSON bytes, in pieces of about `FLUSH_SIZE`"""
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    buffer = []
+    size = 0
+    for record in export_records(board):
+        line = (encoder.encode(record) + '\n').encode()
+        buffer.append(line)
+        size += len(line)
+        if size >= FLUSH_SIZE:
+            yield b''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def gzip_stream(pieces):
+    """Compress a stream of bytes into a gzip stream, piece by piece"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for piece in pieces:
+        compressed = compressor.compress(piece)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_filename(board, compressed=False):
+    return f"board-{board.pk}.ndjson" + ('.gz' if compressed else '')
@@ -0,0 +1,473 @@
+"""
+Bulk board import.
+
+Accepts the NDJSON format of `boards.export`, or a CSV of cards with a header
+row and the columns
+
+    list, title, description, priority, due_date, is_completed, assignees
+
+(only `title` is required; `assignees` holds emails separated by `;`).
+
+Records are read as a stream and written with `bulk_create` in chunks of
+`BOARD_IMPORT_CHUNK_SIZE` inside one transaction, with positions and ranks
+assigned up front instead of per-row `save()`, `full_clean()` and
+`Max('position')` queries. Users are matched by email; assignees must be
+accepted members of the board, checked against a set loaded once. Invalid
+rows are skipped and reported with their line number; a malformed file
+rolls the whole import back.
+
+What the skipped model signals would have done (counters, board version and
+delta sync stamps, daily stats, the search index, access caches) is done
+once per import by `BoardImporter.finish()`.
+"""
+import csv
+import gzip
+import json
+from collections import Counter
+from itertools import chain
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Max
+from django.db.models.functions import Lower
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.translation import gettext_lazy as _
+
+from core.ranking import RANK_GAP
+from boards.activity import record_activity
+from boards.bulk import bulk_written, create_board
+from boards.events import publish_event
+from boards.export import EXPORT_FORMAT, EXPORT_VERSION
+from boards.models import BoardMembership
+from lists.models import List
+from tasks.models import Task, TaskComment
+
+User = get_user_model()
+
+CSV_COLUMNS = ('list', 'title', 'description', 'priority', 'due_date', 'is_completed', 'assignees')
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 'x', 'done', 'completed'}
+# Row errors listed in the report; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+
+def read_lines(handle):
+    """Byte lines of a binary file, decompressed if it is gzip (e.g. `export_board --gzip`)"""
+    magic = handle.read(2)
+    handle.seek(0)
+    if magic == b'\x1f\x8b':
+        return gzip.GzipFile(fileobj=handle)
+    return handle
+
+
+class BoardImportError(ValueError):
+    """The file cannot be imported at all"""
+
+
+class RowError(ValueError):
+    """One record is invalid and skipped"""
+
+
+class BoardImporter:
+    """
+    Import one file into a new board owned by `user`, or into `board`.
+
+    `accept_memberships` restores the accepted memberships of an NDJSON
+    export (for administrators); otherwise membership records are skipped
+    and members are invited the usual way. `progress` is called with the
+    counts of created rows after every chunk.
+    """
+
+    def __init__(self, user, board=None, title=None, accept_memberships=False, progress=None):
+        self.user = user
+        self.board = board
+        self.title = title
+        self.accept_memberships = accept_memberships
+        self.progress = progress
+        self.chunk_size = getattr(settings, 'BOARD_IMPORT_CHUNK_SIZE', 2000)
+        self.created = Counter()
+        self.completed_tasks = 0
+        self.skipped = Counter()
+        self.errors = []
+        self.pending = []
+        self.pending_type = None
+        # Exported list id (NDJSON) or list title (CSV) -> List
+        self.lists = {}
+        # Exported task id -> id of the imported task
+        self.task_ids = {}
+        # Board or list id -> [position base, rank base, items placed]
+        self.slots = {}
+        # Lower-cased email -> user id (None when unknown)
+        self.user_ids = {}
+        self.member_ids = set()
+        self.new_member_ids = set()
+
+    # Reading
+
+    def run(self, lines):
+        """Import an iterable of byte lines (e.g. an uploaded file); returns the report"""
+        try:
+            lines = iter(lines)
+            first = next((line for line in lines if line.strip()), None)
+            if first is None:
+                raise BoardImportError(_("The file is empty."))
+            lines = chain([first], lines)
+            file_format = 'ndjson' if first.lstrip().startswith(b'{') else 'csv'
+
+            with transaction.atomic():
+                if file_format == 'ndjson':
+                    self.read_ndjson(lines)
+                else:
+                    self.read_csv(lines)
+                self.flush()
+                self.get_board()
+                self.finish()
+        except (OSError, EOFError, UnicodeDecodeError, csv.Error) as error:
+            # Truncated gzip, broken encoding or CSV quoting
+            raise BoardImportError(_("The file could not be read: %(error)s") % {'error': error})
+        return self.report(file_format)
+
+    def read_ndjson(self, lines):
+        for number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                raise BoardImportError(_("Line %(line)s is not valid JSON.") % {'line': number})
+            if not isinstance(record, dict):
+                raise BoardImportError(_("Line %(line)s is not a JSON object.") % {'line': number})
+
+            record_type = record.get('type')
+            if record_type == 'export':
+                if record.get('format') != EXPORT_FORMAT or record.get('version', 0) > EXPORT_VERSION:
+                    raise BoardImportError(_("Unsupported export format."))
+            elif record_type == 'board':
+                self.get_board(record)
+            elif record_type in self.writers:
+                self.add(record_type, number, record)
+            elif record_type == 'activity':
+                # Activity history stays with the exported board
+                self.skipped['activity'] += 1
+            else:
+                self.error(number, _("Unknown record type."))
+
+    def read_csv(self, lines):
+        reader = csv.reader(line.decode('utf-8-sig') for line in lines)
+        header = [column.strip().lower() for column in next(reader)]
+        if 'title' not in header:
+            raise BoardImportError(_("The CSV file needs a header row with a 'title' column."))
+        unknown = set(header) - set(CSV_COLUMNS)
+        if unknown:
+            raise BoardImportError(
+                _("Unknown CSV columns: %(columns)s.") % {'columns': ', '.join(sorted(unknown))}
+            )
+        for row in reader:
+            if not any(value.strip() for value in row):
+                continue
+            record = dict(zip(header, (value.strip() for value in row)))
+            # Line of the row's first physical line, counting the header
+            self.add('card', reader.line_num, record)
+
+    def add(self, record_type, number, record):
+        if record_type != self.pending_type:
+            self.flush()
+            self.pending_type = record_type
+        self.pending.append((number, record))
+        if len(self.pending) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        self.get_board()
+        self.writers[self.pending_type](self, self.pending)
+        self.pending = []
+        if self.progress:
+            self.progress(self.created)
+
+    def error(self, number, message, record_type=None):
+        if record_type:
+            self.skipped[record_type] += 1
+        self.errors.append({'line': number, 'error': str(message)})
+
+    # Lookups
+
+    def get_board(self, record=None):
+        """The target board, created on first use"""
+        if self.board is not None:
+            # Importing into an existing board only adds the exported content
+            return self.board
+
+        record = record or {}
+        title = (self.title or record.get('title') or _("Imported board"))
+        self.board = create_board(
+            title=str(title)[:255],
+            description=(record.get('description') or None),
+            color=(record.get('color') or None) and str(record['color'])[:7],
+            is_public=bool(record.get('is_public', False)),
+            owner=self.user,
+        )
+        self.created['board'] += 1
+        return self.board
+
+    def load_members(self):
+        if not self.member_ids and self.board.pk:
+            self.member_ids = set(BoardMembership.objects.filter(
+                board=self.board, status='accepted'
+            ).values_list('user_id', flat=True))
+        return self.member_ids
+
+    def resolve_users(self, emails):
+        """Fill the email -> user id map with one query for the unseen emails"""
+        unseen = {email.strip().lower() for email in emails if email} - set(self.user_ids)
+        if not unseen:
+            return
+        found = dict(User.objects.annotate(email_lower=Lower('email'))
+                     .filter(email_lower__in=unseen).values_list('email_lower', 'pk'))
+        for email in unseen:
+            self.user_ids[email] = found.get(email)
+
+    def user_id(self, email):
+        return self.user_ids.get((email or '').strip().lower())
+
+    def slot(self, key, queryset):
+        """Position and rank bases for the items appended to `queryset`"""
+        if key not in self.slots:
+            bases = queryset.aggregate(position=Max('position'), rank=Max('rank'))
+            self.slots[key] = [bases['position'] or 0, bases['rank'] or 0, 0]
+        return self.slots[key]
+
+    def place(self, slot, record):
+        """Position and rank of the next item, keeping the exported order when known"""
+        slot[2] += 1
+        position = record.get('position')
+        if not isinstance(position, int) or position < 1:
+            position = slot[2]
+        rank = record.get('rank')
+        if not isinstance(rank, int) or rank < 1:
+            rank = position * RANK_GAP
+        return slot[0] + position, slot[1] + rank
+
+    def list_for_title(self, title):
+        """List of a CSV card, matched by title and created when missing"""
+        title = (title or str(_("Imported")))[:255]
+        if title not in self.lists:
+            existing = List.objects.filter(board=self.board, title=title).order_by('position').first()
+            if existing is None:
+                position, rank = self.place(self.slot('board', List.objects.filter(board=self.board)), {})
+                existing = List(board=self.board, title=title, position=position, rank=rank)
+                List.objects.bulk_create([existing])
+                self.created['list'] += 1
+            self.lists[title] = existing
+        return self.lists[title]
+
+    # Writers, one per record type; each receives a chunk of (line, record)
+
+    def write_memberships(self, batch):
+        if not self.accept_memberships:
+            self.skipped['membership'] += len(batch)
+            return
+        self.resolve_users(record.get('user_email') for _number, record in batch)
+        self.load_members()
+        max_members = getattr(settings, 'MAX_MEMBERS_PER_BOARD', 50)
+        memberships = []
+        for number, record in batch:
+            user_id = self.user_id(record.get('user_email'))
+            if record.get('status') != 'accepted' or user_id in (None, self.board.owner_id):
+                self.skipped['membership'] += 1
+            elif user_id in self.member_ids:
+                continue
+            elif len(self.member_ids) >= max_members:
+                self.error(number, _("This board cannot have more than %(max_members)s members.") % {
+                    'max_members': max_members}, 'membership')
+            else:
+                role = record.get('role') if record.get('role') in ('admin', 'member') else 'member'
+                memberships.append(BoardMembership(
+                    board=self.board, user_id=user_id, role=role, status='accepted',
+                    invited_by=self.user, response_at=timezone.now(),
+                ))
+                self.member_ids.add(user_id)
+                self.new_member_ids.add(user_id)
+        BoardMembership.objects.bulk_create(memberships)
+        self.created['membership'] += len(memberships)
+
+    def write_lists(self, batch):
+        slot = self.slot('board', List.objects.filter(board=self.board))
+        lists = []
+        for number, record in batch:
+            title = str(record.get('title') or '').strip()
+            if not title:
+                self.error(number, _("A list needs a title."), 'list')
+                continue
+            position, rank = self.place(slot, record)
+            list_obj = List(board=self.board, title=title[:255], position=position, rank=rank,
+                            color=str(record.get('color') or 'blue')[:20])
+            self.lists[record.get('id')] = list_obj
+            lists.append(list_obj)
+        List.objects.bulk_create(lists)
+        self.created['list'] += len(lists)
+
+    def write_tasks(self, batch):
+        self.resolve_users(record.get('created_by_email') for _number, record in batch)
+        tasks = []
+        exported_ids = []
+        for number, record in batch:
+            list_obj = self.lists.get(record.get('list'))
+            if list_obj is None:
+                self.error(number, _("The task refers to an unknown list."), 'task')
+                continue
+            try:
+                task = self.build_task(list_obj, record, self.user_id(record.get('created_by_email')))
+            except RowError as error:
+                self.error(number, error, 'task')
+                continue
+            tasks.append(task)
+            exported_ids.append(record.get('id'))
+        Task.objects.bulk_create(tasks)
+        for exported_id, task in zip(exported_ids, tasks):
+            self.task_ids[exported_id] = task.pk
+        self.count_tasks(tasks)
+
+    def write_cards(self, batch):
+        """CSV rows: tasks with their list and assignees"""
+        self.resolve_users(
+            email for _number, record in batch for email in (record.get('assignees') or '').split(';')
+        )
+        assignable = self.load_members() | {self.board.owner_id}
+        tasks = []
+        assignees = []
+        for number, record in batch:
+            try:
+                task = self.build_task(self.list_for_title(record.get('list')), record, None)
+            except RowError as error:
+                self.error(number, error, 'task')
+                continue
+            user_ids = set()
+            for email in filter(None, (email.strip() for email in (record.get('assignees') or '').split(';'))):
+                user_id = self.user_id(email)
+                if user_id in assignable:
+                    user_ids.add(user_id)
+                else:
+                    self.error(number, _("%(email)s is not a member of this board.") % {'email': email},
+                               'assignment')
+            tasks.append(task)
+            assignees.append(user_ids)
+        Task.objects.bulk_create(tasks)
+        self.count_tasks(tasks)
+
+        Assignment = Task.assigned_to.through
+        assignments = [
+            Assignment(task_id=task.pk, customuser_id=user_id)
+            for task, user_ids in zip(tasks, assignees) for user_id in user_ids
+        ]
+        Assignment.objects.bulk_create(assignments)
+        self.created['assignment'] += len(assignments)
+
+    def write_assignments(self, batch):
+        self.resolve_users(record.get('user_email') for _number, record in batch)
+        assignable = self.load_members() | {self.board.owner_id}
+        Assignment = Task.assigned_to.through
+        assignments = []
+        for number, record in batch:
+            task_id = self.task_ids.get(record.get('task'))
+            user_id = self.user_id(record.get('user_email'))
+            if task_id is None or user_id not in assignable:
+                self.skipped['assignment'] += 1
+                continue
+            assignments.append(Assignment(task_id=task_id, customuser_id=user_id))
+        Assignment.objects.bulk_create(assignments, ignore_conflicts=True)
+        self.created['assignment'] += len(assignments)
+
+    def write_comments(self, batch):
+        self.resolve_users(record.get('user_email') for _number, record in batch)
+        authors = self.load_members() | {self.board.owner_id}
+        comments = []
+        for number, record in batch:
+            task_id = self.task_ids.get(record.get('task'))
+            user_id = self.user_id(record.get('user_email'))
+            content = str(record.get('content') or '').strip()
+            if task_id is None or user_id not in authors or not content:
+                self.skipped['comment'] += 1
+                continue
+            comments.append(TaskComment(task_id=task_id, user_id=user_id, content=content))
+        TaskComment.objects.bulk_create(comments)
+        self.created['comment'] += len(comments)
+
+    writers = {
+        'membership': write_memberships,
+        'list': write_lists,
+        'task': write_tasks,
+        'card': write_cards,
+        'assignment': write_assignments,
+        'comment': write_comments,
+    }
+
+    def build_task(self, list_obj, record, created_by_id):
+        """Unsaved task for `record`; raises `RowError` for invalid values"""
+        title = str(record.get('title') or '').strip()
+        if not title:
+            raise RowError(_("A task needs a title."))
+        if len(title) > 255:
+            raise RowError(_("The title is longer than 255 characters."))
+
+        priority = record.get('priority') or 'medium'
+        if priority not in dict(Task.PRIORITY_CHOICES):
+            raise RowError(_("Unknown priority %(priority)s.") % {'priority': priority})
+
+        due_date = record.get('due_date') or None
+        if due_date is not None:
+            try:
+                due_date = parse_date(str(due_date))
+            except ValueError:
+                due_date = None
+            if due_date is None:
+                raise RowError(_("The due date must be formatted as YYYY-MM-DD."))
+
+        is_completed = record.get('is_completed')
+        if not isinstance(is_completed, bool):
+            is_completed = str(is_completed or '').strip().lower() in TRUE_VALUES
+        completed_at = None
+        if is_completed:
+            completed_at = parse_datetime(str(record.get('completed_at') or '')) or timezone.now()
+
+        position, rank = self.place(self.slot(list_obj.pk, Task.objects.filter(list=list_obj)), record)
+        return Task(
+            list=list_obj, title=title, description=record.get('description') or None,
+            priority=priority, due_date=due_date, position=position, rank=rank,
+            is_completed=is_completed, completed_at=completed_at,
+            created_by_id=created_by_id or self.user.pk,
+        )
+
+    def count_tasks(self, tasks):
+        self.created['task'] += len(tasks)
+        self.completed_tasks += sum(task.is_completed for task in tasks)
+
+    # Finishing
+
+    def finish(self):
+        """Do once for the whole import what the bypassed model signals do per row"""
+        board = self.board
+        bulk_written(
+            board, self.user, board_created=bool(self.created['board']), member_ids=self.new_member_ids,
+            comments=bool(self.created['comment']),
+            created_tasks=self.created['task'], completed_tasks=self.completed_tasks,
+        )
+        record_activity(
+            board=board,
+            action='create',
+            user=self.user,
+            description=_("%(user)s imported %(count)s tasks") % {'user': self.user, 'count': self.created['task']}
+        )
+        publish_event(board.pk, 'board', 'imported', board)
+
+    def report(self, file_format):
+        return {
+            'board': self.board.pk,
+            'format': file_format,
+            'created': {key: value for key, value in self.created.items() if value and key != 'board'},
+            'skipped': dict(self.skipped),
+            'errors': self.errors[:MAX_REPORTED_ERRORS],
+            'error_count': len(self.errors),
+        }
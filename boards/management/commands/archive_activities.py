@@ -0,0 +1,29 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from boards.archive import archive_activities
+
+
+class Command(BaseCommand):
+    help = (
+        "Move board activities older than the retention period into per-board, per-month "
+        "gzip NDJSON archives on the default storage and delete the live rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=getattr(settings, 'BOARD_ACTIVITY_RETENTION_DAYS', 90),
+            help="Archive activities older than this many days (default: BOARD_ACTIVITY_RETENTION_DAYS)"
+        )
+        parser.add_argument('--dry-run', action='store_true', help="Only count what would be archived")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        archived, months = archive_activities(cutoff, dry_run=options['dry_run'])
+        verb = "Would archive" if options['dry_run'] else "Archived"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {archived} activities older than {cutoff:%Y-%m-%d} in {months} board-months."
+        ))
@@ -0,0 +1,128 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+
+from boards.counters import recount
+from boards.models import Board, BoardMembership
+from boards.permissions import board_roles_query, load_board_roles
+
+User = get_user_model()
+
+
+def legacy_all_boards(user):
+    """The previous `CustomUser.all_boards`: OR over a membership join plus DISTINCT"""
+    owned = user.owned_boards.all()
+    member = Board.objects.filter(memberships__user=user, memberships__status='accepted')
+    return (owned | member).distinct()
+
+
+class Command(BaseCommand):
+    help = (
+        "Show the query plan and timing of the legacy boards-of-a-user query (owner OR membership "
+        "join + DISTINCT) and of load_board_roles, which every board permission check now goes "
+        "through. Use --seed to run against a generated dataset that is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, help="Id of the user to benchmark (default: busiest member)")
+        parser.add_argument('--seed', type=int, default=0, help="Generate this many boards for the run, then roll back")
+        parser.add_argument('--repeat', type=int, default=50, help="Executions per query for the timing")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options['seed']:
+                user = self.seed(options['seed'])
+            else:
+                user = self.get_user(options['user'])
+
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE')
+
+            self.stdout.write(f"User {user.pk} ({user.username}), {Board.objects.count()} boards, "
+                              f"{BoardMembership.objects.count()} memberships\n")
+            legacy = legacy_all_boards(user).order_by()
+            results = {}
+            for label, query, load in (
+                ('legacy: owner OR membership join + DISTINCT', legacy,
+                 lambda: sorted(legacy.values_list('pk', flat=True))),
+                ('current: load_board_roles, owned UNION ALL memberships', board_roles_query(user),
+                 lambda: sorted(load_board_roles(user))),
+            ):
+                results[label] = self.measure(label, query, load, options['repeat'])
+
+            legacy, current = results.values()
+            if legacy[1] != current[1]:
+                raise CommandError("The two queries returned different boards.")
+            self.stdout.write(self.style.SUCCESS(
+                f"{len(current[1])} boards; legacy {legacy[0]:.3f} ms, current {current[0]:.3f} ms per query"
+            ))
+
+            if options['seed']:
+                transaction.set_rollback(True)
+
+    def get_user(self, user_id):
+        if user_id is not None:
+            try:
+                return User.objects.get(pk=user_id)
+            except User.DoesNotExist:
+                raise CommandError(f"User {user_id} does not exist.")
+        user = (User.objects.annotate(total=Count('memberships'))
+                .order_by('-total').first())
+        if user is None:
+            raise CommandError("No users found; use --seed to generate data.")
+        return user
+
+    def seed(self, boards_count):
+        """
+        Bulk-create `boards_count` boards spread over generated owners, three
+        memberships per board, and a benchmark user who owns and joins a slice of them.
+        Bulk inserts skip the model limits and signals on purpose.
+        """
+        owners_count = max(1, boards_count // 20)
+        owners = User.objects.bulk_create([
+            User(email=f'bench-{index}@example.com', username=f'bench-{index}', is_active=True)
+            for index in range(owners_count)
+        ])
+        user = User.objects.create(email='bench-user@example.com', username='bench-user', is_active=True)
+
+        boards = Board.objects.bulk_create([
+            Board(title=f'Bench board {index}', owner=user if index % 100 == 0 else owners[index % owners_count])
+            for index in range(boards_count)
+        ], batch_size=1000)
+
+        memberships = []
+        for index, board in enumerate(boards):
+            for offset in (1, 2, 3):
+                member = owners[(index + offset) % owners_count]
+                if member.pk != board.owner_id:
+                    memberships.append(BoardMembership(
+                        board=board, user=member, invited_by_id=board.owner_id,
+                        status='accepted' if offset != 3 else 'pending',
+                    ))
+            if index % 50 == 25:
+                memberships.append(BoardMembership(
+                    board=board, user=user, invited_by_id=board.owner_id, status='accepted'
+                ))
+        BoardMembership.objects.bulk_create(memberships, batch_size=1000, ignore_conflicts=True)
+        # Bring the member and board counters in line with the bulk inserts
+        recount(Board)
+        recount(User)
+        return user
+
+    def measure(self, label, query, load, repeat):
+        """Print the SQL and plan of `query`, then time `load()`, which runs it and returns the board ids"""
+        self.stdout.write(self.style.MIGRATE_HEADING(label))
+        self.stdout.write(str(query.query))
+        self.stdout.write(query.explain())
+
+        ids = load()
+        started = time.perf_counter()
+        for _ in range(repeat):
+            load()
+        elapsed = (time.perf_counter() - started) * 1000 / max(repeat, 1)
+        self.stdout.write(f"{elapsed:.3f} ms per query\n")
+        return elapsed, ids
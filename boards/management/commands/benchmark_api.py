@@ -0,0 +1,69 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from core.benchmark import (
+    DEFAULT_SIZES, EXPECTED_GROWTH, SKIPPED, benchmark_database, load_baseline, missing_endpoints, query_growth,
+    regressions, run_suite, save_baseline, server_errors,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Call every API endpoint against two generated datasets, in a test database created for the run, and report "
+        "SQL queries, p50/p95 latency and response size. Fails on server errors, when a query count "
+        "grows with the data, or when --baseline is given and queries or p95 latency regressed."
+    )
+
+    def add_arguments(self, parser):
+        for key, value in DEFAULT_SIZES.items():
+            parser.add_argument(f'--{key}', type=int, default=value, help=f"Dataset size: {key} (default {value})")
+        parser.add_argument('--scale', type=int, default=2, help="Size factor of the second dataset")
+        parser.add_argument('--repeat', type=int, default=5, help="Measured calls per request")
+        parser.add_argument('--baseline', help="JSON baseline to compare with")
+        parser.add_argument('--save', help="Write the results as a JSON baseline to this file")
+        parser.add_argument('--p95-ratio', type=float, default=1.5, help="Allowed p95 growth over the baseline")
+        parser.add_argument('--min-ms', type=float, default=2.0, help="Ignore p95 regressions smaller than this")
+        parser.add_argument('--noinput', '--no-input', action='store_false', dest='interactive',
+                            help="Replace a leftover test database without asking")
+
+    def handle(self, *args, **options):
+        missing = missing_endpoints()
+        if missing:
+            raise CommandError(f"No benchmark request for: {', '.join(missing)} (see core.benchmark.ENDPOINTS).")
+        for name, reason in SKIPPED.items():
+            self.stdout.write(f"Skipping {name}: {reason}")
+        for key, reason in EXPECTED_GROWTH.items():
+            self.stdout.write(f"Queries of {key} may grow: {reason}")
+
+        def progress(key, measured):
+            self.stdout.write(
+                f"{key:<55} {measured['status']:>3} {measured['queries_small']:>3} ->{measured['queries']:>4} queries  p50 {measured['p50_ms']:8.2f} ms  "
+                f"p95 {measured['p95_ms']:8.2f} ms  {measured['bytes']:>8} bytes"
+            )
+
+        sizes = {key: options[key] for key in DEFAULT_SIZES}
+        # Test client host, and emails kept in memory
+        setup_test_environment()
+        try:
+            with benchmark_database(options['interactive']) as name:
+                self.stdout.write(f"Benchmarking in the test database {name}")
+                results = run_suite(sizes, options['scale'], options['repeat'], progress)
+        finally:
+            teardown_test_environment()
+        self.stdout.write(f"Datasets: {results['sizes']} and {results['large_sizes']}")
+
+        problems = [f"{key}: server error" for key in server_errors(results)]
+        problems += [f"{key}: {small} queries, {large} with {options['scale']}x the data"
+                    for key, small, large in query_growth(results)]
+        if options['baseline']:
+            problems += regressions(results, load_baseline(options['baseline']),
+                                    options['p95_ratio'], options['min_ms'])
+        if options['save']:
+            save_baseline(results, options['save'])
+            self.stdout.write(f"Baseline written to {options['save']}.")
+
+        if problems:
+            for problem in problems:
+                self.stderr.write(self.style.ERROR(problem))
+            raise CommandError(f"{len(problems)} benchmark regressions.")
+        self.stdout.write(self.style.SUCCESS(f"{len(results['endpoints'])} requests within the limits."))
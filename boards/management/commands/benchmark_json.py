@@ -0,0 +1,145 @@
+import time
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from boards import views
+from boards.counters import recount
+from boards.models import Board, BoardInvitation, BoardMembership
+from core.parsers import FastJSONParser
+from core.renderers import FastJSONRenderer, orjson
+from lists.models import List
+from tasks.models import Task, TaskComment
+from tasks.views import TaskListView
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare DRF's JSONRenderer/JSONParser with core.renderers.FastJSONRenderer and "
+        "core.parsers.FastJSONParser on the responses of real endpoints. Use --seed to run "
+        "against a generated board that is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--board', type=int, help="Id of the board to benchmark (default: largest board)")
+        parser.add_argument('--seed', type=int, default=0, help="Generate a board with this many tasks, then roll back")
+        parser.add_argument('--repeat', type=int, default=50, help="Renders per payload for the timing")
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING("orjson is not installed: FastJSONRenderer uses the stdlib."))
+        with transaction.atomic():
+            board = self.seed(options['seed']) if options['seed'] else self.get_board(options['board'])
+            payloads = self.payloads(board)
+
+            self.stdout.write(f"Board {board.pk}: {Task.objects.filter(list__board=board).count()} tasks, "
+                              f"{options['repeat']} renders per payload\n")
+            for label, data in payloads:
+                expected = JSONRenderer().render(data)
+                if FastJSONRenderer().render(data) != expected:
+                    raise CommandError(f"{label}: the renderers produced different output.")
+                default = self.measure(lambda: JSONRenderer().render(data), options['repeat'])
+                fast = self.measure(lambda: FastJSONRenderer().render(data), options['repeat'])
+                self.report(f"render {label} ({len(expected)} bytes)", default, fast)
+
+                body = expected
+                parsed = JSONParser().parse(BytesIO(body))
+                if FastJSONParser().parse(BytesIO(body)) != parsed:
+                    raise CommandError(f"{label}: the parsers produced different data.")
+                default = self.measure(lambda: JSONParser().parse(BytesIO(body)), options['repeat'])
+                fast = self.measure(lambda: FastJSONParser().parse(BytesIO(body)), options['repeat'])
+                self.report(f"parse {label}", default, fast)
+
+            if options['seed']:
+                transaction.set_rollback(True)
+
+    def get_board(self, board_id):
+        boards = Board.objects.select_related('owner')
+        if board_id is not None:
+            try:
+                return boards.get(pk=board_id)
+            except Board.DoesNotExist:
+                raise CommandError(f"Board {board_id} does not exist.")
+        board = boards.order_by('-members_count', '-pk').first()
+        if board is None:
+            raise CommandError("No boards found; use --seed to generate data.")
+        return board
+
+    def seed(self, tasks_count):
+        """
+        A board with `tasks_count` tasks over its default lists, five members
+        assigned round-robin, a comment per ten tasks and a few invitations.
+        Bulk inserts skip the model signals on purpose.
+        """
+        owner = User.objects.create(email='bench-json@example.com', username='bench-json', is_active=True)
+        members = User.objects.bulk_create([
+            User(email=f'bench-json-{index}@example.com', username=f'bench-json-{index}', is_active=True)
+            for index in range(5)
+        ])
+        board = Board.objects.create(title='JSON benchmark', description='Generated board', owner=owner)
+        BoardMembership.objects.bulk_create([
+            BoardMembership(board=board, user=member, invited_by=owner, status='accepted') for member in members
+        ])
+        lists = list(List.objects.filter(board=board).order_by('position'))
+        tasks = Task.objects.bulk_create([
+            Task(list=lists[index % len(lists)], title=f'Task {index}', description=f'Description of task {index}',
+                 priority=('low', 'medium', 'high', 'urgent')[index % 4], position=index // len(lists) + 1,
+                 is_completed=index % 5 == 0, created_by=owner)
+            for index in range(tasks_count)
+        ], batch_size=1000)
+        Task.assigned_to.through.objects.bulk_create([
+            Task.assigned_to.through(task_id=task.pk, customuser_id=members[index % len(members)].pk)
+            for index, task in enumerate(tasks)
+        ], batch_size=1000)
+        TaskComment.objects.bulk_create([
+            TaskComment(task=task, user=owner, content=f'Comment on {task.title}') for task in tasks[::10]
+        ], batch_size=1000)
+        BoardInvitation.objects.bulk_create([
+            BoardInvitation(board=board, invited_by=owner, invited_email=f'invitee-{index}@example.com')
+            for index in range(20)
+        ])
+        recount(Board, Board.objects.filter(pk=board.pk))
+        recount(List, List.objects.filter(board=board))
+        return board
+
+    def payloads(self, board):
+        """`(label, Response.data)` of the endpoints serving the board, before rendering"""
+        factory = APIRequestFactory()
+        first_list = List.objects.filter(board=board).order_by('position').first()
+        endpoints = [
+            ('board snapshot', views.BoardSnapshotView, {'pk': board.pk}),
+            ('boards', views.BoardListView, {}),
+            ('board stats', views.BoardStatsView, {'board_id': board.pk}),
+            ('activities', views.BoardActivitiesView, {'board_id': board.pk}),
+            ('invitations', views.BoardInviteView, {'board_id': board.pk}),
+        ]
+        if first_list is not None:
+            endpoints.append(('list tasks', TaskListView, {'list_id': first_list.pk}))
+
+        payloads = []
+        for label, view, kwargs in endpoints:
+            request = factory.get('/')
+            force_authenticate(request, user=board.owner)
+            response = view.as_view()(request, **kwargs)
+            if response.status_code != 200:
+                raise CommandError(f"{label}: the endpoint answered {response.status_code}.")
+            payloads.append((label, response.data))
+        return payloads
+
+    def measure(self, call, repeat):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            call()
+        return (time.perf_counter() - started) * 1000 / max(repeat, 1)
+
+    def report(self, label, default, fast):
+        self.stdout.write(
+            f"{label}: DRF {default:.3f} ms, fast {fast:.3f} ms ({default / fast if fast else 0:.1f}x)"
+        )
@@ -0,0 +1,43 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from boards.export import export_ndjson, gzip_stream
+from boards.models import Board
+
+
+class Command(BaseCommand):
+    help = (
+        "Export a board with its lists, tasks, assignments, comments, memberships and "
+        "activities as NDJSON (the format of GET /boards/{id}/export/)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('board', type=int, help="Id of the board to export")
+        parser.add_argument('--output', '-o', help="File to write (default: standard output)")
+        parser.add_argument('--gzip', action='store_true', help="Compress the export with gzip")
+
+    def handle(self, *args, **options):
+        try:
+            board = Board.objects.select_related('owner').get(pk=options['board'])
+        except Board.DoesNotExist:
+            raise CommandError(f"Board {options['board']} does not exist.")
+
+        stream = export_ndjson(board)
+        if options['gzip']:
+            stream = gzip_stream(stream)
+
+        if options['output']:
+            with open(options['output'], 'wb') as handle:
+                written = sum(handle.write(piece) for piece in stream)
+            self.stderr.write(self.style.SUCCESS(
+                f"Exported board {board.pk} to {options['output']} ({written} bytes)."
+            ))
+        elif options['gzip']:
+            for piece in stream:
+                sys.stdout.buffer.write(piece)
+            sys.stdout.buffer.flush()
+        else:
+            # Pieces always end on a line, so they decode on their own
+            for piece in stream:
+                self.stdout.write(piece.decode(), ending='')
@@ -0,0 +1,59 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from boards.importer import BoardImporter, BoardImportError, read_lines
+from boards.models import Board
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Import a board from an export (NDJSON, optionally gzip-compressed) or a CSV of cards "
+        "(the formats of POST /boards/import/)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import")
+        parser.add_argument('--user', required=True, help="Email or id of the user importing the board")
+        parser.add_argument('--board', type=int, help="Add to this board instead of creating one")
+        parser.add_argument('--title', help="Title of the new board (default: the exported title)")
+        parser.add_argument(
+            '--memberships', action='store_true',
+            help="Restore the accepted memberships of an export for users that exist here"
+        )
+
+    def handle(self, *args, **options):
+        lookup = {'pk': options['user']} if options['user'].isdigit() else {'email__iexact': options['user']}
+        try:
+            user = User.objects.get(**lookup)
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['user']} does not exist.")
+
+        board = None
+        if options['board']:
+            try:
+                board = Board.objects.get(pk=options['board'])
+            except Board.DoesNotExist:
+                raise CommandError(f"Board {options['board']} does not exist.")
+
+        def progress(created):
+            self.stderr.write(', '.join(f"{count} {kind}s" for kind, count in created.items()))
+
+        importer = BoardImporter(
+            user, board=board, title=options['title'],
+            accept_memberships=options['memberships'], progress=progress,
+        )
+        try:
+            with open(options['path'], 'rb') as handle:
+                report = importer.run(read_lines(handle))
+        except (OSError, BoardImportError) as error:
+            raise CommandError(str(error))
+
+        for error in report['errors']:
+            self.stderr.write(self.style.WARNING(f"Line {error['line']}: {error['error']}"))
+        created = ', '.join(f"{count} {kind}s" for kind, count in report['created'].items()) or "nothing"
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {created} into board {report['board']} "
+            f"({sum(report['skipped'].values())} skipped, {report['error_count']} errors)."
+        ))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from boards.stats import rebuild_daily_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Recreate the daily board statistics from the current tasks. "
+        "Run it once to backfill boards created before the statistics existed; "
+        "reopened and deleted tasks cannot be recovered and start from zero."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--board', type=int, action='append', help="Only rebuild this board (repeatable)")
+
+    def handle(self, *args, **options):
+        rows = rebuild_daily_stats(options['board'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} daily board statistics."))
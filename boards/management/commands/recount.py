@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from boards.counters import COUNTERS, recount
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the denormalized counters (board members, list tasks, task comments, "
+        "user boards and memberships) and correct the rows that drifted."
+    )
+
+    def handle(self, *args, **options):
+        total = 0
+        for model in COUNTERS:
+            with transaction.atomic():
+                corrected = recount(model)
+            for field, rows in corrected.items():
+                total += rows
+                self.stdout.write(f"{model._meta.label}.{field}: {rows} rows corrected")
+
+        self.stdout.write(self.style.SUCCESS(f"Recounted; {total} counters corrected."))
@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from boards.seed import DEFAULT_PASSWORD, ScaleSeeder, SeedError
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a large synthetic dataset for load and scale testing: users with profiles, boards "
+        "with Zipf-distributed task counts, memberships, lists, tasks with assignees and due dates, "
+        "comments, invitations and activities (see boards/seed.py). The same --seed gives the same data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000, help="Users to create")
+        parser.add_argument('--boards', type=int, help="Boards to create (default: one per two users)")
+        parser.add_argument('--tasks', type=int, default=100_000, help="Tasks over all boards")
+        parser.add_argument('--comments', type=float, default=1.0, help="Average comments per task")
+        parser.add_argument('--zipf', type=float, default=1.1, help="Exponent of the board size distribution")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed")
+        parser.add_argument('--prefix', default='seed', help="Prefix of the usernames and emails")
+        parser.add_argument('--password', default=DEFAULT_PASSWORD, help="Password of every generated user")
+        parser.add_argument('--batch-size', type=int, default=5000, help="Rows per bulk INSERT")
+        parser.add_argument('--no-index', action='store_true',
+                            help="Skip the search documents (run rebuild_search_index later)")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+
+        def progress(created):
+            elapsed = time.perf_counter() - started
+            self.stderr.write(f"{elapsed:7.1f}s  " + ', '.join(f"{count} {name}" for name, count in created.items()))
+
+        try:
+            seeder = ScaleSeeder(
+                users=options['users'], boards=options['boards'], tasks=options['tasks'],
+                comments=options['comments'], exponent=options['zipf'], seed=options['seed'],
+                prefix=options['prefix'], password=options['password'], batch_size=options['batch_size'],
+                index=not options['no_index'], progress=progress,
+            )
+            created = seeder.run()
+        except SeedError as error:
+            raise CommandError(str(error))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {', '.join(f'{count} {name}' for name, count in created.items())} "
+            f"in {time.perf_counter() - started:.1f}s. Users log in as {options['prefix']}-<n>@example.com."
+        ))
@@ -1,10 +1,11 @@
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 import uuid
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from datetime import timedelta
+from core.counters import CounterFieldsMixin
 
 
 # Default expiration for board invitations (7 days from creation)
@@ -14,7 +15,27 @@ def default_invitation_expiry():
     return timezone.now() + timedelta(days=7)
 
 
-class Board(models.Model):
+class BoardQuerySet(models.QuerySet):
+    def bump_version(self):
+        """Increment `version` of the selected boards in a single UPDATE"""
+        return self.update(version=models.F('version') + 1)
+
+    def with_list_data(self, user):
+        """
+        Annotate what `BoardListSerializer` needs so listing boards
+        does not run per-board queries:
+        - current_membership_role: role of `user` on the board, if any
+        Member counts are stored on the board (`members_count`).
+        """
+        role = BoardMembership.objects.filter(
+            board=models.OuterRef('pk'), user=user, status='accepted'
+        ).values('role')[:1]
+        return self.select_related('owner').annotate(
+            current_membership_role=models.Subquery(role),
+        )
+
+
+class Board(CounterFieldsMixin, models.Model):
     title = models.CharField(max_length=255)
     description = models.TextField(max_length=500,null=True,blank=True)
     color = models.CharField(max_length=7,null=True,blank=True)
@@ -23,6 +44,27 @@ class Board(models.Model):
     owner = models.ForeignKey('accounts.CustomUser', on_delete=models.CASCADE, related_name='owned_boards')
     members = models.ManyToManyField('accounts.CustomUser', related_name='member_boards', through='BoardMembership',through_fields=('board', 'user'))
     is_public = models.BooleanField(default=False, verbose_name=_("Public"))
+    # Offered as a starting point for new boards (see boards.duplicate)
+    is_template = models.BooleanField(default=False, verbose_name=_("Template"))
+    # Incremented on every write to the board or its lists, tasks, comments and
+    # memberships; exposed as the ETag of board reads (see core.conditional)
+    version = models.PositiveBigIntegerField(default=1, editable=False)
+    # Accepted memberships (see boards.counters)
+    members_count = models.PositiveIntegerField(default=0, editable=False)
+
+    # `version` is only changed through `bump_version()` and the counters
+    # through `boards.counters`; `save()` never writes back a value that may
+    # be stale on this instance
+    counter_fields = ('version', 'members_count')
+
+    objects = BoardQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of public boards
+            models.Index(fields=['is_public', '-created_at', '-id'], name='board_public_keyset'),
+            models.Index(fields=['is_template', '-created_at', '-id'], name='board_template_keyset'),
+        ]
 
     def clean(self):
         """Validate constraints before saving"""
@@ -30,7 +72,7 @@ class Board(models.Model):
         # Check user board count limit
         if not self.pk:  # Only for creating a new board
             max_boards = getattr(settings, 'MAX_BOARDS_PER_USER', 10)
-            user_boards_count = Board.objects.filter(owner=self.owner).count()
+            user_boards_count = self.owner.boards_count
             
             if user_boards_count >= max_boards:
                 raise ValidationError(
@@ -40,7 +82,7 @@ class Board(models.Model):
     @property
     def active_members_count(self):
         """Number of active board members"""
-        return self.memberships.filter(status='accepted').count()
+        return self.members_count
 
     @property
     def active_members(self):
@@ -50,7 +92,7 @@ class Board(models.Model):
     def can_add_member(self):
         """Check if a new member can be added"""
         max_members = getattr(settings, 'MAX_MEMBERS_PER_BOARD', 50)
-        return self.active_members_count < max_members
+        return self.members_count < max_members
     
     def add_member(self, user, invited_by, role='member'):
         """
@@ -61,12 +103,12 @@ class Board(models.Model):
 
         # بررسی تعداد اعضای بورد
         max_members = getattr(settings, 'MAX_MEMBERS_PER_BOARD', 50)
-        if self.active_members_count >= max_members:
+        if self.members_count >= max_members:
             raise ValidationError(_("This board cannot have more than %(max_members)s members.") % {'max_members': max_members})
 
         # بررسی تعداد Membership های کاربر
         max_memberships = getattr(settings, 'MAX_MEMBERSHIPS_PER_USER', 20)
-        user_memberships_count = BoardMembership.objects.filter(user=user, status='accepted').count()
+        user_memberships_count = user.memberships_count
         if user_memberships_count >= max_memberships:
             raise ValidationError(_("%(username)s has reached the membership limit of %(max_memberships)s boards.") % {'username': user.username, 'max_memberships': max_memberships})
 
@@ -120,11 +162,34 @@ class BoardMembership(models.Model):
     response_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
-    
+    # Board version of the last write to this row; drives delta sync (see boards.changes)
+    change_seq = models.PositiveBigIntegerField(default=0, editable=False)
+
     class Meta:
         unique_together = ['board', 'user']
+        indexes = [
+            # Boards of a user (all_boards, board permission lookups)
+            models.Index(fields=['user', 'status'], name='membership_user_status'),
+            # Members of a board (member counts, member lists)
+            models.Index(fields=['board', 'status'], name='membership_board_status'),
+            models.Index(fields=['board', 'change_seq'], name='membership_board_change_seq'),
+        ]
 
 
+    # Status as stored, so the counters can tell what a save changes
+    stored_status = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.stored_status = instance.__dict__.get('status')
+        return instance
+
+    @property
+    def counted(self):
+        """Whether the stored row is included in the member counters"""
+        return self.stored_status == 'accepted'
+
     def clean(self):
         """Validate constraints before saving"""
         super().clean()
@@ -134,19 +199,14 @@ class BoardMembership(models.Model):
             max_members = getattr(settings, 'MAX_MEMBERS_PER_BOARD', 50)
             max_memberships = getattr(settings, 'MAX_MEMBERSHIPS_PER_USER', 20)
 
-            board_members_count = BoardMembership.objects.filter(
-                board=self.board,
-                status='accepted'
-            ).exclude(pk=self.pk).count()
+            # Counters without this membership
+            board_members_count = self.board.members_count - self.counted
             if board_members_count >= max_members:
                 raise ValidationError(
                     _("This board cannot have more than %(max_members)s members.") % {'max_members': max_members}
                 )
 
-            user_memberships_count = BoardMembership.objects.filter(
-                user=self.user,
-                status='accepted'
-            ).exclude(pk=self.pk).count()
+            user_memberships_count = self.user.memberships_count - self.counted
             if user_memberships_count >= max_memberships:
                 raise ValidationError(
                     _("You cannot be a member of more than %(max_memberships)s boards.") % {'max_memberships': max_memberships}
@@ -159,10 +219,7 @@ class BoardMembership(models.Model):
         max_memberships = getattr(settings, 'MAX_MEMBERSHIPS_PER_USER', 20)
         
         # Check board member limit
-        board_members_count = BoardMembership.objects.filter(
-            board=self.board,
-            status='accepted'
-        ).count()
+        board_members_count = self.board.members_count
         
         if board_members_count >= max_members:
             raise ValidationError(
@@ -170,10 +227,7 @@ class BoardMembership(models.Model):
             )
         
         # Check user membership limit
-        user_memberships_count = BoardMembership.objects.filter(
-            user=self.user,
-            status='accepted'
-        ).exclude(pk=self.pk).count()
+        user_memberships_count = self.user.memberships_count - self.counted
         
         if user_memberships_count >= max_memberships:
             raise ValidationError(
@@ -192,7 +246,9 @@ class BoardMembership(models.Model):
     
     def save(self, *args, **kwargs):
         self.full_clean()  # Run validation before saving
-        super().save(*args, **kwargs)
+        # Member counters are adjusted by post_save in the same transaction
+        with transaction.atomic(using=kwargs.get('using'), savepoint=False):
+            super().save(*args, **kwargs)
 
     def __str__(self):
         return _("%(username)s - %(board_title)s (%(role)s)") % {
@@ -234,10 +290,7 @@ class BoardInvitation(models.Model):# invitation with email
         if not self.pk:  # Only for new invitation
             # Check board member limit
             max_members = getattr(settings, 'MAX_MEMBERS_PER_BOARD', 50)
-            board_members_count = BoardMembership.objects.filter(
-                board=self.board,
-                status='accepted'
-            ).count()
+            board_members_count = self.board.members_count
             
             if board_members_count >= max_members:
                 raise ValidationError(
@@ -271,18 +324,26 @@ class BoardActivity(models.Model):
         ('leave', _("Leave")),
         ('reject', _("Reject")),
         ('accept', _("Accept")),
-        ('invite', _("Invite"))
+        ('invite', _("Invite")),
+        ('remove', _("Remove")),
+        ('move', _("Move")),
+        ('comment', _("Comment")),
     ]
     
     board = models.ForeignKey('boards.Board', on_delete=models.CASCADE, related_name='activities')
     action = models.CharField(max_length=20, choices=ACTION_CHOICES, default='create')
     user = models.ForeignKey('accounts.CustomUser', on_delete=models.CASCADE, related_name='board_activities',blank=True,null=True)
     description = models.TextField(max_length=255, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Not auto_now_add: entries written in batches keep the time of the action
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination of a board's activity log
+            models.Index(fields=['board', '-created_at', '-id'], name='boardactivity_board_keyset'),
+        ]
        
 
     def __str__(self):
@@ -291,3 +352,89 @@ class BoardActivity(models.Model):
             'action': self.get_action_display(),
             'board_title': self.board.title
         }
+
+
+class Tombstone(models.Model):
+    """
+    Marker left by a hard-deleted list, task, comment or membership so that
+    delta sync clients (see boards.changes) learn about the deletion.
+    """
+    KIND_CHOICES = [
+        ('list', _("List")),
+        ('task', _("Task")),
+        ('comment', _("Comment")),
+        ('member', _("Member")),
+    ]
+
+    board = models.ForeignKey('boards.Board', on_delete=models.CASCADE, related_name='tombstones')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    # Board version of the delete
+    change_seq = models.PositiveBigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['board', 'change_seq'], name='tombstone_board_change_seq'),
+        ]
+
+    def __str__(self):
+        return _("%(kind)s %(object_id)s deleted from board %(board_id)s") % {
+            'kind': self.get_kind_display(),
+            'object_id': self.object_id,
+            'board_id': self.board_id,
+        }
+
+
+class BoardDailyStats(models.Model):
+    """
+    Task throughput of a board on one day, updated incrementally as tasks
+    are created, completed, reopened and deleted (see boards.stats).
+    """
+    board = models.ForeignKey('boards.Board', on_delete=models.CASCADE, related_name='daily_stats')
+    date = models.DateField()
+    created = models.PositiveIntegerField(default=0)
+    completed = models.PositiveIntegerField(default=0)
+    reopened = models.PositiveIntegerField(default=0)
+    # Open tasks deleted; completed ones no longer count towards the burndown
+    deleted = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['date']
+        constraints = [
+            models.UniqueConstraint(fields=['board', 'date'], name='boarddailystats_board_date'),
+        ]
+
+    def __str__(self):
+        return _("%(board_id)s on %(date)s") % {'board_id': self.board_id, 'date': self.date}
+
+
+class BoardDuplication(models.Model):
+    """
+    A copy of a board too large to make within the request, run by Celery
+    (see boards.tasks.duplicate_board_job) and polled by its user.
+    """
+    STATUS_CHOICES = [
+        ('pending', _("Pending")),
+        ('running', _("Running")),
+        ('done', _("Done")),
+        ('failed', _("Failed")),
+    ]
+
+    source = models.ForeignKey('boards.Board', on_delete=models.SET_NULL, null=True, related_name='duplications')
+    user = models.ForeignKey('accounts.CustomUser', on_delete=models.CASCADE, related_name='board_duplications')
+    # Options of the copy, as passed to `duplicate_board()`
+    title = models.CharField(max_length=255)
+    include_tasks = models.BooleanField(default=True)
+    include_assignments = models.BooleanField(default=False)
+    as_template = models.BooleanField(default=False)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    board = models.ForeignKey('boards.Board', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return _("Copy of %(source_id)s (%(status)s)") % {
+            'source_id': self.source_id, 'status': self.get_status_display()
+        }
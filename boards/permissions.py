@@ -0,0 +1,139 @@
+"""
+Board permission resolution.
+
+`BoardAccess` loads the role of one user on every board they can access
+(owner, or accepted admin/member) with a single query, then answers every
+permission check with a dict lookup. Views get the instance memoized on the
+current request through `board_access(request)`.
+
+When `BOARD_ACCESS_CACHE_TIMEOUT` is set, the roles are also kept in the
+Django cache between requests; board and membership signals invalidate them.
+The signals only reach the cache of the process that made the change, so the
+setting is ignored (with a warning) unless the default cache is shared by
+every process: with the per-process LocMemCache a removed member would keep
+access through the other workers until the timeout.
+"""
+import logging
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import models
+
+from .models import Board, BoardMembership
+
+OWNER = 'owner'
+ADMIN = 'admin'
+MEMBER = 'member'
+
+MANAGER_ROLES = (OWNER, ADMIN)
+
+logger = logging.getLogger(__name__)
+_warned_local_cache = False
+
+
+def _cache_key(user_id):
+    return f'board-access:{user_id}'
+
+
+def _cache_timeout():
+    global _warned_local_cache
+    timeout = getattr(settings, 'BOARD_ACCESS_CACHE_TIMEOUT', 0)
+    if timeout and isinstance(caches['default'], LocMemCache):
+        if not _warned_local_cache:
+            _warned_local_cache = True
+            logger.warning("BOARD_ACCESS_CACHE_TIMEOUT is ignored: the default cache is local to each process.")
+        return 0
+    return timeout
+
+
+def invalidate_board_access(user_id):
+    """Drop the cross-request cached roles of a user"""
+    if _cache_timeout():
+        cache.delete(_cache_key(user_id))
+
+
+def board_roles_query(user):
+    """
+    `(board id, role)` rows of the boards `user` owns (role OWNER) or is an
+    accepted member of: two index lookups combined with UNION ALL
+    """
+    owned = Board.objects.filter(owner=user).values_list(
+        'id', models.Value(OWNER, output_field=models.CharField())
+    )
+    joined = BoardMembership.objects.filter(user=user, status='accepted').values_list('board_id', 'role')
+    return owned.union(joined, all=True)
+
+
+def load_board_roles(user):
+    """Map board id -> role for every board `user` owns or is an accepted member of"""
+    roles = {}
+    for board_id, role in board_roles_query(user):
+        # Ownership wins over a membership row on the same board
+        if role == OWNER or board_id not in roles:
+            roles[board_id] = role
+    return roles
+
+
+class BoardAccess:
+    """Permission checks of one user against any board, from a preloaded role map"""
+
+    def __init__(self, user):
+        self.user = user
+        self._roles = None
+
+    @property
+    def roles(self):
+        if self._roles is None:
+            self._roles = self._load_roles()
+        return self._roles
+
+    def _load_roles(self):
+        timeout = _cache_timeout()
+        if not timeout:
+            return load_board_roles(self.user)
+        key = _cache_key(self.user.pk)
+        roles = cache.get(key)
+        if roles is None:
+            roles = load_board_roles(self.user)
+            cache.set(key, roles, timeout)
+        return roles
+
+    def role(self, board):
+        """Role of the user on `board` (a Board or its id), or None"""
+        board_id = getattr(board, 'pk', board)
+        return self.roles.get(board_id)
+
+    def board_ids(self):
+        """Ids of every board the user can access"""
+        return list(self.roles)
+
+    def can_view(self, board):
+        return self.role(board) is not None
+
+    def can_manage(self, board):
+        """Owner or admin"""
+        return self.role(board) in MANAGER_ROLES
+
+    def is_owner(self, board):
+        return self.role(board) == OWNER
+
+    def get_board(self, pk, queryset=None):
+        """
+        Fetch an accessible board.
+        Raises `Board.DoesNotExist` for missing boards and boards the user cannot access.
+        """
+        if not self.can_view(pk):
+            raise Board.DoesNotExist
+        if queryset is None:
+            queryset = Board.objects.all()
+        return queryset.get(pk=pk)
+
+
+def board_access(request):
+    """`BoardAccess` of the request's user, created once per request"""
+    access = getattr(request, '_board_access', None)
+    if access is None or access.user != request.user:
+        access = BoardAccess(request.user)
+        request._board_access = access
+    return access
@@ -0,0 +1,308 @@
+"""
+Synthetic data for load and scale testing (`manage.py seed_scale`).
+
+Generates users with profiles, boards whose task counts follow a Zipf
+distribution (a few large boards, a long tail of small ones), accepted and
+pending memberships within `MAX_MEMBERS_PER_BOARD` and
+`MAX_MEMBERSHIPS_PER_USER`, owners within `MAX_BOARDS_PER_USER`, lists,
+tasks with assignees, due dates and completions, comments, invitations and
+activities.
+
+Every choice comes from one `random.Random(seed)`: the same options give the
+same rows (invitation tokens aside). Ownership and memberships are planned before anything is written,
+so counters are written with the rows. Everything else is written with
+`bulk_create` in batches, a group of boards at a time, skipping `full_clean()`
+and the model signals (default lists, profiles, counters, delta sync, daily
+statistics, search index). What those would have written is written
+alongside: rows are stamped with the initial board version, and the daily
+statistics and search documents are inserted in bulk.
+"""
+import math
+import random
+from collections import Counter
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import Profile
+from boards.models import Board, BoardActivity, BoardDailyStats, BoardInvitation, BoardMembership
+from core.ranking import RANK_GAP
+from lists.models import List
+from tasks.models import Task, TaskComment
+
+User = get_user_model()
+
+DEFAULT_PASSWORD = 'Seed-pass-2024!'
+# Version of a new board; generated rows are stamped with it for delta sync
+INITIAL_VERSION = 1
+
+WORDS = (
+    'api', 'backlog', 'billing', 'bug', 'cache', 'checkout', 'client', 'dashboard', 'database', 'deploy',
+    'design', 'docs', 'email', 'export', 'feedback', 'import', 'invoice', 'login', 'mobile', 'onboarding',
+    'payment', 'release', 'report', 'search', 'security', 'settings', 'signup', 'sprint', 'support', 'tests',
+)
+VERBS = ('Add', 'Review', 'Fix', 'Update', 'Refactor', 'Document', 'Test', 'Plan', 'Migrate', 'Remove')
+LIST_TITLES = ('Backlog', 'Todo', 'Doing', 'Review', 'Blocked', 'Done', 'Archive')
+PRIORITIES = (('low', 30), ('medium', 40), ('high', 20), ('urgent', 10))
+
+
+class SeedError(ValueError):
+    """The data cannot be generated with these options"""
+
+
+def zipf_sizes(total, count, exponent, rng):
+    """`total` split over `count` items in proportion to 1 / rank ** exponent, in random order"""
+    weights = [1 / (rank ** exponent) for rank in range(1, count + 1)]
+    scale = total / sum(weights)
+    sizes = [int(weight * scale) for weight in weights]
+    for index in range(total - sum(sizes)):
+        sizes[index % count] += 1
+    rng.shuffle(sizes)
+    return sizes
+
+
+class ScaleSeeder:
+    """
+    Generate a dataset of `users` users and `boards` boards holding `tasks`
+    tasks in total, with `comments` comments per task on average.
+    `run()` writes it in one transaction and returns the number of rows per model.
+    """
+
+    def __init__(self, users=1000, boards=None, tasks=100_000, comments=1.0, exponent=1.1, seed=0,
+                 prefix='seed', password=DEFAULT_PASSWORD, batch_size=5000, index=True, progress=None):
+        self.max_boards = getattr(settings, 'MAX_BOARDS_PER_USER', 10)
+        self.max_members = getattr(settings, 'MAX_MEMBERS_PER_BOARD', 50)
+        self.max_memberships = getattr(settings, 'MAX_MEMBERSHIPS_PER_USER', 20)
+        if users < 1:
+            raise SeedError("At least one user is needed.")
+        boards = max(1, users // 2) if boards is None else boards
+        if not 1 <= boards <= users * self.max_boards:
+            raise SeedError(f"{users} users can own between 1 and {users * self.max_boards} boards "
+                            f"(MAX_BOARDS_PER_USER = {self.max_boards}).")
+
+        self.users_count = users
+        self.boards_count = boards
+        self.tasks_count = max(0, tasks)
+        self.comments = max(0.0, comments)
+        self.exponent = exponent
+        self.rng = random.Random(seed)
+        self.prefix = prefix
+        self.password = password
+        self.batch_size = max(1, batch_size)
+        self.index = index and apps.is_installed('search')
+        self.progress = progress
+        self.now = timezone.now()
+        self.created = Counter()
+
+    def run(self):
+        if User.objects.filter(username__startswith=f'{self.prefix}-').exists():
+            raise SeedError(f"Users named {self.prefix}-* already exist; choose another prefix.")
+        with transaction.atomic():
+            plan = self.plan_boards()
+            users = self.write_users(plan)
+            boards = self.write_boards(plan, users)
+            group, group_tasks = [], 0
+            for board, spec in zip(boards, plan):
+                group.append((board, spec))
+                group_tasks += spec['tasks']
+                if group_tasks >= self.batch_size:
+                    self.write_content(group, users)
+                    group, group_tasks = [], 0
+            if group:
+                self.write_content(group, users)
+        return dict(self.created)
+
+    # Planning: owners, members and sizes, by user index
+
+    def plan_boards(self):
+        rng = self.rng
+        owned = [0] * self.users_count
+        joined = [0] * self.users_count
+        plan = []
+        for tasks in zipf_sizes(self.tasks_count, self.boards_count, self.exponent, rng):
+            owner = rng.randrange(self.users_count)
+            while owned[owner] >= self.max_boards:
+                owner = (owner + 1) % self.users_count
+            owned[owner] += 1
+
+            # Larger boards have more members
+            wanted = min(self.max_members, self.users_count - 1, 1 + int(math.sqrt(tasks)) // 2 + rng.randrange(3))
+            members = {}
+            for _attempt in range(wanted * 4):
+                if len(members) >= wanted:
+                    break
+                user = rng.randrange(self.users_count)
+                if user == owner or user in members:
+                    continue
+                status = 'pending' if rng.random() < 0.1 else 'accepted'
+                if status == 'accepted':
+                    if joined[user] >= self.max_memberships:
+                        continue
+                    joined[user] += 1
+                members[user] = (status, 'admin' if rng.random() < 0.15 else 'member')
+            plan.append({'owner': owner, 'members': members, 'tasks': tasks})
+        self.owned, self.joined = owned, joined
+        return plan
+
+    # Writing
+
+    def write_users(self, plan):
+        rng = self.rng
+        password = make_password(self.password)
+        users = self.bulk_create(User, [
+            User(username=f'{self.prefix}-{index}', email=f'{self.prefix}-{index}@example.com',
+                 first_name=rng.choice(VERBS), last_name=rng.choice(WORDS).title(), password=password,
+                 is_active=True, email_verified_at=self.now,
+                 boards_count=self.owned[index], memberships_count=self.joined[index])
+            for index in range(self.users_count)
+        ])
+        self.bulk_create(Profile, [
+            Profile(user=user, bio=f"Works on {rng.choice(WORDS)} and {rng.choice(WORDS)}",
+                    preferred_language='fa' if rng.random() < 0.2 else 'en')
+            for user in users
+        ])
+        self.report()
+        return users
+
+    def write_boards(self, plan, users):
+        rng = self.rng
+        boards = self.bulk_create(Board, [
+            Board(title=f'{rng.choice(WORDS).title()} {rng.choice(WORDS)} {index}', owner=users[spec['owner']],
+                  description=f"Synthetic board {index}", is_public=rng.random() < 0.05,
+                  version=INITIAL_VERSION,
+                  members_count=sum(status == 'accepted' for status, _role in spec['members'].values()))
+            for index, spec in enumerate(plan)
+        ])
+        self.bulk_create(BoardMembership, [
+            BoardMembership(board=board, user=users[user], invited_by=users[spec['owner']], status=status,
+                            role=role, response_at=self.now if status == 'accepted' else None,
+                            change_seq=INITIAL_VERSION)
+            for board, spec in zip(boards, plan)
+            for user, (status, role) in sorted(spec['members'].items())
+        ])
+        if self.index:
+            self.index_documents(boards)
+        self.report()
+        return boards
+
+    def write_content(self, group, users):
+        """Lists, tasks, assignments, comments, invitations, activities and statistics of boards"""
+        rng = self.rng
+        today = timezone.localdate(self.now)
+
+        lists, tasks, participants = [], [], {}
+        for board, spec in group:
+            # The owner and accepted members can be assigned and comment (see Task.validate_assignees)
+            members = [users[user] for user, (status, _role) in sorted(spec['members'].items()) if status == 'accepted']
+            people = [users[spec['owner']]] + members
+            participants[board.pk] = people
+            board_lists = [
+                List(board=board, title=title, position=position, rank=position * RANK_GAP,
+                     color=rng.choice(('blue', 'green', 'red', 'yellow', 'purple')), change_seq=INITIAL_VERSION)
+                for position, title in enumerate(LIST_TITLES[:3 + rng.randrange(5)], start=1)
+            ]
+            lists += board_lists
+            positions = Counter()
+            for _index in range(spec['tasks']):
+                list_obj = rng.choice(board_lists)
+                positions[list_obj.title] += 1
+                position = positions[list_obj.title]
+                completed = rng.random() < 0.3
+                task = Task(
+                    list=list_obj, title=f'{rng.choice(VERBS)} {rng.choice(WORDS)} {rng.choice(WORDS)}',
+                    description=(f"Synthetic task about {rng.choice(WORDS)}" if rng.random() < 0.6 else ''),
+                    priority=rng.choices([name for name, _weight in PRIORITIES],
+                                         [weight for _name, weight in PRIORITIES])[0],
+                    due_date=today + timedelta(days=rng.randrange(-30, 60)) if rng.random() < 0.7 else None,
+                    position=position, rank=position * RANK_GAP, is_completed=completed,
+                    completed_at=self.now - timedelta(seconds=rng.randrange(60 * 86400)) if completed else None,
+                    created_by=rng.choice(people), change_seq=INITIAL_VERSION,
+                )
+                task.comments_count = self.comments_for(rng)
+                list_obj.tasks_count += 1
+                list_obj.completed_tasks_count += completed
+                tasks.append(task)
+        self.bulk_create(List, lists)
+        self.bulk_create(Task, tasks)
+
+        Assignment = Task.assigned_to.through
+        assignments, comments, activities = [], [], []
+        for task in tasks:
+            board_id = task.list.board_id
+            people = participants[board_id]
+            for user in rng.sample(people, min(len(people), rng.choices((0, 1, 2, 3), (25, 50, 20, 5))[0])):
+                assignments.append(Assignment(task_id=task.pk, customuser_id=user.pk))
+            activities.append(BoardActivity(board_id=board_id, action='create', user_id=task.created_by_id,
+                                            description=f"{task.created_by} created task '{task.title}'",
+                                            created_at=self.past(rng)))
+            for _index in range(task.comments_count):
+                author = rng.choice(people)
+                comments.append(TaskComment(task=task, user_id=author.pk, change_seq=INITIAL_VERSION,
+                                            content=f"{rng.choice(VERBS)} the {rng.choice(WORDS)} first?"))
+                activities.append(BoardActivity(board_id=board_id, action='comment', user_id=author.pk,
+                                                description=f"{author} commented on task '{task.title}'",
+                                                created_at=self.past(rng)))
+        self.bulk_create(Assignment, assignments)
+        self.bulk_create(TaskComment, comments)
+        self.bulk_create(BoardActivity, activities)
+
+        invitations = []
+        for board, spec in group:
+            for index in range(rng.choices((0, 1, 2, 3), (60, 25, 10, 5))[0]):
+                invitations.append(BoardInvitation(
+                    board=board, invited_by=users[spec['owner']], role='member',
+                    invited_email=f'{self.prefix}-guest-{board.pk}-{index}@example.com',
+                ))
+        self.bulk_create(BoardInvitation, invitations)
+
+        self.write_daily_stats(tasks, today)
+        if self.index:
+            self.index_documents(lists, tasks, comments)
+        self.report()
+
+    def write_daily_stats(self, tasks, today):
+        """The rows `boards.stats` keeps: tasks created today and completed per day"""
+        rows = {}
+        for task in tasks:
+            board_id = task.list.board_id
+            rows.setdefault((board_id, today), BoardDailyStats(board_id=board_id, date=today)).created += 1
+            if task.is_completed:
+                day = timezone.localdate(task.completed_at)
+                rows.setdefault((board_id, day), BoardDailyStats(board_id=board_id, date=day)).completed += 1
+        self.bulk_create(BoardDailyStats, rows.values())
+
+    def index_documents(self, *objects):
+        from search.signals import document_for, index_documents
+
+        documents = [document_for(instance) for instances in objects for instance in instances]
+        for start in range(0, len(documents), self.batch_size):
+            index_documents(documents[start:start + self.batch_size])
+
+    # Helpers
+
+    def comments_for(self, rng):
+        """Comments of one task: geometric with mean `comments`"""
+        if not self.comments:
+            return 0
+        keep = self.comments / (1 + self.comments)
+        count = 0
+        while rng.random() < keep:
+            count += 1
+        return count
+
+    def past(self, rng, days=90):
+        return self.now - timedelta(seconds=rng.randrange(days * 86400))
+
+    def bulk_create(self, model, objects):
+        objects = model.objects.bulk_create(list(objects), batch_size=self.batch_size)
+        self.created[model._meta.model_name] += len(objects)
+        return objects
+
+    def report(self):
+        if self.progress:
+            self.progress(dict(self.created))
@@ -1,7 +1,8 @@
 from rest_framework import serializers
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth import get_user_model
-from .models import Board, BoardMembership, BoardInvitation, BoardActivity
+from .models import Board, BoardMembership, BoardInvitation, BoardActivity, BoardDuplication
+from .permissions import board_access
 from .utils import check_user_board_limit, check_board_member_limit, check_user_membership_limit
 from rest_framework.validators import UniqueTogetherValidator
 from django.db.models import Q
@@ -40,14 +41,12 @@ class BoardListSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Board
-        fields = ['id', 'title', 'description', 'color', 'is_public', 'owner_username', 
+        fields = ['id', 'title', 'description', 'color', 'is_public', 'is_template', 'owner_username', 
                  'members_count', 'current_user_role', 'created_at', 'updated_at']
     
     def get_members_count(self, obj):
-        """Calculate active board member count"""
-        return obj.active_members_count
-
-
+        """Active board member count"""
+        return obj.members_count
 
     def get_current_user_role(self, obj):
         request = self.context.get('request')
@@ -56,10 +55,9 @@ class BoardListSerializer(serializers.ModelSerializer):
         user = request.user
         if obj.owner_id == user.id:
             return 'owner'
-        membership = obj.memberships.filter(user=user, status='accepted').first()
-        if membership:
-            return membership.role
-        return None
+        if hasattr(obj, 'current_membership_role'):
+            return obj.current_membership_role
+        return board_access(request).role(obj)
 
 
 class BoardDetailSerializer(serializers.ModelSerializer):
@@ -76,12 +74,12 @@ class BoardDetailSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Board
-        fields = ['id', 'title', 'description', 'color', 'is_public', 'owner', 
+        fields = ['id', 'title', 'description', 'color', 'is_public', 'is_template', 'owner', 
                  'members', 'members_count', 'can_add_member', 'created_at', 'updated_at']
     
     def get_members_count(self, obj):
-        """Calculate active board member count"""
-        return obj.active_members_count
+        """Active board member count"""
+        return obj.members_count
     
     def get_can_add_member(self, obj):
         """Check if a new member can be added to the board"""
@@ -98,7 +96,7 @@ class BoardCreateSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Board
-        fields = ['title', 'description', 'color', 'is_public']
+        fields = ['title', 'description', 'color', 'is_public', 'is_template']
     
     def validate(self, attrs):
         """
@@ -131,7 +129,31 @@ class BoardUpdateSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Board
-        fields = ['title', 'description', 'color', 'is_public']
+        fields = ['title', 'description', 'color', 'is_public', 'is_template']
+
+
+class BoardDuplicateSerializer(serializers.Serializer):
+    """
+    Serializer for the options of a board copy.
+    - Title defaults to the source board's title.
+    - Tasks are copied by default, the user's own assignments only on request.
+    - `as_template` flags the copy as a template.
+    """
+    title = serializers.CharField(max_length=255, required=False)
+    include_tasks = serializers.BooleanField(default=True)
+    include_assignments = serializers.BooleanField(default=False)
+    as_template = serializers.BooleanField(default=False)
+
+
+class BoardDuplicationSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the status of a board copy running in the background.
+    - `board` is the id of the copy once `status` is `done`.
+    """
+
+    class Meta:
+        model = BoardDuplication
+        fields = ['id', 'source', 'title', 'status', 'board', 'error', 'created_at', 'finished_at']
 
 
 class BoardMembershipSerializer(serializers.ModelSerializer):
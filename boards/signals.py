@@ -1,9 +1,19 @@
+from django.contrib.auth import get_user_model
 from django.db import transaction
+from django.db.models import F, QuerySet, Value
+from django.db.models.functions import Greatest
 from django.dispatch import receiver
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
 from django.utils.translation import gettext_lazy as _
-from boards.models import Board
+from boards.archive import delete_archives
+from boards.changes import deleted_in_bulk, record_change, record_deletion, stamp_changes
+from boards.counters import add, adjust, deleted_with
+from boards.stats import record_task_stats
+from boards.events import publish_event
+from boards.models import Board, BoardMembership, BoardActivity
+from boards.permissions import invalidate_board_access
 from lists.models import List
+from tasks.models import Task, TaskComment
 
 
 @receiver(post_save, sender=Board)
@@ -23,3 +33,270 @@ def create_default_lists(sender, instance, created, **kwargs):
 
 
 
+
+
+@receiver([post_save, post_delete], sender=BoardMembership)
+def invalidate_member_board_access(sender, instance, **kwargs):
+    """Drop the cached board roles of a user whose membership changed."""
+    invalidate_board_access(instance.user_id)
+
+
+@receiver(post_delete, sender=Board)
+def delete_activity_archives(sender, instance, **kwargs):
+    """Archived activities go with their board, like the live ones."""
+    board_id = instance.pk
+    transaction.on_commit(lambda: delete_archives(board_id))
+
+
+@receiver([post_save, post_delete], sender=Board)
+def invalidate_owner_board_access(sender, instance, **kwargs):
+    """Drop the cached board roles of the owner of a created, changed or deleted board."""
+    invalidate_board_access(instance.owner_id)
+
+
+# Board versions (ETags of board reads) and delta sync (see boards.changes).
+# Saves bump the board version and stamp the row with it. Direct deletes
+# (of the instance or a QuerySet of the model) leave a tombstone; rows removed
+# by a cascade go with their parent, which clients drop as a whole. Callers of
+# bulk QuerySet updates bump and stamp the affected rows themselves, and so do
+# callers of `delete_in_bulk` for the deleted rows.
+
+def _deleted_directly(sender, instance, origin):
+    if deleted_in_bulk(origin):
+        return False
+    return origin is instance or (isinstance(origin, QuerySet) and origin.model is sender)
+
+
+@receiver(post_save, sender=Board)
+def bump_board_version(sender, instance, created, **kwargs):
+    if not created:
+        Board.objects.filter(pk=instance.pk).bump_version()
+
+
+@receiver(post_save, sender=List)
+@receiver(post_save, sender=BoardMembership)
+@receiver(post_save, sender=Task)
+@receiver(post_save, sender=TaskComment)
+def record_board_content_change(sender, instance, **kwargs):
+    record_change(instance)
+
+
+@receiver(post_delete, sender=List)
+def record_list_deletion(sender, instance, origin=None, **kwargs):
+    if _deleted_directly(sender, instance, origin):
+        record_deletion('list', instance, instance.board_id)
+
+
+@receiver(post_delete, sender=BoardMembership)
+def record_membership_deletion(sender, instance, origin=None, **kwargs):
+    if _deleted_directly(sender, instance, origin):
+        record_deletion('member', instance, instance.board_id)
+
+
+@receiver(post_delete, sender=Task)
+def record_task_deletion(sender, instance, origin=None, **kwargs):
+    if _deleted_directly(sender, instance, origin):
+        record_deletion('task', instance, instance.list.board_id)
+
+
+@receiver(post_delete, sender=TaskComment)
+def record_comment_deletion(sender, instance, origin=None, **kwargs):
+    if _deleted_directly(sender, instance, origin):
+        record_deletion('comment', instance, instance.task.list.board_id)
+
+
+@receiver(m2m_changed, sender=Task.assigned_to.through)
+def validate_assignment(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_add' and not reverse and pk_set:
+        instance.validate_assignees(pk_set)
+
+
+@receiver(m2m_changed, sender=Task.assigned_to.through)
+def record_assignment_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == 'pre_clear':
+        # clear() from the user side does not pass the task ids
+        Board.objects.filter(lists__tasks__assigned_to=instance).bump_version()
+        stamp_changes(Task.objects.filter(assigned_to=instance))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        record_change(instance)
+    elif pk_set:
+        Board.objects.filter(lists__tasks__in=pk_set).bump_version()
+        stamp_changes(Task.objects.filter(pk__in=pk_set))
+
+
+# Denormalized counters (see boards.counters)
+
+def _saved_value(instance, field, update_fields, stored):
+    """Value of `field` in the database after a save"""
+    if update_fields is not None and field not in update_fields:
+        return stored
+    return getattr(instance, field)
+
+
+@receiver(post_save, sender=Board)
+def count_owned_board(sender, instance, created, **kwargs):
+    if created:
+        adjust(instance, 'owner', boards_count=1)
+
+
+@receiver(post_delete, sender=Board)
+def uncount_owned_board(sender, instance, origin=None, **kwargs):
+    if not deleted_with(origin, get_user_model()):
+        adjust(instance, 'owner', boards_count=-1)
+
+
+@receiver(post_save, sender=BoardMembership)
+def count_membership(sender, instance, created, update_fields=None, **kwargs):
+    status = _saved_value(instance, 'status', update_fields, instance.stored_status)
+    delta = (status == 'accepted') - instance.counted
+    if delta:
+        adjust(instance, 'board', members_count=delta)
+        adjust(instance, 'user', memberships_count=delta)
+    instance.stored_status = status
+
+
+@receiver(post_delete, sender=BoardMembership)
+def uncount_membership(sender, instance, origin=None, **kwargs):
+    if instance.counted:
+        if not deleted_with(origin, Board):
+            adjust(instance, 'board', members_count=-1)
+        # Members of a deleted board are counted down by uncount_board_members
+        if not deleted_with(origin, Board, get_user_model()):
+            adjust(instance, 'user', memberships_count=-1)
+
+
+@receiver(pre_delete, sender=Board)
+def uncount_board_members(sender, instance, **kwargs):
+    """Count down the memberships of all the members of a deleted board in one UPDATE"""
+    get_user_model().objects.filter(memberships__board=instance, memberships__status='accepted').update(
+        memberships_count=Greatest(F('memberships_count') - 1, Value(0))
+    )
+
+
+@receiver(post_save, sender=Task)
+def count_task(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        stored_list, stored_completed = None, False
+    elif instance.stored_counts is None:
+        # Loaded without list or completion state; left to `recount`
+        return
+    else:
+        stored_list, stored_completed = instance.stored_counts
+    list_id = instance.list_id if update_fields is None or 'list' in update_fields else stored_list
+    is_completed = _saved_value(instance, 'is_completed', update_fields, stored_completed)
+
+    if list_id != stored_list:
+        add(List, stored_list, tasks_count=-1, completed_tasks_count=-stored_completed)
+        adjust(instance, 'list', tasks_count=1, completed_tasks_count=int(is_completed))
+    elif is_completed != stored_completed:
+        adjust(instance, 'list', completed_tasks_count=1 if is_completed else -1)
+    instance.stored_counts = (list_id, is_completed)
+
+    # Daily board stats (see boards.stats)
+    if created:
+        record_task_stats(instance.list.board_id, created=1, completed=int(is_completed))
+    elif is_completed != stored_completed:
+        record_task_stats(instance.list.board_id, **{'completed' if is_completed else 'reopened': 1})
+
+
+@receiver(post_delete, sender=Task)
+def uncount_task(sender, instance, origin=None, **kwargs):
+    if not deleted_with(origin, List, Board) and not deleted_in_bulk(origin):
+        adjust(instance, 'list', tasks_count=-1, completed_tasks_count=-instance.is_completed)
+        if not instance.is_completed:
+            record_task_stats(instance.list.board_id, deleted=1)
+
+
+@receiver(post_delete, sender=List)
+def record_deleted_list_stats(sender, instance, origin=None, **kwargs):
+    # One entry for the open tasks removed with the list, from its counters
+    if not deleted_with(origin, Board):
+        record_task_stats(instance.board_id, deleted=instance.tasks_count - instance.completed_tasks_count)
+
+
+@receiver(post_save, sender=TaskComment)
+def count_comment(sender, instance, created, **kwargs):
+    if created:
+        adjust(instance, 'task', comments_count=1)
+
+
+@receiver(post_delete, sender=TaskComment)
+def uncount_comment(sender, instance, origin=None, **kwargs):
+    if not deleted_with(origin, Task, List, Board):
+        adjust(instance, 'task', comments_count=-1)
+
+
+# Change feed events (see boards.events)
+
+def _saved(created):
+    return 'created' if created else 'updated'
+
+
+@receiver(post_delete, sender=Board)
+def publish_board_deleted(sender, instance, **kwargs):
+    # Its lists, tasks and memberships go with it without events of their own
+    publish_event(instance.pk, 'board', 'deleted', instance)
+
+
+@receiver(post_save, sender=Task)
+def publish_task_saved(sender, instance, created, **kwargs):
+    publish_event(
+        instance.list.board_id, 'task', _saved(created), instance,
+        list=instance.list_id, title=instance.title, is_completed=instance.is_completed,
+    )
+
+
+@receiver(post_delete, sender=Task)
+def publish_task_deleted(sender, instance, origin=None, **kwargs):
+    if not _deleted_directly(sender, instance, origin):
+        # Covered by the event of the deleted parent
+        return
+    publish_event(instance.list.board_id, 'task', 'deleted', instance, list=instance.list_id)
+
+
+@receiver(post_save, sender=List)
+def publish_list_saved(sender, instance, created, **kwargs):
+    publish_event(instance.board_id, 'list', _saved(created), instance, title=instance.title)
+
+
+@receiver(post_delete, sender=List)
+def publish_list_deleted(sender, instance, origin=None, **kwargs):
+    if _deleted_directly(sender, instance, origin):
+        publish_event(instance.board_id, 'list', 'deleted', instance)
+
+
+@receiver(post_save, sender=TaskComment)
+def publish_comment_saved(sender, instance, created, **kwargs):
+    publish_event(instance.task.list.board_id, 'comment', _saved(created), instance, task=instance.task_id)
+
+
+@receiver(post_delete, sender=TaskComment)
+def publish_comment_deleted(sender, instance, origin=None, **kwargs):
+    if _deleted_directly(sender, instance, origin):
+        publish_event(instance.task.list.board_id, 'comment', 'deleted', instance, task=instance.task_id)
+
+
+@receiver(post_save, sender=BoardMembership)
+def publish_membership_saved(sender, instance, created, **kwargs):
+    publish_event(
+        instance.board_id, 'membership', _saved(created), instance,
+        user=instance.user_id, role=instance.role, status=instance.status,
+    )
+
+
+@receiver(post_delete, sender=BoardMembership)
+def publish_membership_deleted(sender, instance, origin=None, **kwargs):
+    if _deleted_directly(sender, instance, origin):
+        publish_event(instance.board_id, 'membership', 'deleted', instance, user=instance.user_id)
+
+
+@receiver(post_save, sender=BoardActivity)
+def publish_activity_created(sender, instance, created, **kwargs):
+    if created:
+        publish_event(
+            instance.board_id, 'activity', 'created', instance,
+            activity=instance.action, user=instance.user_id, description=str(instance.description),
+        )
@@ -0,0 +1,143 @@
+"""
+Board statistics.
+
+Current breakdowns are computed from the stored list counters (see
+boards.counters) and grouped aggregates over the tasks of one board. The
+daily time series is read from `BoardDailyStats`, which `boards.signals`
+updates with an `F()` UPDATE whenever a task is created, completed,
+reopened or deleted, so charts never aggregate the task history.
+The number of open tasks at the end of each day is derived backwards from
+the current count.
+"""
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from boards.models import BoardDailyStats
+from lists.models import List
+from tasks.models import Task
+
+STATS_FIELDS = ('created', 'completed', 'reopened', 'deleted')
+
+
+def record_task_stats(board_id, **deltas):
+    """Add `deltas` (see `STATS_FIELDS`) to today's row of a board"""
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    rows = BoardDailyStats.objects.filter(board_id=board_id, date=timezone.localdate())
+    increments = {field: F(field) + delta for field, delta in deltas.items()}
+    if rows.update(**increments):
+        return
+    try:
+        with transaction.atomic():
+            BoardDailyStats.objects.create(board_id=board_id, date=timezone.localdate(), **deltas)
+    except IntegrityError:
+        # Created concurrently by another transaction
+        rows.update(**increments)
+
+
+def rebuild_daily_stats(board_ids=None):
+    """
+    Recreate the daily rows from the current tasks: created per creation
+    date, completed per completion date. Reopens and deletes are not
+    recoverable from the tasks and start from zero.
+    """
+    tasks = Task.objects.all()
+    stats = BoardDailyStats.objects.all()
+    if board_ids is not None:
+        tasks = tasks.filter(list__board_id__in=board_ids)
+        stats = stats.filter(board_id__in=board_ids)
+
+    rows = {}
+    for field, date_field, filters in (('created', 'created_at', {}),
+                                       ('completed', 'completed_at', {'is_completed': True})):
+        counts = (tasks.filter(**filters).annotate(day=TruncDate(date_field)).order_by()
+                  .values_list('list__board_id', 'day').annotate(total=Count('pk')))
+        for board_id, day, total in counts:
+            if day is not None:
+                row = rows.setdefault((board_id, day), BoardDailyStats(board_id=board_id, date=day))
+                setattr(row, field, total)
+
+    with transaction.atomic():
+        stats.delete()
+        BoardDailyStats.objects.bulk_create(rows.values(), batch_size=1000)
+    return len(rows)
+
+
+def board_stats(board_id, days=30):
+    """Statistics of a board with a time series of the last `days` days"""
+    today = timezone.localdate()
+
+    lists = [
+        {'id': list_id, 'title': title, 'tasks': tasks, 'completed': completed, 'open': tasks - completed}
+        for list_id, title, tasks, completed in List.objects.filter(board_id=board_id).in_display_order()
+        .values_list('id', 'title', 'tasks_count', 'completed_tasks_count')
+    ]
+    total = sum(row['tasks'] for row in lists)
+    completed = sum(row['completed'] for row in lists)
+
+    open_q = Q(is_completed=False)
+    priorities = {
+        row['priority']: row for row in
+        Task.objects.filter(list__board_id=board_id).order_by().values('priority').annotate(
+            tasks=Count('pk'),
+            open=Count('pk', filter=open_q),
+            overdue=Count('pk', filter=open_q & Q(due_date__lt=today)),
+        )
+    }
+    by_priority = []
+    for priority, _label in Task.PRIORITY_CHOICES:
+        row = priorities.get(priority, {})
+        by_priority.append({'priority': priority, 'tasks': row.get('tasks', 0), 'open': row.get('open', 0)})
+
+    Assignment = Task.assigned_to.through
+    by_assignee = [
+        {'id': row['customuser_id'], 'username': row['customuser__username'],
+         'tasks': row['tasks'], 'open': row['open']}
+        for row in Assignment.objects.filter(task__list__board_id=board_id).order_by()
+        .values('customuser_id', 'customuser__username').annotate(
+            tasks=Count('pk'), open=Count('pk', filter=Q(task__is_completed=False)),
+        ).order_by('-tasks', 'customuser__username')
+    ]
+
+    return {
+        'board': board_id,
+        'tasks': total,
+        'completed': completed,
+        'open': total - completed,
+        'overdue': sum(row.get('overdue', 0) for row in priorities.values()),
+        'lists': lists,
+        'priorities': by_priority,
+        'assignees': by_assignee,
+        'daily': daily_series(board_id, total - completed, today, days),
+    }
+
+
+def daily_series(board_id, open_now, today, days):
+    """One entry per day, oldest first, with the open tasks at the end of the day"""
+    start = today - timedelta(days=days - 1)
+    rows = {
+        row.date: row for row in
+        BoardDailyStats.objects.filter(board_id=board_id, date__gte=start, date__lte=today)
+    }
+
+    open_tasks = open_now
+    series = []
+    for offset in range(days):
+        day = today - timedelta(days=offset)
+        row = rows.get(day)
+        entry = {'date': day.isoformat(), **{field: getattr(row, field, 0) for field in STATS_FIELDS}}
+        entry['open'] = max(open_tasks, 0)
+        series.append(entry)
+        open_tasks -= _open_delta(entry)
+    series.reverse()
+    return series
+
+
+def _open_delta(counts):
+    """Change of the number of open tasks caused by one day's `counts`"""
+    return counts['created'] + counts['reopened'] - counts['completed'] - counts['deleted']
@@ -3,6 +3,7 @@ from django.core.mail import send_mail
 from django.template.loader import render_to_string
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
+from core.metrics import EMAIL_SEND_SECONDS
 
 
 
@@ -40,14 +41,15 @@ def send_registered_invitation_email(self, invitation_id):
             'site_link': site_link,
             'invited_by_name': invitation.invited_by.username,
         })
-        send_mail(
-            subject=_("New board invitation: %(board_title)s") % {'board_title': invitation.board.title},
-            message=plain_message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
-            html_message=html_message,
-            fail_silently=False,
-        )
+        with EMAIL_SEND_SECONDS.time(task=self.name):
+            send_mail(
+                subject=_("New board invitation: %(board_title)s") % {'board_title': invitation.board.title},
+                message=plain_message,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                recipient_list=[user.email],
+                html_message=html_message,
+                fail_silently=False,
+            )
         return _("Notification sent")
     except BoardInvitation.DoesNotExist:
         return _("Invitation does not exist")
@@ -87,14 +89,15 @@ def send_board_invitation_email(self, invitation_id):
         plain_message = render_to_string('emails/board_invitation.txt', context)
         
         # Send email
-        send_mail(
-            subject=_("Invitation to join \"%(board_title)s\" board") % {'board_title': invitation.board.title},
-            message=plain_message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[invitation.invited_email],
-            html_message=html_message,
-            fail_silently=False,
-        )
+        with EMAIL_SEND_SECONDS.time(task=self.name):
+            send_mail(
+                subject=_("Invitation to join \"%(board_title)s\" board") % {'board_title': invitation.board.title},
+                message=plain_message,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                recipient_list=[invitation.invited_email],
+                html_message=html_message,
+                fail_silently=False,
+            )
         
         return _("Email sent successfully to %(email)s") % {'email': invitation.invited_email}
         
@@ -104,3 +107,45 @@ def send_board_invitation_email(self, invitation_id):
     except Exception as exc:
         # Retry the task
         raise self.retry(exc=exc, countdown=60, max_retries=3)
+
+
+@shared_task
+def write_board_activities(entries):
+    """
+    Celery task writing a batch of activity entries queued by
+    `boards.activity.record_activity` with one bulk INSERT.
+    Entries of boards deleted in the meantime are dropped.
+    """
+    from .activity import write_activities
+    from .models import Board
+
+    existing = set(Board.objects.filter(
+        pk__in={entry['board_id'] for entry in entries}
+    ).values_list('pk', flat=True))
+    entries = [entry for entry in entries if entry['board_id'] in existing]
+    if entries:
+        write_activities(entries)
+    return len(entries)
+
+
+@shared_task
+def archive_board_activities():
+    """
+    Periodic Celery task moving activities older than
+    `BOARD_ACTIVITY_RETENTION_DAYS` into the compressed archives.
+    """
+    from .archive import archive_activities
+
+    archived, months = archive_activities()
+    return _("Archived %(count)s activities in %(months)s board-months") % {'count': archived, 'months': months}
+
+
+@shared_task
+def duplicate_board_job(duplication_id):
+    """
+    Celery task copying a board too large to copy within the request
+    (see `boards.duplicate.start_duplication`).
+    """
+    from .duplicate import run_duplication
+
+    run_duplication(duplication_id)
@@ -1,6 +1,9 @@
+import json
+import os
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from django.contrib.auth import get_user_model
+from django.test import tag
 from boards.models import Board, BoardMembership, BoardInvitation
 
 User = get_user_model()
@@ -228,3 +231,1225 @@ class BoardFlowTests(APITestCase):
         # Verify invitation marked as used
         invitation.refresh_from_db()
         self.assertTrue(invitation.is_used)
+
+    def test_board_snapshot_returns_lists_tasks_and_assignees(self):
+        """Board snapshot: lists, tasks and de-duplicated assignees in one response"""
+        from lists.models import List
+        from tasks.models import Task
+
+        board = Board.objects.create(title='Board', owner=self.owner)
+        BoardMembership.objects.create(
+            board=board,
+            user=self.member,
+            role='member',
+            status='accepted',
+            invited_by=self.owner
+        )
+        first_list = board.lists.order_by('position').first()
+        for index in range(3):
+            task = Task.objects.create(title=f'Task {index}', list=first_list, created_by=self.owner)
+            task.assigned_to.add(self.member)
+
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.get(f'/api/v1/boards/{board.id}/snapshot/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['board']['id'], board.id)
+        self.assertEqual([l['id'] for l in response.data['lists']],
+                         list(board.lists.order_by('position').values_list('id', flat=True)))
+        self.assertEqual(len(response.data['lists'][0]['tasks']), 3)
+        self.assertEqual(response.data['lists'][0]['tasks'][0]['assigned_to'], [self.member.id])
+        self.assertEqual([u['id'] for u in response.data['users']], [self.member.id])
+
+        # Non-members get 404
+        self.client.force_authenticate(user=self.non_member)
+        response = self.client.get(f'/api/v1/boards/{board.id}/snapshot/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_board_snapshot_query_count_is_constant(self):
+        """Board snapshot: query count does not grow with lists and tasks"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from lists.models import List
+        from tasks.models import Task
+
+        board = Board.objects.create(title='Board', owner=self.owner)
+        Task.objects.create(title='Task', list=board.lists.first(), created_by=self.owner)
+        self.client.force_authenticate(user=self.owner)
+
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(f'/api/v1/boards/{board.id}/snapshot/')
+
+        for index in range(10):
+            list_obj = List.objects.create(board=board, title=f'List {index}')
+            for task_index in range(5):
+                Task.objects.create(title=f'Task {task_index}', list=list_obj, created_by=self.owner)
+
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(f'/api/v1/boards/{board.id}/snapshot/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['lists']), 13)
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+    def test_board_listing_uses_annotations(self):
+        """Board listing: members_count and current_user_role without per-board queries"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        def add_boards(count):
+            for index in range(count):
+                board = Board.objects.create(title=f'Board {index}', owner=self.member, is_public=True)
+                BoardMembership.objects.create(
+                    board=board, user=self.owner, role='admin', status='accepted', invited_by=self.member
+                )
+                BoardMembership.objects.create(
+                    board=board, user=self.admin_member, role='member', status='pending', invited_by=self.member
+                )
+
+        urls = (('/api/v1/boards/', False), ('/api/v1/boards/public/', True))
+        self.client.force_authenticate(user=self.owner)
+        add_boards(2)
+        small = {}
+        for url, _paginated in urls:
+            with CaptureQueriesContext(connection) as context:
+                self.client.get(url)
+            small[url] = len(context.captured_queries)
+
+        add_boards(8)
+        for url, paginated in urls:
+            with CaptureQueriesContext(connection) as large:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            boards = response.data['results'] if paginated else response.data
+            self.assertEqual(len(boards), 10)
+            self.assertEqual(len(large.captured_queries), small[url])
+            for board in boards:
+                self.assertEqual(board['members_count'], 1)
+                self.assertEqual(board['current_user_role'], 'admin')
+                self.assertEqual(board['owner_username'], 'member')
+
+    def test_board_activities_keyset_pagination(self):
+        """Board activities: cursor pages cover every activity exactly once"""
+        from boards.models import BoardActivity
+
+        board = Board.objects.create(title='Board', owner=self.owner)
+        BoardActivity.objects.bulk_create([
+            BoardActivity(board=board, action='update', user=self.owner, description=f'Activity {index}')
+            for index in range(25)
+        ])
+
+        self.client.force_authenticate(user=self.owner)
+        url = f'/api/v1/boards/{board.id}/activities/?page_size=10'
+        seen = []
+        pages = 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(activity['id'] for activity in response.data['results'])
+            url = response.data['next']
+            pages += 1
+
+        self.assertEqual(pages, 3)
+        expected = list(BoardActivity.objects.filter(board=board).order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+        response = self.client.get(f'/api/v1/boards/{board.id}/activities/?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_board_activities_archived_and_paged(self):
+        """Old activities move to gzip archives; pagination continues into them"""
+        import shutil
+        import tempfile
+        from io import StringIO
+        from datetime import timedelta
+        from django.core.management import call_command
+        from django.test import override_settings
+        from django.utils import timezone
+        from boards.archive import archived_files
+        from boards.models import BoardActivity
+
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        board = Board.objects.create(title='Old Board', owner=self.owner)
+        now = timezone.now()
+
+        def add_activities(days_ago, count):
+            BoardActivity.objects.bulk_create([
+                BoardActivity(board=board, action='update', user=self.owner, description=f'{days} days ago',
+                              created_at=now - timedelta(days=days, minutes=index))
+                for days in days_ago for index in range(count)
+            ])
+
+        with override_settings(MEDIA_ROOT=media_root):
+            add_activities([2, 70, 100], 4)
+            call_command('archive_activities', days=30, stdout=StringIO())
+            self.assertEqual(BoardActivity.objects.filter(board=board).count(), 4)
+
+            # A later run adds a part to a finished month, which is then compacted
+            add_activities([71], 3)
+            call_command('archive_activities', days=30, stdout=StringIO())
+            files = archived_files(board.id)
+            self.assertTrue(files)
+            self.assertTrue(all(len(names) == 1 for names in files.values()))
+
+            self.client.force_authenticate(user=self.owner)
+            url = f'/api/v1/boards/{board.id}/activities/?page_size=5'
+            seen = []
+            while url:
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                seen.extend((item['description'], item['user_username']) for item in response.data['results'])
+                url = response.data['next']
+
+        expected = ['2 days ago'] * 4 + ['70 days ago'] * 4 + ['71 days ago'] * 3 + ['100 days ago'] * 4
+        self.assertEqual([description for description, _user in seen], expected)
+        self.assertEqual({user for _description, user in seen}, {'owner'})
+
+    def test_archived_activity_pages_resume_at_the_cursor_month(self):
+        """Archive cursors carry the month file to resume from, in the time zone the files are named in"""
+        import shutil
+        import tempfile
+        from datetime import datetime, timedelta, timezone as dt_timezone
+        from unittest import mock
+        from django.test import override_settings
+        from boards.archive import archive_activities, archived_files, read_month
+        from boards.models import BoardActivity
+
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        board = Board.objects.create(title='Tokyo Board', owner=self.owner)
+        # August 1st in Tokyo, still July 31st in UTC
+        early_august = datetime(2026, 7, 31, 20, 0, tzinfo=dt_timezone.utc)
+        mid_july = datetime(2026, 7, 15, tzinfo=dt_timezone.utc)
+        BoardActivity.objects.bulk_create([
+            BoardActivity(board=board, action='update', user=self.owner, description=f'{label} {index}',
+                          created_at=start - timedelta(minutes=index))
+            for label, start in (('august', early_august), ('july', mid_july)) for index in range(3)
+        ])
+
+        with override_settings(MEDIA_ROOT=media_root, TIME_ZONE='Asia/Tokyo'):
+            archive_activities(cutoff=datetime(2026, 9, 1, tzinfo=dt_timezone.utc))
+            self.assertEqual(list(archived_files(board.id)), ['2026-08', '2026-07'])
+
+            self.client.force_authenticate(user=self.owner)
+            url = f'/api/v1/boards/{board.id}/activities/?page_size=2'
+            seen = []
+            months_read = []
+            while url:
+                with mock.patch('boards.archive.read_month', side_effect=read_month) as reads:
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                seen.extend(item['description'] for item in response.data['results'])
+                months_read.append([call.args[1][0][:7] for call in reads.call_args_list])
+                url = response.data['next']
+
+        self.assertEqual(seen, ['august 0', 'august 1', 'august 2', 'july 0', 'july 1', 'july 2'])
+        self.assertEqual(months_read, [['2026-08'], ['2026-08', '2026-07'], ['2026-07']])
+
+    def test_board_access_cache_follows_membership_changes(self):
+        """Cached board roles are reused across requests and dropped when memberships change"""
+        import tempfile
+        from unittest import mock
+        from django.core.cache import cache
+        from django.db import connection
+        from django.test import override_settings
+        from django.test.utils import CaptureQueriesContext
+
+        board = Board.objects.create(title='Cached Board', owner=self.owner)
+        membership = BoardMembership.objects.create(
+            board=board, user=self.member, role='member', status='accepted', invited_by=self.owner
+        )
+        self.client.force_authenticate(user=self.member)
+
+        # Not with the default per-process cache, which other workers' invalidations never reach
+        with override_settings(BOARD_ACCESS_CACHE_TIMEOUT=60), self.assertLogs('boards.permissions', 'WARNING'), \
+                mock.patch('boards.permissions._warned_local_cache', False):
+            with CaptureQueriesContext(connection) as first:
+                self.client.get(f'/api/v1/boards/{board.id}/')
+            with CaptureQueriesContext(connection) as second:
+                self.client.get(f'/api/v1/boards/{board.id}/')
+            self.assertEqual(len(second.captured_queries), len(first.captured_queries))
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        shared = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                              'LOCATION': directory.name}}
+        with override_settings(BOARD_ACCESS_CACHE_TIMEOUT=60, CACHES=shared):
+            cache.clear()
+            with CaptureQueriesContext(connection) as first:
+                response = self.client.get(f'/api/v1/boards/{board.id}/')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            with CaptureQueriesContext(connection) as second:
+                response = self.client.get(f'/api/v1/boards/{board.id}/')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(second.captured_queries), len(first.captured_queries) - 1)
+
+            # Members cannot edit; promoting to admin is picked up immediately
+            response = self.client.patch(f'/api/v1/boards/{board.id}/', {'title': 'Renamed'})
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+            membership.role = 'admin'
+            membership.save()
+            response = self.client.patch(f'/api/v1/boards/{board.id}/', {'title': 'Renamed'})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+            membership.delete()
+            response = self.client.get(f'/api/v1/boards/{board.id}/')
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+            cache.clear()
+
+    def test_all_boards_owned_and_accepted_only(self):
+        """all_boards: owned boards and accepted memberships, each once, no pending ones"""
+        owned = Board.objects.create(title='Owned', owner=self.member)
+        joined = Board.objects.create(title='Joined', owner=self.owner)
+        pending = Board.objects.create(title='Pending', owner=self.owner)
+        BoardMembership.objects.create(board=joined, user=self.member, status='accepted', invited_by=self.owner)
+        BoardMembership.objects.create(board=pending, user=self.member, status='pending', invited_by=self.owner)
+        BoardMembership.objects.create(board=owned, user=self.admin_member, status='accepted', invited_by=self.member)
+
+        boards = list(self.member.all_boards.order_by('title').values_list('title', flat=True))
+        self.assertEqual(boards, ['Joined', 'Owned'])
+        self.assertEqual(self.member.all_boards.filter(title='Joined').get().pk, joined.pk)
+
+    def test_board_reads_use_version_etag(self):
+        """Board, lists and tasks reads answer 304 until something on the board changes"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from lists.models import List
+        from tasks.models import Task
+
+        board = Board.objects.create(title='Polled Board', owner=self.owner)
+        list_obj = List.objects.create(board=board, title='Doing', position=4)
+        task = Task.objects.create(title='Task', list=list_obj, created_by=self.owner)
+        self.client.force_authenticate(user=self.owner)
+
+        urls = [
+            f'/api/v1/boards/{board.id}/',
+            f'/api/v1/boards/{board.id}/lists/',
+            f'/api/v1/boards/{board.id}/snapshot/',
+            f'/api/v1/tasks/lists/{list_obj.id}/',
+        ]
+        etags = {}
+        for url in urls:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            etags[url] = response['ETag']
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+            self.assertLessEqual(len(context.captured_queries), 2)
+        self.assertEqual(len(set(etags.values())), len(urls))
+
+        # Writes to the board or anything on it change every ETag
+        writes = [
+            lambda: task.assigned_to.add(self.owner),
+            lambda: Task.objects.create(title='Another', list=list_obj, created_by=self.owner),
+            lambda: self.client.patch(f'/api/v1/boards/{board.id}/', {'title': 'Renamed'}),
+            lambda: BoardMembership.objects.create(
+                board=board, user=self.member, status='accepted', invited_by=self.owner
+            ),
+            lambda: task.delete(),
+        ]
+        for write in writes:
+            write()
+            for url in urls:
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertNotEqual(response['ETag'], etags[url])
+                etags[url] = response['ETag']
+
+        # Non-members never get a 304 for a board they cannot see
+        self.client.force_authenticate(user=self.non_member)
+        response = self.client.get(urls[0], HTTP_IF_NONE_MATCH=etags[urls[0]])
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_task_reads_etag_changes_with_the_date(self):
+        """Snapshot and task list ETags expire at midnight, when tasks may become overdue"""
+        from datetime import timedelta
+        from unittest import mock
+        from django.utils import timezone
+        from tasks.models import Task
+
+        board = Board.objects.create(title='Board', owner=self.owner)
+        list_obj = board.lists.first()
+        today = timezone.now()
+        Task.objects.create(title='Due today', list=list_obj, created_by=self.owner, due_date=today.date())
+        self.client.force_authenticate(user=self.owner)
+
+        for url in (f'/api/v1/boards/{board.id}/snapshot/', f'/api/v1/tasks/lists/{list_obj.id}/'):
+            with mock.patch('django.utils.timezone.now', return_value=today):
+                response = self.client.get(url)
+                etag = response['ETag']
+                self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code,
+                                 status.HTTP_304_NOT_MODIFIED)
+            with mock.patch('django.utils.timezone.now', return_value=today + timedelta(days=1)):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            tasks = response.data['lists'][0]['tasks'] if 'lists' in response.data else response.data
+            self.assertTrue(tasks[0]['is_overdue'])
+
+    def test_board_changes_since_cursor(self):
+        """Delta sync returns only what changed after the cursor, with tombstones for deletes"""
+        from lists.models import List
+        from tasks.models import Task, TaskComment
+
+        board = Board.objects.create(title='Synced Board', owner=self.owner)
+        todo, doing, done = List.objects.filter(board=board).order_by('position')
+        task_a, task_b, task_c = [
+            Task.objects.create(title=title, list=todo, created_by=self.owner, position=position)
+            for position, title in enumerate('ABC', start=1)
+        ]
+        url = f'/api/v1/boards/{board.id}/changes/'
+        self.client.force_authenticate(user=self.owner)
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['lists']), 3)
+        self.assertEqual([task['id'] for task in response.data['tasks']], [task_a.id, task_b.id, task_c.id])
+        self.assertEqual(response.data['deleted']['tasks'], [])
+        cursor = response.data['cursor']
+
+        deleted_task_id, deleted_list_id = task_a.id, done.id
+        task_c.move_to_position(1)
+        task_a.delete()
+        done.delete()
+        membership = BoardMembership.objects.create(
+            board=board, user=self.member, status='accepted', invited_by=self.owner
+        )
+        comment = TaskComment.objects.create(task=task_b, user=self.member, content='Hi')
+
+        response = self.client.get(url, {'since': cursor})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([(task['id'], task['position']) for task in response.data['tasks']], [(task_c.id, 1)])
+        self.assertEqual(response.data['lists'], [])
+        self.assertEqual([item['id'] for item in response.data['comments']], [comment.id])
+        self.assertEqual([item['id'] for item in response.data['members']], [membership.id])
+        self.assertEqual(response.data['deleted']['tasks'], [deleted_task_id])
+        self.assertEqual(response.data['deleted']['lists'], [deleted_list_id])
+        # B was shifted by the move without being written itself
+        self.assertEqual(response.data['order'], {'tasks': {todo.id: [task_c.id, task_b.id]}})
+        self.assertGreater(response.data['cursor'], cursor)
+
+        # Nothing changed since the new cursor
+        response = self.client.get(url, {'since': response.data['cursor']})
+        self.assertEqual(
+            (response.data['lists'], response.data['tasks'], response.data['comments'],
+             response.data['members'], response.data['deleted']['tasks']),
+            ([], [], [], [], [])
+        )
+
+        for since in ('abc', response.data['cursor'] + 1):
+            self.assertEqual(self.client.get(url, {'since': since}).status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.force_authenticate(user=self.non_member)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_activity_entries_written_in_one_insert_after_commit(self):
+        """Activities are buffered, written with one INSERT and dropped on rollback"""
+        from django.db import connection, transaction
+        from django.test.utils import CaptureQueriesContext
+        from boards.activity import buffered_activities, record_activity
+        from boards.models import BoardActivity
+        from lists.models import List
+
+        board = Board.objects.create(title='Logged Board', owner=self.owner)
+        with CaptureQueriesContext(connection) as context:
+            with buffered_activities(), self.captureOnCommitCallbacks(execute=True):
+                for index in range(3):
+                    record_activity(board, 'update', self.owner, f'Change {index}')
+                try:
+                    with transaction.atomic():
+                        record_activity(board, 'delete', self.owner, 'Rolled back')
+                        raise ValueError
+                except ValueError:
+                    pass
+                self.assertFalse(BoardActivity.objects.filter(board=board).exists())
+        inserts = [q for q in context.captured_queries if q['sql'].startswith('INSERT INTO "boards_boardactivity"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(
+            sorted(BoardActivity.objects.filter(board=board).values_list('description', flat=True)),
+            ['Change 0', 'Change 1', 'Change 2']
+        )
+
+        # Task and list changes are logged too
+        self.client.force_authenticate(user=self.owner)
+        list_obj = List.objects.filter(board=board).first()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f'/api/v1/tasks/lists/{list_obj.id}/', {'title': 'Logged task'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(f'/api/v1/lists/{list_obj.id}/', {'title': 'Renamed list'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        latest = list(BoardActivity.objects.filter(board=board).values_list('action', flat=True)[:2])
+        self.assertEqual(latest, ['update', 'create'])
+
+    def test_activity_write_failures_do_not_fail_the_action(self):
+        """A failed activity INSERT or a broker that is down is logged; the committed action still succeeds"""
+        from unittest import mock
+        from django.test import override_settings
+        from lists.models import List
+        from tasks.models import Task
+
+        board = Board.objects.create(title='Logged Board', owner=self.owner)
+        list_obj = List.objects.filter(board=board).first()
+        self.client.force_authenticate(user=self.owner)
+        failures = [
+            ({}, 'boards.activity.write_activities'),
+            ({'BOARD_ACTIVITY_ASYNC': True}, 'boards.tasks.write_board_activities.delay'),
+        ]
+        for index, (options, target) in enumerate(failures):
+            with override_settings(**options), mock.patch(target, side_effect=OSError('down')), \
+                    self.assertLogs('boards.activity', 'ERROR'), self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(f'/api/v1/tasks/lists/{list_obj.id}/', {'title': f'Task {index}'})
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Task.objects.filter(list=list_obj).count(), 2)
+
+    def test_counters_follow_changes_and_recount_repairs_drift(self):
+        """Stored counters track memberships, tasks and comments; `recount` fixes drift"""
+        from django.core.management import call_command
+        from lists.models import List
+        from tasks.models import Task, TaskComment
+
+        board = Board.objects.create(title='Counted Board', owner=self.owner)
+        todo, doing = List.objects.filter(board=board).order_by('position')[:2]
+        membership = BoardMembership.objects.create(
+            board=board, user=self.member, role='member', status='pending', invited_by=self.owner
+        )
+        self.owner.refresh_from_db()
+        board.refresh_from_db()
+        self.assertEqual((self.owner.boards_count, board.members_count), (1, 0))
+
+        membership.accept()
+        task = Task.objects.create(title='Counted', list=todo, created_by=self.owner, position=1)
+        Task.objects.create(title='Other', list=todo, created_by=self.owner, position=2)
+        TaskComment.objects.create(task=task, user=self.member, content='First')
+        TaskComment.objects.create(task=task, user=self.member, content='Second')
+        task.refresh_from_db()
+        task.mark_completed()
+        task.move_to_list(doing)
+
+        board.refresh_from_db()
+        self.member.refresh_from_db()
+        todo.refresh_from_db()
+        doing.refresh_from_db()
+        self.assertEqual(board.members_count, 1)
+        self.assertEqual(self.member.memberships_count, 1)
+        self.assertEqual((todo.tasks_count, todo.completed_tasks_count), (1, 0))
+        self.assertEqual((doing.tasks_count, doing.completed_tasks_count), (1, 1))
+        self.assertEqual(Task.objects.get(pk=task.pk).comments_count, 2)
+
+        # Counts come from the stored counters, not from COUNT(*)
+        self.client.force_authenticate(user=self.member)
+        response = self.client.get(f'/api/v1/boards/{board.id}/')
+        self.assertEqual(response.data['members_count'], 1)
+        response = self.client.get(f'/api/v1/tasks/{task.id}/')
+        self.assertEqual(response.data['comments_count'], 2)
+
+        # A full save of a stale instance does not write the counters back
+        stale = List.objects.get(pk=doing.pk)
+        Task.objects.create(title='Third', list=doing, created_by=self.owner, position=2)
+        stale.title = 'Renamed'
+        stale.save()
+        doing.refresh_from_db()
+        self.assertEqual(doing.tasks_count, 2)
+
+        membership.delete()
+        task.delete()
+        board.refresh_from_db()
+        doing.refresh_from_db()
+        self.assertEqual((board.members_count, doing.tasks_count, doing.completed_tasks_count), (0, 1, 0))
+
+        List.objects.filter(pk=todo.pk).update(tasks_count=7)
+        Board.objects.filter(pk=board.pk).update(members_count=3)
+        call_command('recount', stdout=open(os.devnull, 'w'))
+        todo.refresh_from_db()
+        board.refresh_from_db()
+        self.assertEqual((todo.tasks_count, board.members_count), (1, 0))
+
+    def test_board_delete_counts_down_memberships_in_one_update(self):
+        """Deleting a board counts down the memberships of all its accepted members with one UPDATE"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        board = Board.objects.create(title='Doomed Board', owner=self.owner)
+        BoardMembership.objects.create(
+            board=board, user=self.member, role='member', status='accepted', invited_by=self.owner
+        )
+        BoardMembership.objects.create(
+            board=board, user=self.admin_member, role='admin', status='accepted', invited_by=self.owner
+        )
+        BoardMembership.objects.create(
+            board=board, user=self.non_member, role='member', status='pending', invited_by=self.owner
+        )
+        users = [self.owner, self.member, self.admin_member, self.non_member]
+        for user in users:
+            user.refresh_from_db()
+        before = [(user.boards_count, user.memberships_count) for user in users]
+
+        with CaptureQueriesContext(connection) as queries:
+            board.delete()
+        self.assertEqual(len([q for q in queries.captured_queries
+                              if q['sql'].startswith('UPDATE "accounts_customuser"')
+                              and 'memberships_count' in q['sql']]), 1)
+
+        for user in users:
+            user.refresh_from_db()
+        self.assertEqual([(user.boards_count, user.memberships_count) for user in users], [
+            (before[0][0] - 1, before[0][1]),
+            (before[1][0], before[1][1] - 1),
+            (before[2][0], before[2][1] - 1),
+            before[3],
+        ])
+
+    def test_migrate_backfills_counters_of_existing_rows(self):
+        """Rows from before the counter columns (stored as 0) are recounted by migrate, so limits hold"""
+        from django.core.management import call_command
+        from django.test import override_settings
+        from tasks.models import Task
+
+        boards = [Board.objects.create(title=f'Legacy {index}', owner=self.owner) for index in range(2)]
+        BoardMembership.objects.create(
+            board=boards[0], user=self.member, role='member', status='accepted', invited_by=self.owner
+        )
+        todo = boards[0].lists.first()
+        Task.objects.create(title='Legacy task', list=todo, created_by=self.owner)
+        # What the new columns hold on existing rows right after the schema migration
+        User.objects.update(boards_count=0, memberships_count=0)
+        Board.objects.update(members_count=0)
+        todo.__class__.objects.update(tasks_count=0)
+
+        call_command('migrate', verbosity=0)
+
+        self.owner.refresh_from_db()
+        self.member.refresh_from_db()
+        boards[0].refresh_from_db()
+        todo.refresh_from_db()
+        self.assertEqual((self.owner.boards_count, self.member.memberships_count), (2, 1))
+        self.assertEqual((boards[0].members_count, todo.tasks_count), (1, 1))
+
+        self.client.force_authenticate(user=self.owner)
+        with override_settings(MAX_BOARDS_PER_USER=2):
+            response = self.client.post('/api/v1/boards/', {'title': 'One too many'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Board.objects.filter(owner=self.owner).count(), 2)
+
+    def test_board_stats_from_counters_and_daily_rollup(self):
+        """Stats combine the list counters, task breakdowns and the daily rollup"""
+        from datetime import timedelta
+        from django.core.management import call_command
+        from django.utils import timezone
+        from boards.models import BoardDailyStats
+        from lists.models import List
+        from tasks.models import Task
+
+        board = Board.objects.create(title='Stats Board', owner=self.owner)
+        BoardMembership.objects.create(
+            board=board, user=self.member, role='member', status='accepted', invited_by=self.owner
+        )
+        todo, doing = List.objects.filter(board=board).order_by('position')[:2]
+        today = timezone.localdate()
+        tasks = [
+            Task.objects.create(title=f'Task {index}', list=todo, created_by=self.owner, position=index,
+                                priority='high' if index < 2 else 'low', due_date=today - timedelta(days=1))
+            for index in range(1, 5)
+        ]
+        tasks[0].assigned_to.add(self.member)
+        tasks[0].mark_completed()
+        tasks[1].mark_completed()
+        tasks[1].mark_incomplete()
+        tasks[2].move_to_list(doing)
+        tasks[3].delete()
+        # Two days ago two tasks were created and deleted
+        BoardDailyStats.objects.create(board=board, date=today - timedelta(days=2), created=2, deleted=2)
+
+        self.client.force_authenticate(user=self.member)
+        url = f'/api/v1/boards/{board.id}/stats/?days=3'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data
+        self.assertEqual((data['tasks'], data['completed'], data['open'], data['overdue']), (3, 1, 2, 2))
+        self.assertEqual([(row['title'], row['tasks'], row['completed']) for row in data['lists'][:2]],
+                         [(todo.title, 2, 1), (doing.title, 1, 0)])
+        self.assertEqual({row['priority']: row['tasks'] for row in data['priorities']},
+                         {'low': 2, 'medium': 0, 'high': 1, 'urgent': 0})
+        self.assertEqual(data['assignees'], [{'id': self.member.id, 'username': 'member', 'tasks': 1, 'open': 0}])
+        self.assertEqual(
+            [(row['created'], row['completed'], row['reopened'], row['deleted'], row['open']) for row in data['daily']],
+            [(2, 0, 0, 2, 0), (0, 0, 0, 0, 0), (4, 2, 1, 1, 2)]
+        )
+
+        cached = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(self.client.get(f'/api/v1/boards/{board.id}/stats/?days=0').status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        self.client.force_authenticate(user=self.non_member)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+        # Batch completions bypass the signals but still reach the rollup
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.post('/api/v1/tasks/batch/', {'operations': [
+            {'op': 'complete', 'task': tasks[1].id, 'is_completed': True},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        row = BoardDailyStats.objects.get(board=board, date=today)
+        self.assertEqual((row.completed, row.reopened), (3, 1))
+
+        call_command('rebuild_board_stats', board=[board.id], stdout=open(os.devnull, 'w'))
+        self.assertEqual(
+            list(BoardDailyStats.objects.filter(board=board).values_list('date', 'created', 'completed')),
+            [(today, 3, 2)]
+        )
+
+    def test_board_export_streams_ndjson(self):
+        """Export: every record type as NDJSON, optionally gzipped, for managers only"""
+        import gzip
+        from io import StringIO
+        from django.core.management import call_command
+        from boards.models import BoardActivity
+        from lists.models import List
+        from tasks.models import Task, TaskComment
+
+        board = Board.objects.create(title='Exported Board', owner=self.owner)
+        BoardMembership.objects.create(
+            board=board, user=self.member, role='member', status='accepted', invited_by=self.owner
+        )
+        list_obj = List.objects.filter(board=board).first()
+        task = Task.objects.create(title='Exported task', list=list_obj, created_by=self.owner)
+        task.assigned_to.add(self.member)
+        TaskComment.objects.create(task=task, user=self.member, content='Exported comment')
+        BoardActivity.objects.create(board=board, action='create', user=self.owner, description='Created')
+
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.get(f'/api/v1/boards/{board.id}/export/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertIn(f'board-{board.id}.ndjson', response['Content-Disposition'])
+        body = b''.join(response.streaming_content)
+        records = [json.loads(line) for line in body.splitlines()]
+        types = [record['type'] for record in records]
+        self.assertEqual(types[:2], ['export', 'board'])
+        self.assertEqual(types.count('list'), 3)
+        for record_type in ('task', 'assignment', 'comment', 'membership', 'activity'):
+            self.assertEqual(types.count(record_type), 1, record_type)
+        task_record = next(record for record in records if record['type'] == 'task')
+        self.assertEqual((task_record['id'], task_record['list'], task_record['created_by_email']),
+                         (task.id, list_obj.id, 'owner@example.com'))
+        assignment = next(record for record in records if record['type'] == 'assignment')
+        self.assertEqual(assignment, {'type': 'assignment', 'task': task.id, 'user': self.member.id,
+                                      'user_email': 'member@example.com'})
+
+        response = self.client.get(f'/api/v1/boards/{board.id}/export/?gzip=true')
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        unzipped = gzip.decompress(b''.join(response.streaming_content))
+        self.assertEqual(len(unzipped.splitlines()), len(records))
+
+        output = StringIO()
+        call_command('export_board', board.id, stdout=output)
+        self.assertEqual(len(output.getvalue().splitlines()), len(records))
+
+        # Regular members cannot export
+        self.client.force_authenticate(user=self.member)
+        response = self.client.get(f'/api/v1/boards/{board.id}/export/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_board_import_round_trips_exports_and_reads_csv(self):
+        """Import: exports and CSV files are bulk-written, with counters, sync stamps and row errors"""
+        from io import StringIO
+        from tempfile import NamedTemporaryFile
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from django.core.management import call_command
+        from lists.models import List
+        from tasks.models import Task, TaskComment
+
+        board = Board.objects.create(title='Source Board', owner=self.owner)
+        BoardMembership.objects.create(
+            board=board, user=self.member, role='member', status='accepted', invited_by=self.owner
+        )
+        todo, doing, _done = List.objects.filter(board=board).order_by('position')
+        first = Task.objects.create(title='First', list=todo, created_by=self.owner, priority='high')
+        Task.objects.create(title='Second', list=todo, created_by=self.member, is_completed=True)
+        third = Task.objects.create(title='Third', list=doing, created_by=self.owner)
+        first.assigned_to.add(self.member)
+        third.assigned_to.add(self.owner)
+        TaskComment.objects.create(task=first, user=self.member, content='Imported comment')
+        self.client.force_authenticate(user=self.owner)
+        export = b''.join(self.client.get(f'/api/v1/boards/{board.id}/export/').streaming_content)
+
+        # Over the API memberships are not restored, so the member's assignment and comment are skipped;
+        # the owner's assignment is kept
+        response = self.client.post('/api/v1/boards/import/', {
+            'file': SimpleUploadedFile('board.ndjson', export), 'title': 'Copy',
+        }, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual(response.data['format'], 'ndjson')
+        self.assertEqual(response.data['created'], {'list': 3, 'task': 3, 'assignment': 1})
+        self.assertEqual(response.data['skipped'], {'membership': 1, 'assignment': 1, 'comment': 1})
+        copy = Board.objects.get(pk=response.data['board'])
+        self.assertEqual((copy.title, copy.owner_id), ('Copy', self.owner.id))
+        lists = list(List.objects.filter(board=copy).order_by('position'))
+        self.assertEqual([list_obj.title for list_obj in lists], ['Todo', 'Doing', 'Done'])
+        self.assertEqual([(list_obj.tasks_count, list_obj.completed_tasks_count) for list_obj in lists],
+                         [(2, 1), (1, 0), (0, 0)])
+        self.assertEqual(list(lists[0].tasks.values_list('title', 'priority', 'created_by')),
+                         [('First', 'high', self.owner.id), ('Second', 'medium', self.member.id)])
+        self.assertEqual(list(Task.objects.get(list__board=copy, title='Third').assigned_to.all()), [self.owner])
+        self.assertFalse(Task.objects.filter(list__board=copy, change_seq=0).exists())
+        self.owner.refresh_from_db()
+        self.assertEqual(self.owner.boards_count, 2)
+        response = self.client.get('/api/v1/search/?q=Third')
+        self.assertIn(copy.id, [result['board'] for result in response.data['results']])
+
+        # The command restores accepted memberships
+        output = StringIO()
+        with NamedTemporaryFile(suffix='.ndjson') as handle:
+            handle.write(export)
+            handle.flush()
+            call_command('import_board', handle.name, user=self.owner.email, memberships=True,
+                         stdout=output, stderr=StringIO())
+        restored = Board.objects.order_by('-pk').first()
+        self.assertIn(f'into board {restored.id}', output.getvalue())
+        self.assertEqual(restored.members_count, 1)
+        task = Task.objects.get(list__board=restored, title='First')
+        self.assertEqual(list(task.assigned_to.all()), [self.member])
+        self.assertEqual(task.comments_count, 1)
+
+        # CSV into an existing board: lists matched by title, invalid rows reported by line
+        csv_file = (
+            'list,title,priority,due_date,is_completed,assignees\n'
+            'Todo,From CSV,low,2030-01-31,,member@example.com\n'
+            'Backlog,New list task,,,yes,owner@example.com\n'
+            'Todo,Bad priority,critical,,,\n'
+            'Todo,Outsider,,,,nonmember@example.com\n'
+        ).encode()
+        version = Board.objects.get(pk=board.pk).version
+        response = self.client.post('/api/v1/boards/import/', {
+            'file': SimpleUploadedFile('cards.csv', csv_file), 'board': board.id,
+        }, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual(response.data['created'], {'list': 1, 'task': 3, 'assignment': 2})
+        self.assertEqual([error['line'] for error in response.data['errors']], [4, 5])
+        csv_task = Task.objects.get(list__board=board, title='From CSV')
+        self.assertEqual((csv_task.list_id, str(csv_task.due_date)), (todo.id, '2030-01-31'))
+        self.assertEqual(list(csv_task.assigned_to.all()), [self.member])
+        self.assertEqual(list(todo.tasks.values_list('title', flat=True)),
+                         ['First', 'Second', 'From CSV', 'Outsider'])
+        backlog = List.objects.get(board=board, title='Backlog')
+        self.assertEqual(list(backlog.tasks.get().assigned_to.all()), [self.owner])
+        self.assertEqual((backlog.position, backlog.completed_tasks_count), (4, 1))
+        self.assertGreater(Board.objects.get(pk=board.pk).version, version)
+
+        # Broken files import nothing; members cannot import into the board
+        response = self.client.post('/api/v1/boards/import/', {
+            'file': SimpleUploadedFile('broken.ndjson', export + b'{not json\n'),
+        }, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Board.objects.filter(owner=self.owner).count(), 3)
+        self.client.force_authenticate(user=self.member)
+        response = self.client.post('/api/v1/boards/import/', {
+            'file': SimpleUploadedFile('cards.csv', csv_file), 'board': board.id,
+        }, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_board_duplicate_and_templates(self):
+        """Duplication: bulk deep copy with a constant number of queries, templates and background jobs"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext, override_settings
+        from boards.duplicate import duplicate_board, run_duplication
+        from lists.models import List
+        from tasks.models import Task
+
+        board = Board.objects.create(title='Sprint', description='Weekly sprint', owner=self.owner)
+        BoardMembership.objects.create(
+            board=board, user=self.member, role='member', status='accepted', invited_by=self.owner
+        )
+        todo, doing, _done = List.objects.filter(board=board).order_by('position')
+        first = Task.objects.create(title='Plan', description='Pick the stories', list=todo,
+                                    created_by=self.member, priority='high')
+        review = Task.objects.create(title='Review', list=doing, created_by=self.owner, is_completed=True)
+        first.assigned_to.add(self.member)
+        review.assigned_to.add(self.owner, self.member)
+
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.post(f'/api/v1/boards/{board.id}/duplicate/',
+                                    {'title': 'Sprint 2', 'include_assignments': True}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        copy = Board.objects.get(pk=response.data['id'])
+        self.assertEqual((copy.title, copy.description, copy.owner_id, copy.members_count),
+                         ('Sprint 2', 'Weekly sprint', self.owner.id, 0))
+        lists = list(List.objects.filter(board=copy).order_by('position'))
+        self.assertEqual([(list_obj.title, list_obj.tasks_count, list_obj.completed_tasks_count)
+                          for list_obj in lists], [('Todo', 1, 0), ('Doing', 1, 1), ('Done', 0, 0)])
+        plan = Task.objects.get(list__board=copy, title='Plan')
+        self.assertEqual((plan.description, plan.priority, plan.created_by_id),
+                         ('Pick the stories', 'high', self.owner.id))
+        # Only the user's own assignments are copied; nobody is made a member
+        self.assertFalse(plan.assigned_to.exists())
+        self.assertEqual(list(Task.objects.get(list__board=copy, title='Review').assigned_to.all()), [self.owner])
+        self.assertFalse(BoardMembership.objects.filter(board=copy).exists())
+        self.assertFalse(Task.objects.filter(list__board=copy, change_seq=0).exists())
+        self.member.refresh_from_db()
+        self.assertEqual(self.member.memberships_count, 1)
+
+        # The number of queries does not depend on the size of the board
+        def copy_queries():
+            with CaptureQueriesContext(connection) as queries:
+                duplicate_board(board, self.owner, include_assignments=True)
+            return len(queries)
+        small = copy_queries()
+        for index in range(10):
+            task = Task.objects.create(title=f'Task {index}', list=doing, created_by=self.owner)
+            task.assigned_to.add(self.member)
+        self.assertEqual(copy_queries(), small)
+
+        # Members can copy the board with their own assignments
+        self.client.force_authenticate(user=self.member)
+        response = self.client.post(f'/api/v1/boards/{board.id}/duplicate/',
+                                    {'include_assignments': True}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            set(Task.objects.filter(list__board_id=response.data['id'], assigned_to=self.member)
+                .values_list('title', flat=True)),
+            {'Plan', 'Review'} | {f'Task {index}' for index in range(10)},
+        )
+        response = self.client.post(f'/api/v1/boards/{board.id}/duplicate/', {'include_tasks': False}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(Task.objects.filter(list__board_id=response.data['id']).exists())
+
+        # Public templates are listed and can be copied by anyone
+        self.client.force_authenticate(user=self.non_member)
+        response = self.client.post(f'/api/v1/boards/{board.id}/duplicate/', {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        Board.objects.filter(pk=board.pk).update(is_template=True, is_public=True)
+        response = self.client.get('/api/v1/boards/templates/')
+        self.assertEqual([item['id'] for item in response.data['results']], [board.id])
+        with override_settings(MAX_BOARDS_PER_USER=0):
+            response = self.client.post(f'/api/v1/boards/{board.id}/duplicate/', {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # Large boards are copied in the background
+        with override_settings(BOARD_DUPLICATE_ASYNC_THRESHOLD=5):
+            response = self.client.post(f'/api/v1/boards/{board.id}/duplicate/', {'title': 'Mine'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], 'pending')
+        run_duplication(response.data['id'])
+        response = self.client.get(f'/api/v1/boards/duplications/{response.data["id"]}/')
+        self.assertEqual(response.data['status'], 'done')
+        self.assertEqual(Task.objects.filter(list__board_id=response.data['board']).count(), 12)
+        self.assertEqual(Board.objects.get(pk=response.data['board']).title, 'Mine')
+        self.client.force_authenticate(user=self.member)
+        response = self.client.get(f'/api/v1/boards/duplications/{response.data["id"]}/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_fast_json_renderer_matches_drf(self):
+        """JSON: responses are rendered by FastJSONRenderer, byte-identical to DRF's JSONRenderer"""
+        import io
+        import uuid
+        from contextlib import ExitStack
+        from unittest import mock
+        from django.utils import timezone
+        from django.utils.translation import gettext_lazy as _
+        from rest_framework.exceptions import ParseError
+        from rest_framework.renderers import JSONRenderer
+        from core.parsers import FastJSONParser
+        from core.renderers import FastJSONRenderer
+
+        data = {
+            'now': timezone.now(), 'day': timezone.localdate(), 'token': uuid.uuid4(),
+            'message': _("Board not found or you do not have access."), 'text': 'a\u2028b é',
+            'nested': [{1: None, 'ok': True}], 'big': 2 ** 70,
+            # Floats orjson writes otherwise (1e16, 1e-7, 0.00001) next to ones it writes the same
+            'floats': [1e16, 1e-7, 1e-5, -1.5e300, 2.5, 0.0001, 0.0, 123456789012345.6],
+        }
+        # With orjson if installed, and with the stdlib fallback used without it
+        for fallback in (False, True):
+            with ExitStack() as patches:
+                if fallback:
+                    patches.enter_context(mock.patch('core.renderers.orjson', None))
+                    patches.enter_context(mock.patch('core.parsers.orjson', None))
+                self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+                self.assertEqual(FastJSONRenderer().render(data, 'application/json; indent=2'),
+                                 JSONRenderer().render(data, 'application/json; indent=2'))
+                self.assertEqual(FastJSONParser().parse(io.BytesIO('{"a": ["é", 1]}'.encode())), {'a': ['é', 1]})
+                with self.assertRaises(ParseError):
+                    FastJSONParser().parse(io.BytesIO(b'{"a": '))
+                # Out of range floats are refused under STRICT_JSON, as by JSONRenderer
+                for value in (float('nan'), float('inf')):
+                    with self.assertRaises(ValueError):
+                        FastJSONRenderer().render({'nested': [value]})
+
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.post('/api/v1/boards/', {'title': 'Rendered'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertIsInstance(response.accepted_renderer, FastJSONRenderer)
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+        response = self.client.post('/api/v1/boards/', b'{"title": ', content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_board_events_stream(self):
+        """Change feed: members get task events over SSE; others are rejected"""
+        import asyncio
+        from asgiref.sync import sync_to_async
+        from django.test import AsyncClient
+        from rest_framework_simplejwt.tokens import AccessToken
+        from lists.models import List
+        from tasks.models import Task
+
+        board = await sync_to_async(Board.objects.create)(title='Live Board', owner=self.owner)
+        list_obj = await sync_to_async(List.objects.filter(board=board).first)()
+        client = AsyncClient()
+
+        response = await client.get(f'/api/v1/boards/{board.id}/events/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        outsider = str(AccessToken.for_user(self.non_member))
+        response = await client.get(f'/api/v1/boards/{board.id}/events/?token={outsider}')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        token = str(AccessToken.for_user(self.owner))
+        response = await client.get(
+            f'/api/v1/boards/{board.id}/events/', headers={'Authorization': f'Bearer {token}'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b'retry: 3000\n\n')
+
+        def create_task():
+            with self.captureOnCommitCallbacks(execute=True):
+                return Task.objects.create(title='Pushed', list=list_obj, created_by=self.owner)
+
+        task = await sync_to_async(create_task)()
+        chunk = (await asyncio.wait_for(anext(stream), timeout=5)).decode()
+        self.assertTrue(chunk.startswith('data: '))
+        event = json.loads(chunk[len('data: '):])
+        self.assertEqual(
+            (event['type'], event['action'], event['board'], event['id'], event['list']),
+            ('task', 'created', board.id, task.id, list_obj.id)
+        )
+
+        # A member's stream ends when their membership is no longer accepted
+        membership = await sync_to_async(BoardMembership.objects.create)(
+            board=board, user=self.member, role='member', status='accepted', invited_by=self.owner
+        )
+        member_token = str(AccessToken.for_user(self.member))
+        response = await client.get(f'/api/v1/boards/{board.id}/events/?token={member_token}')
+        member_stream = aiter(response.streaming_content)
+        await anext(member_stream)
+
+        def revoke():
+            with self.captureOnCommitCallbacks(execute=True):
+                membership.status = 'rejected'
+                membership.save()
+
+        await sync_to_async(revoke)()
+        chunk = (await asyncio.wait_for(anext(member_stream), timeout=5)).decode()
+        self.assertEqual(json.loads(chunk[len('data: '):])['type'], 'membership')
+        with self.assertRaises(StopAsyncIteration):
+            await asyncio.wait_for(anext(member_stream), timeout=5)
+
+        # Every stream ends with the board
+        def delete_board():
+            with self.captureOnCommitCallbacks(execute=True):
+                board.delete()
+
+        board_id = board.id
+        await sync_to_async(delete_board)()
+        events = []
+        while True:
+            try:
+                chunk = await asyncio.wait_for(anext(stream), timeout=5)
+            except StopAsyncIteration:
+                break
+            events.append(json.loads(chunk.decode()[len('data: '):]))
+        self.assertEqual(events[-1], {'type': 'board', 'action': 'deleted', 'board': board_id, 'id': board_id})
+
+
+    def test_request_instrumentation_timing_header_and_route_stats(self):
+        """Instrumentation: Server-Timing per request, slow requests logged, per-route stats for staff only"""
+        import re
+        from django.db import connection
+        from django.test import override_settings
+        from django.test.utils import CaptureQueriesContext
+        from core.instrumentation import RequestMetrics, fingerprint, routes
+
+        board = Board.objects.create(title='Board', owner=self.owner)
+        routes.reset()
+        self.client.force_authenticate(user=self.owner)
+        self.assertNotIn('Server-Timing', self.client.get('/api/v1/boards/'))
+
+        with override_settings(REQUEST_INSTRUMENTATION=True, REQUEST_SLOW_MS=0):
+            client = APIClient()
+            client.force_authenticate(user=self.owner)
+            with self.assertLogs('core.middleware', 'WARNING') as logs, \
+                    CaptureQueriesContext(connection) as queries:
+                response = client.get(f'/api/v1/boards/{board.id}/snapshot/')
+            query_count = len(queries.captured_queries)
+            client.get('/api/v1/boards/')
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            timing = response['Server-Timing']
+            self.assertIn(f'desc="{query_count} queries"', timing)
+            for metric in ('db', 'serializer', 'view', 'total'):
+                self.assertRegex(timing, rf'\b{metric};dur=\d+\.\d')
+            self.assertIn(f'Slow request GET /api/v1/boards/{board.id}/snapshot/: 200', logs.output[0])
+
+            staff = APIClient()
+            staff.force_authenticate(user=User.objects.create_user(
+                email='staff@example.com', username='staff', password='Pass123!', is_active=True, is_staff=True))
+            self.assertEqual(client.get('/api/v1/instrumentation/').status_code, status.HTTP_403_FORBIDDEN)
+            report = staff.get('/api/v1/instrumentation/', {'ordering': 'requests'}).data
+            self.assertTrue(report['enabled'])
+            stats = {(route['method'], route['route']): route for route in report['routes']}
+            snapshot = stats[('GET', 'api/v1/boards/<int:pk>/snapshot/')]
+            self.assertEqual((snapshot['requests'], snapshot['queries']['sum']), (1, query_count))
+            self.assertEqual(sum(snapshot['duration_ms']['buckets'].values()), 1)
+            self.assertGreater(stats[('GET', 'api/v1/boards/')]['serializer_ms']['sum'], 0)
+            self.assertEqual(staff.get('/api/v1/instrumentation/', {'ordering': 'x'}).status_code,
+                             status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(staff.delete('/api/v1/instrumentation/').status_code, status.HTTP_204_NO_CONTENT)
+            self.assertEqual([(route['method'], route['route']) for route in routes.report()['routes']],
+                             [('DELETE', 'api/v1/instrumentation/')])
+
+        # Repeated statements on other rows share a fingerprint
+        metrics = RequestMetrics()
+        for pk in (1, 2, 3):
+            metrics.statements[f'SELECT "t"."id" FROM "t" WHERE ("t"."id" = {pk} AND "t"."name" = \'x\')'] += 1
+        metrics.statements['SELECT 1 WHERE "t"."id" IN (%s, %s)'] += 1
+        self.assertEqual(metrics.repeated_statements(),
+                         [(3, 'SELECT "t"."id" FROM "t" WHERE ("t"."id" = ? AND "t"."name" = ?)')])
+        self.assertEqual(fingerprint('SELECT 1 WHERE "t"."id" IN (%s, %s)'), 'SELECT ? WHERE "t"."id" IN (...)')
+
+    def test_metrics_endpoint_reports_views_tasks_and_all_processes(self):
+        """Metrics: Prometheus text with per-view requests, Celery tasks and emails, summed across processes"""
+        import glob
+        import re
+        import tempfile
+        from django.test import override_settings
+        from accounts.tasks import send_password_reset_email
+        from core import metrics
+
+        def scrape():
+            response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-secret')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response['Content-Type'], metrics.CONTENT_TYPE)
+            return {name: float(value) for name, value in
+                    re.findall(r'^(\S+) (\S+)$', response.content.decode(), re.M) if not name.startswith('#')}
+
+        # Opt-in, and never served without a token unless DEBUG is on
+        self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_404_NOT_FOUND)
+        enabled = override_settings(METRICS_ENABLED=True)
+        enabled.enable()
+        self.addCleanup(enabled.disable)
+        self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_403_FORBIDDEN)
+        with override_settings(DEBUG=True):
+            self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_200_OK)
+        secret = override_settings(METRICS_TOKEN='scrape-secret')
+        secret.enable()
+        self.addCleanup(secret.disable)
+        self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_401_UNAUTHORIZED)
+        # The middleware is set up with the first request of a client
+        self.client = APIClient()
+
+        board_list = 'trello_http_requests_total{method="GET",status="200",view="boards:board-list"}'
+        task = 'task="accounts.tasks.send_password_reset_email"'
+        before = scrape()
+        self.client.force_authenticate(user=self.owner)
+        self.client.get('/api/v1/boards/')
+        self.client.get('/api/v1/boards/')
+        self.client.get('/not-a-page/')
+        send_password_reset_email.apply(args=(self.owner.pk, 'http://localhost/reset'))
+        # Nothing listens there: the task retries three times, then fails
+        with override_settings(EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+                               EMAIL_HOST='127.0.0.1', EMAIL_PORT=9, EMAIL_USE_TLS=False):
+            send_password_reset_email.apply(args=(self.owner.pk, 'http://localhost/reset'))
+        after = scrape()
+
+        delta = lambda name: after.get(name, 0.0) - before.get(name, 0.0)
+        self.assertEqual(delta(board_list), 2)
+        self.assertEqual(delta('trello_http_requests_total{method="GET",status="404",view="<unmatched>"}'), 1)
+        labels = 'method="GET",view="boards:board-list"'
+        self.assertEqual(delta(f'trello_http_request_duration_seconds_bucket{{{labels},le="+Inf"}}'), 2)
+        self.assertGreater(delta(f'trello_http_request_db_queries_sum{{{labels}}}'), 0)
+        self.assertEqual(delta(f'trello_celery_task_duration_seconds_count{{state="success",{task}}}'), 1)
+        self.assertEqual(delta(f'trello_celery_task_duration_seconds_count{{state="failure",{task}}}'), 1)
+        self.assertEqual(delta(f'trello_celery_task_retries_total{{{task}}}'), 3)
+        self.assertEqual(delta(f'trello_email_send_duration_seconds_count{{{task}}}'), 5)
+
+        # Worker processes each write a file; the endpoint adds them up
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS_DIR=directory):
+            metrics.reset_store()
+            try:
+                metrics.CELERY_TASK_RETRIES.inc(task='forked')
+                for _worker in range(2):
+                    pid = os.fork()
+                    if not pid:
+                        metrics.CELERY_TASK_RETRIES.inc(2, task='forked')
+                        metrics.AVATAR_THUMBNAIL_SECONDS.observe(0.2)
+                        os._exit(0)
+                    os.waitpid(pid, 0)
+                self.assertEqual(len(glob.glob(os.path.join(directory, '*.db'))), 3)
+                forked = scrape()
+                # The files of the exited workers are merged into the archive, totals unchanged
+                files = sorted(os.path.basename(path) for path in glob.glob(os.path.join(directory, '*.db')))
+                self.assertEqual(files, sorted([f'{os.getpid()}.db', 'archive.db']))
+                metrics.CELERY_TASK_RETRIES.inc(task='forked')
+                merged = scrape()
+            finally:
+                metrics.reset_store()
+        self.assertEqual(forked['trello_celery_task_retries_total{task="forked"}'], 5)
+        self.assertEqual(forked['trello_avatar_thumbnail_duration_seconds_bucket{le="0.25"}'], 2)
+        self.assertEqual(forked['trello_avatar_thumbnail_duration_seconds_bucket{le="0.1"}'], 0)
+        self.assertNotIn(board_list, forked)
+        self.assertEqual(merged['trello_celery_task_retries_total{task="forked"}'], 6)
+        self.assertEqual(merged['trello_avatar_thumbnail_duration_seconds_bucket{le="0.25"}'], 2)
+
+    def test_seed_scale_generates_consistent_deterministic_data(self):
+        """Generated data respects the limits, matches its counters and repeats with the seed"""
+        from django.conf import settings
+        from django.db.models import Count, F
+        from boards.counters import recount
+        from boards.seed import ScaleSeeder
+        from lists.models import List
+        from tasks.models import Task
+
+        created = ScaleSeeder(users=30, boards=8, tasks=300, seed=7, prefix='scale', batch_size=100).run()
+        self.assertEqual((created['customuser'], created['profile'], created['board'], created['task']),
+                         (30, 30, 8, 300))
+        boards = Board.objects.filter(owner__username__startswith='scale-')
+        self.assertTrue(all(3 <= board.lists.count() <= 7 for board in boards))
+        sizes = sorted(Task.objects.filter(list__board__in=boards).values('list__board')
+                       .annotate(total=Count('pk')).values_list('total', flat=True))
+        self.assertGreater(sizes[-1], 4 * sizes[0])
+        self.assertLessEqual(max(boards.values_list('members_count', flat=True)), settings.MAX_MEMBERS_PER_BOARD)
+        self.assertFalse(User.objects.filter(username__startswith='scale-', profile__isnull=True).exists())
+        assigned = Task.objects.filter(list__board__in=boards, assigned_to__isnull=False).distinct()
+        self.assertTrue(assigned.exists())
+        for task in assigned[:50]:
+            task.validate_assignees(task.assigned_to.values_list('id', flat=True))
+        self.assertTrue(assigned.filter(assigned_to=F('list__board__owner')).exists())
+        for model in (Board, List, Task, User):
+            self.assertFalse(any(recount(model).values()), model)
+
+        ScaleSeeder(users=30, boards=8, tasks=300, seed=7, prefix='again', batch_size=100).run()
+        titles = lambda prefix: list(Task.objects.filter(created_by__username__startswith=f'{prefix}-')
+                                     .order_by('pk').values_list('title', 'priority', 'due_date', 'is_completed'))
+        self.assertEqual(titles('scale'), titles('again'))
+
+
+@tag('benchmark')
+class APIBenchmarkTests(APITestCase):
+    """Every API endpoint called by the benchmark suite (core.benchmark); `--exclude-tag benchmark` skips it"""
+
+    def test_benchmark_covers_every_endpoint_without_query_growth(self):
+        """Each request succeeds and runs as many queries against twice the data"""
+        from django.test import override_settings
+        from core.benchmark import missing_endpoints, query_growth, regressions, run_suite
+
+        self.assertEqual(missing_endpoints(), [])
+        with override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher']):
+            results = run_suite({'users': 2, 'boards': 1, 'lists': 2, 'tasks': 2, 'comments': 1}, repeat=1)
+
+        failed = {key: measured['status'] for key, measured in results['endpoints'].items()
+                  if measured['status'] >= 400}
+        self.assertEqual(failed, {})
+        self.assertEqual(query_growth(results), [])
+        self.assertEqual(regressions(results, results), [])
@@ -7,9 +7,11 @@ urlpatterns = [
     # Board CRUD operations
     path('', views.BoardListView.as_view(), name='board-list'),  # GET: list, POST: create
     path('<int:pk>/', views.BoardDetailView.as_view(), name='board-detail'),  # GET/PATCH/DELETE
+    path('<int:pk>/snapshot/', views.BoardSnapshotView.as_view(), name='board-snapshot'),  # GET: board, lists, tasks and assignees
     
     # Public boards discovery
     path('public/', views.PublicBoardListView.as_view(), name='public-boards'),  # GET: list public boards
+    path('templates/', views.BoardTemplateListView.as_view(), name='board-templates'),  # GET: list templates
     
     # Board members (nested resource)
     path('<int:board_id>/members/', views.BoardMembersView.as_view(), name='board-members'),  # GET: list members
@@ -25,6 +27,25 @@ urlpatterns = [
     # Board activity log
     path('<int:board_id>/activities/', views.BoardActivitiesView.as_view(), name='board-activities'),  # GET: activity history
     
+    # Delta sync
+    path('<int:board_id>/changes/', views.BoardChangesView.as_view(), name='board-changes'),  # GET: changes since a cursor
+    
+    # Statistics
+    path('<int:board_id>/stats/', views.BoardStatsView.as_view(), name='board-stats'),  # GET: counts and daily series
+    
+    # Export
+    path('<int:board_id>/export/', views.BoardExportView.as_view(), name='board-export'),  # GET: NDJSON stream
+    
+    # Duplication and templates
+    path('<int:board_id>/duplicate/', views.BoardDuplicateView.as_view(), name='board-duplicate'),  # POST: copy the board
+    path('duplications/<int:pk>/', views.BoardDuplicationDetailView.as_view(), name='board-duplication-detail'),  # GET: status of a background copy
+    
+    # Import
+    path('import/', views.BoardImportView.as_view(), name='board-import'),  # POST: NDJSON or CSV file
+    
+    # Real-time change feed
+    path('<int:board_id>/events/', views.BoardEventsView.as_view(), name='board-events'),  # GET: Server-Sent Events stream
+    
     # Board lists (nested resource)
     path('<int:board_id>/lists/', views.BoardListsView.as_view(), name='board-lists'),  # GET: list, POST: create
 ]
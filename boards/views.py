@@ -6,33 +6,58 @@ from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import get_user_model
+from django.conf import settings
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from .utils import check_board_member_limit, check_user_membership_limit
 
-from .models import Board, BoardMembership, BoardInvitation, BoardActivity
+from .models import Board, BoardMembership, BoardInvitation, BoardActivity, BoardDuplication
 from .serializers import (
     BoardListSerializer, BoardDetailSerializer, BoardCreateSerializer, 
     BoardUpdateSerializer, BoardMembershipSerializer, BoardInvitationSerializer,
-    BoardActivitySerializer, BoardUserInvitationSerializer
+    BoardActivitySerializer, BoardUserInvitationSerializer, BoardMemberSerializer,
+    BoardDuplicateSerializer, BoardDuplicationSerializer
 )
 from .utils import (
     check_user_board_limit, check_board_member_limit, 
     check_user_membership_limit, get_user_limits_info
 )
 from .tasks import send_board_invitation_email, send_registered_invitation_email
-from django.db.models import Q
+from django.db.models import Q, Prefetch
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
+from asgiref.sync import sync_to_async
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+import json
+import re
+from core.pagination import KeysetPagination
+from core.conditional import board_etag, board_version, not_modified, with_etag
+from .changes import changed_since, deleted_since
+from .activity import record_activity
+from .archive import archived_page
+from .events import get_backend
+from .stats import board_stats
+from .export import export_filename, export_ndjson, gzip_stream
+from .importer import BoardImporter, BoardImportError, read_lines
+from .duplicate import DuplicationError, duplicate_board, runs_async, start_duplication
+from .permissions import BoardAccess, board_access
 
 User = get_user_model()
 
 
+def members_prefetch():
+    """Memberships of a board with the users and profiles `BoardDetailSerializer` shows"""
+    return Prefetch('memberships', queryset=BoardMembership.objects.select_related('user__profile'))
+
 class BoardListView(APIView):
     """
     View for listing all boards the authenticated user owns or is a member of.
 
     Behaviour:
     - GET: Return every board where the user is the owner or a member.
-    - Uses the `all_boards` property of `CustomUser` to fetch accessible boards.
+    - Uses the request's `BoardAccess` to find accessible boards.
     - Boards are ordered by creation date (newest first).
     - Only available to authenticated users.
 
@@ -43,8 +68,10 @@ class BoardListView(APIView):
     @swagger_auto_schema(responses={200: BoardListSerializer(many=True)})
     def get(self, request):
         user = request.user
-        # Use all_boards property to fetch all boards of the user
-        boards = user.all_boards.order_by('-created_at')
+        boards = (Board.objects
+                  .filter(pk__in=board_access(request).board_ids())
+                  .with_list_data(user)
+                  .order_by('-created_at'))
         
         serializer = BoardListSerializer(boards, many=True, context={'request': request})
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -78,7 +105,7 @@ class BoardListView(APIView):
             board = serializer.save() # user is set in serializer
             
             # Log activity
-            BoardActivity.objects.create(
+            record_activity(
                 board=board,
                 action='create',
                 user=user,
@@ -102,20 +129,22 @@ class BoardDetailView(APIView):
     - PATCH  : Update board information (owner or admin only).
     - DELETE : Delete the board (owner only).
     - Access permissions are checked for every action.
-    - All changes are logged in `BoardActivity`.
+    - Updates are logged in `BoardActivity`.
+    - GET sends the board version as ETag and answers a matching
+      If-None-Match with 304.
 
     Endpoint: GET/PATCH/DELETE /api/v1/boards/{pk}/
     """
     permission_classes = [permissions.IsAuthenticated]
     
-    def get_board(self, pk, user):
+    def get_board(self, pk, request):
         """
         Retrieve board while validating user access
-        - Uses all_boards property for access validation
+        - Uses the request's `BoardAccess` for access validation
         - Raises 404 if access is denied
         """
         try:
-            board = user.all_boards.get(pk=pk)
+            board = board_access(request).get_board(pk, Board.objects.prefetch_related(members_prefetch()))
             return board
         except Board.DoesNotExist:
             raise NotFound(_("Board not found or you do not have access."))
@@ -123,9 +152,16 @@ class BoardDetailView(APIView):
     @swagger_auto_schema(responses={200: BoardDetailSerializer})
     def get(self, request, pk):
         """Return full board details"""
-        board = self.get_board(pk, request.user)
+        etag = None
+        if board_access(request).can_view(pk):
+            etag = board_etag(f'board-{pk}', board_version(pk))
+            cached = not_modified(request, etag)
+            if cached:
+                return cached
+
+        board = self.get_board(pk, request)
         serializer = BoardDetailSerializer(board)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return with_etag(Response(serializer.data, status=status.HTTP_200_OK), etag)
     
     @swagger_auto_schema(request_body=BoardUpdateSerializer, responses={200: BoardDetailSerializer, 400: 'Bad Request', 403: 'Forbidden'})
     def patch(self, request, pk):
@@ -134,25 +170,15 @@ class BoardDetailView(APIView):
         - Only owner or admin members can edit
         - Logs update activity
         """
-        board = self.get_board(pk, request.user)
+        board = self.get_board(pk, request)
         user = request.user
         
         # Verify edit permission (owner or admin)
-        if board.owner != user:
-            try:
-                membership = BoardMembership.objects.get(
-                    board=board, user=user, status='accepted'
-                )
-                if membership.role != 'admin':
-                    return Response(
-                        {"error": _("Only the board owner or an admin can edit the board.")},
-                        status=status.HTTP_403_FORBIDDEN
-                    )
-            except BoardMembership.DoesNotExist:
-                return Response(
-                    {"error": _("You do not have permission to edit this board.")},
-                    status=status.HTTP_403_FORBIDDEN
-                )
+        if not board_access(request).can_manage(board):
+            return Response(
+                {"error": _("Only the board owner or an admin can edit the board.")},
+                status=status.HTTP_403_FORBIDDEN
+            )
         
         serializer = BoardUpdateSerializer(board, data=request.data, partial=True)
         
@@ -160,7 +186,7 @@ class BoardDetailView(APIView):
             board = serializer.save()
             
             # Log edit activity
-            BoardActivity.objects.create(
+            record_activity(
                 board=board,
                 action='update',
                 user=user,
@@ -177,26 +203,18 @@ class BoardDetailView(APIView):
         """
         Delete board
         - Only the board owner can delete
-        - Logs delete activity before removal
+        - The activity log is deleted with the board
         """
-        board = self.get_board(pk, request.user)
-        user = request.user
+        board = self.get_board(pk, request)
         
         # Only the owner can delete the board
-        if board.owner != user:
+        if not board_access(request).is_owner(board):
             return Response(
                 {"error": _("Only the board owner can delete the board.")},
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Log the deletion before deleting
-        BoardActivity.objects.create(
-            board=board,
-            action='delete',
-            user=user,
-            description=_("Board '%(title)s' deleted by %(user)s") % {'title': board.title, 'user': user}
-        )
-        
+        # No activity entry: the board's activity log is deleted along with it
         board.delete()
         return Response(
             {"message": _("Board deleted successfully")},
@@ -204,12 +222,77 @@ class BoardDetailView(APIView):
         )
 
 
+class BoardSnapshotView(APIView):
+    """
+    View for loading a whole board in a single request.
+
+    Behaviour:
+    - GET: Return the board, its ordered lists, their ordered tasks and the
+      de-duplicated assignees of those tasks.
+    - Accessible only to the board owner and members.
+    - Runs a fixed number of queries regardless of list and task count.
+    - Sends the board version as ETag and answers a matching If-None-Match with 304.
+
+    Endpoint: GET /api/v1/boards/{pk}/snapshot/
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(responses={200: openapi.Response(description='Board snapshot'), 404: 'Not Found'})
+    def get(self, request, pk):
+        from lists.models import List
+        from lists.serializers import ListSerializer
+        from tasks.models import Task
+        from tasks.serializers import TaskSnapshotSerializer, AssignedUserSerializer
+
+        etag = None
+        if board_access(request).can_view(pk):
+            # is_overdue of the tasks moves on with the date
+            etag = board_etag(f'snapshot-{pk}-{timezone.localdate().isoformat()}', board_version(pk))
+            cached = not_modified(request, etag)
+            if cached:
+                return cached
+
+        try:
+            board = board_access(request).get_board(pk, Board.objects.prefetch_related(members_prefetch()))
+        except Board.DoesNotExist:
+            raise NotFound(_("Board not found or you do not have access."))
+
+        lists = list(List.objects.filter(board=board).with_ordinal_position().in_display_order())
+        tasks = list(
+            Task.objects.filter(list__board=board)
+            .with_ordinal_position()
+            .in_display_order()
+            .prefetch_related(Prefetch('assigned_to', queryset=User.objects.select_related('profile')))
+        )
+
+        # Group tasks per list and collect every assignee once
+        tasks_by_list = {list_obj.id: [] for list_obj in lists}
+        users = {}
+        for task in tasks:
+            tasks_by_list[task.list_id].append(task)
+            for user in task.assigned_to.all():
+                users.setdefault(user.id, user)
+
+        context = {'request': request}
+        lists_data = []
+        for list_obj in lists:
+            list_data = ListSerializer(list_obj).data
+            list_data['tasks'] = TaskSnapshotSerializer(tasks_by_list[list_obj.id], many=True).data
+            lists_data.append(list_data)
+
+        return with_etag(Response({
+            'board': BoardDetailSerializer(board).data,
+            'lists': lists_data,
+            'users': AssignedUserSerializer(users.values(), many=True, context=context).data,
+        }, status=status.HTTP_200_OK), etag)
+
+
 class PublicBoardListView(APIView):
     """
     View for listing public boards.
 
     Behaviour:
-    - GET: Return all boards marked as public.
+    - GET: Return public boards, newest first, one cursor page at a time.
     - Accessible to any authenticated user.
     - Useful for board discovery.
 
@@ -220,9 +303,36 @@ class PublicBoardListView(APIView):
     @swagger_auto_schema(responses={200: BoardListSerializer(many=True)})
     def get(self, request):
         # Fetch all public boards
-        boards = Board.objects.filter(is_public=True).order_by('-created_at')
-        serializer = BoardListSerializer(boards, many=True, context={'request': request})
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        boards = Board.objects.filter(is_public=True).with_list_data(request.user)
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(boards, request, view=self)
+        serializer = BoardListSerializer(page, many=True, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
+
+
+class BoardTemplateListView(APIView):
+    """
+    View for listing board templates.
+
+    Behaviour:
+    - GET: Return the template boards the user can access and the public
+      templates, newest first, one cursor page at a time.
+    - A board is made a template by setting `is_template` on it.
+    - New boards are created from a template with POST /boards/{id}/duplicate/.
+
+    Endpoint: GET /api/v1/boards/templates/
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(responses={200: BoardListSerializer(many=True)})
+    def get(self, request):
+        boards = Board.objects.filter(
+            Q(pk__in=board_access(request).board_ids()) | Q(is_public=True), is_template=True
+        ).with_list_data(request.user)
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(boards, request, view=self)
+        serializer = BoardListSerializer(page, many=True, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
 
 
 class BoardMembersView(APIView):
@@ -243,7 +353,7 @@ class BoardMembersView(APIView):
         # Check user access to board
         user = request.user
         try:
-            board = user.all_boards.get(id=board_id)
+            board = board_access(request).get_board(board_id)
         except Board.DoesNotExist:
             return Response(
                 {"error": _("Board not found or you do not have access.")},
@@ -253,7 +363,7 @@ class BoardMembersView(APIView):
         # Fetch active board members
         memberships = BoardMembership.objects.filter(
             board=board, status='accepted'
-        ).order_by('-created_at')
+        ).select_related('user', 'board').order_by('-created_at')
         
         serializer = BoardMembershipSerializer(memberships, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -286,22 +396,18 @@ class BoardInviteView(APIView):
         try:
             board = Board.objects.get(id=board_id)
             # Allow access for board owner or admin members
-            if board.owner != user:
-                try:
-                    membership = BoardMembership.objects.get(
-                        board=board, user=user, status='accepted'
-                    )
-                    if membership.role != 'admin':
-                        return Response(
-                            {"error": _("Only the board owner or an admin can view invitations.")},
-                            status=status.HTTP_403_FORBIDDEN
-                        )
-                except BoardMembership.DoesNotExist:
-                    return Response(
-                        {"error": _("You do not have permission to view invitations.")},
-                        status=status.HTTP_403_FORBIDDEN
-                    )
-            invitation = BoardInvitation.objects.filter(board=board)
+            access = board_access(request)
+            if not access.can_view(board):
+                return Response(
+                    {"error": _("You do not have permission to view invitations.")},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+            if not access.can_manage(board):
+                return Response(
+                    {"error": _("Only the board owner or an admin can view invitations.")},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+            invitation = BoardInvitation.objects.filter(board=board).select_related('board', 'user', 'invited_by')
             invitations=BoardInvitationSerializer(invitation, many=True)
 
             return Response(invitations.data, status=status.HTTP_200_OK)
@@ -325,7 +431,7 @@ class BoardInviteView(APIView):
         
         # Verify board existence and user access
         try:
-            board = user.all_boards.get(id=board_id)
+            board = board_access(request).get_board(board_id)
         except Board.DoesNotExist:
             return Response(
                 {"error": _("Board not found or you do not have access.")},
@@ -333,21 +439,11 @@ class BoardInviteView(APIView):
             )
         
         # Verify invite permission (owner or admin)
-        if board.owner != user:
-            try:
-                membership = BoardMembership.objects.get(
-                    board=board, user=user, status='accepted'
-                )
-                if membership.role != 'admin':
-                    return Response(
-                        {"error": _("Only the board owner or an admin can invite a new member.")},
-                        status=status.HTTP_403_FORBIDDEN
-                    )
-            except BoardMembership.DoesNotExist:
-                return Response(
-                    {"error": _("You do not have permission to invite a new member.")},
-                    status=status.HTTP_403_FORBIDDEN
-                )
+        if not board_access(request).can_manage(board):
+            return Response(
+                {"error": _("Only the board owner or an admin can invite a new member.")},
+                status=status.HTTP_403_FORBIDDEN
+            )
 
         serializer = BoardInvitationSerializer(
             data=request.data,
@@ -360,7 +456,7 @@ class BoardInviteView(APIView):
 
             # Log invitation activity (email)
             invited_identity = invitation.invited_email
-            BoardActivity.objects.create(
+            record_activity(
                 board=board,
                 action='invite',
                 user=user,
@@ -398,18 +494,13 @@ class BoardUserInviteView(APIView):
 
         # Verify board existence and user access
         try:
-            board = user.all_boards.get(id=board_id)
+            board = board_access(request).get_board(board_id)
         except Board.DoesNotExist:
             return Response({"error": _("Board not found or you do not have access.")}, status=status.HTTP_404_NOT_FOUND)
 
         # Verify permission to invite (owner or admin)
-        if board.owner != user:
-            try:
-                membership = BoardMembership.objects.get(board=board, user=user, status='accepted')
-                if membership.role != 'admin':
-                    return Response({"error": _("Only the board owner or an admin can invite a new member.")}, status=status.HTTP_403_FORBIDDEN)
-            except BoardMembership.DoesNotExist:
-                return Response({"error": _("You do not have permission to invite a new member.")}, status=status.HTTP_403_FORBIDDEN)
+        if not board_access(request).can_manage(board):
+            return Response({"error": _("Only the board owner or an admin can invite a new member.")}, status=status.HTTP_403_FORBIDDEN)
 
         serializer = BoardUserInvitationSerializer(data=request.data, context={'board': board})
         if serializer.is_valid():
@@ -428,7 +519,7 @@ class BoardUserInviteView(APIView):
             )
 
             # Log activity
-            BoardActivity.objects.create(
+            record_activity(
                 board=board,
                 action='invite',
                 user=user,
@@ -464,7 +555,7 @@ class BoardLeaveView(APIView):
         
         # Verify board existence and user access
         try:
-            board = user.all_boards.get(id=board_id)
+            board = board_access(request).get_board(board_id)
         except Board.DoesNotExist:
             return Response(
                 {"error": _("Board not found or you do not have access.")},
@@ -472,7 +563,7 @@ class BoardLeaveView(APIView):
             )
         
         # The board owner cannot leave their own board
-        if board.owner == user:
+        if board_access(request).is_owner(board):
             return Response(
                 {"error": _("The board owner cannot leave their own board.")}, 
                 status=status.HTTP_400_BAD_REQUEST
@@ -493,7 +584,7 @@ class BoardLeaveView(APIView):
         membership.delete()
         
         # Log leave activity
-        BoardActivity.objects.create(
+        record_activity(
             board=board,
             action='leave',
             user=user,
@@ -511,10 +602,12 @@ class BoardActivitiesView(APIView):
     View for listing board activities.
 
     Behaviour:
-    - GET: Return the complete activity history of the board.
+    - GET: Return the activity history of the board, one cursor page at a time.
     - Accessible only to board members.
     - Activities are ordered by date (newest first).
     - Includes activity type, acting user and description.
+    - Once the live rows run out, pages continue into the archived activities
+      (see `boards.archive`) with the same cursor.
 
     Endpoint: GET /api/v1/boards/{board_id}/activities/
     """
@@ -526,17 +619,424 @@ class BoardActivitiesView(APIView):
         
         # Verify board existence and user access
         try:
-            board = user.all_boards.get(id=board_id)
+            board = board_access(request).get_board(board_id)
         except Board.DoesNotExist:
             return Response(
                 {"error": _("Board not found or you do not have access.")},
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Fetch board activities
-        activities = BoardActivity.objects.filter(board=board).order_by('-created_at')
-        serializer = BoardActivitySerializer(activities, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        # Fetch board activities, one page at a time
+        activities = BoardActivity.objects.filter(board=board).select_related('user')
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(activities, request, view=self)
+        if paginator.next_cursor is None:
+            page += self.get_archived_page(board, paginator, request, page)
+        serializer = BoardActivitySerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    def get_archived_page(self, board, paginator, request, page):
+        """Fill the rest of a page whose live rows ran out from the archives"""
+        before = month = None
+        if page:
+            before = (page[-1].created_at, page[-1].pk)
+        elif request.query_params.get(paginator.cursor_query_param):
+            created_at, pk, extra = paginator.decode_cursor_parts(request.query_params[paginator.cursor_query_param])
+            before = (created_at, pk)
+            # Cursors of archived rows carry the month file to resume from
+            if extra:
+                if not re.fullmatch(r'\d{4}-\d{2}', extra[0]):
+                    raise NotFound(paginator.invalid_cursor_message)
+                month = extra[0]
+
+        remaining = paginator.get_page_size(request) - len(page)
+        # One extra row tells whether another page follows
+        archived = archived_page(board.id, before, remaining + 1, month)
+        if len(archived) > remaining:
+            archived = archived[:remaining]
+            if archived:
+                paginator.next_cursor = paginator.encode_cursor(archived[-1], archived[-1].archive_month)
+            else:
+                paginator.next_cursor = paginator.encode_cursor(page[-1])
+        return archived
+
+
+class BoardChangesView(APIView):
+    """
+    View for syncing a board incrementally.
+
+    Behaviour:
+    - GET: Return the lists, tasks, comments and members created or updated
+      after `?since=<cursor>`, the ids of those deleted since then, and the
+      `cursor` to send next time.
+    - Without `since`, return every row of the board (a full sync).
+    - `order` holds the current order of the board's lists and of the lists
+      with changed tasks, since a move also shifts its untouched siblings.
+    - Accessible only to the board owner and members.
+
+    Endpoint: GET /api/v1/boards/{board_id}/changes/?since=<cursor>
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        manual_parameters=[openapi.Parameter('since', openapi.IN_QUERY, type=openapi.TYPE_INTEGER)],
+        responses={200: openapi.Response(description='Board changes'), 400: 'Bad Request', 404: 'Not Found'}
+    )
+    def get(self, request, board_id):
+        from lists.models import List
+        from lists.serializers import ListSerializer
+        from tasks.models import Task, TaskComment
+        from tasks.serializers import TaskSnapshotSerializer, TaskCommentSerializer
+
+        cursor = board_version(board_id) if board_access(request).can_view(board_id) else None
+        if cursor is None:
+            raise NotFound(_("Board not found or you do not have access."))
+
+        # The cursor is read before the rows: a write committed in between is
+        # sent again next time rather than skipped
+        since = request.query_params.get('since')
+        if since in (None, ''):
+            since = None
+        else:
+            try:
+                since = int(since)
+            except ValueError:
+                since = -1
+            if not 0 <= since <= cursor:
+                return Response({"error": _("Invalid cursor.")}, status=status.HTTP_400_BAD_REQUEST)
+
+        lists = list(
+            changed_since(List.objects.filter(board_id=board_id), since)
+            .with_ordinal_position(whole_groups=False).in_display_order()
+        )
+        tasks = list(
+            changed_since(Task.objects.filter(list__board_id=board_id), since)
+            .with_ordinal_position(whole_groups=False).in_display_order()
+            .prefetch_related(Prefetch('assigned_to', queryset=User.objects.only('id')))
+        )
+        comments = changed_since(
+            TaskComment.objects.filter(task__list__board_id=board_id), since
+        ).select_related('user', 'task').order_by('created_at', 'id')
+        members = changed_since(
+            BoardMembership.objects.filter(board_id=board_id), since
+        ).select_related('user__profile').order_by('created_at', 'id')
+
+        order = {}
+        if lists:
+            order['lists'] = list(
+                List.objects.filter(board_id=board_id).in_display_order().values_list('id', flat=True)
+            )
+        if tasks:
+            order['tasks'] = {}
+            rows = (Task.objects.filter(list_id__in={task.list_id for task in tasks})
+                    .in_display_order().values_list('list_id', 'id'))
+            for list_id, task_id in rows:
+                order['tasks'].setdefault(list_id, []).append(task_id)
+
+        return Response({
+            'cursor': cursor,
+            'lists': ListSerializer(lists, many=True).data,
+            'tasks': TaskSnapshotSerializer(tasks, many=True).data,
+            'comments': TaskCommentSerializer(comments, many=True).data,
+            'members': BoardMemberSerializer(members, many=True).data,
+            'deleted': deleted_since(board_id, since),
+            'order': order,
+        }, status=status.HTTP_200_OK)
+
+
+class BoardStatsView(APIView):
+    """
+    View for board statistics (burndown and throughput charts).
+
+    Behaviour:
+    - GET: Return the total, completed, open and overdue task counts, tasks
+      per list, per priority and per assignee, and a `daily` series of the
+      tasks created, completed, reopened and deleted each day with the open
+      tasks at the end of the day.
+    - `?days=` sets the length of the series (default 30, at most `BOARD_STATS_MAX_DAYS`).
+    - Counts come from stored counters and the daily rollup, not from the task history.
+    - Accessible only to the board owner and members.
+    - Sends an ETag from the board version and the date; answers a matching If-None-Match with 304.
+
+    Endpoint: GET /api/v1/boards/{board_id}/stats/
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        manual_parameters=[openapi.Parameter('days', openapi.IN_QUERY, type=openapi.TYPE_INTEGER)],
+        responses={200: openapi.Response(description='Board statistics'), 400: 'Bad Request', 404: 'Not Found'}
+    )
+    def get(self, request, board_id):
+        max_days = getattr(settings, 'BOARD_STATS_MAX_DAYS', 365)
+        try:
+            days = int(request.query_params.get('days', 30))
+        except ValueError:
+            days = 0
+        if not 1 <= days <= max_days:
+            return Response(
+                {"error": _("Days must be between 1 and %(max_days)s.") % {'max_days': max_days}},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        version = board_version(board_id) if board_access(request).can_view(board_id) else None
+        if version is None:
+            raise NotFound(_("Board not found or you do not have access."))
+        # Overdue counts and the series move on with the date
+        etag = board_etag(f'stats-{board_id}-{days}-{timezone.localdate().isoformat()}', version)
+        cached = not_modified(request, etag)
+        if cached:
+            return cached
+
+        return with_etag(Response(board_stats(board_id, days), status=status.HTTP_200_OK), etag)
+
+
+class BoardExportView(APIView):
+    """
+    View for exporting a whole board (backups, audits, moving to another installation).
+
+    Behaviour:
+    - GET: Stream the board, its lists, tasks, assignments, comments,
+      memberships and activities as NDJSON, one record per line (see `boards.export`).
+    - `?gzip=true` streams the export gzip-compressed.
+    - Rows are read and sent in chunks, so memory use does not depend on the board size.
+    - Accessible only to the board owner and admins.
+
+    Endpoint: GET /api/v1/boards/{board_id}/export/
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        manual_parameters=[openapi.Parameter('gzip', openapi.IN_QUERY, type=openapi.TYPE_BOOLEAN)],
+        responses={200: openapi.Response(description='NDJSON export'), 403: 'Forbidden', 404: 'Not Found'}
+    )
+    def get(self, request, board_id):
+        access = board_access(request)
+        try:
+            board = access.get_board(board_id, Board.objects.select_related('owner'))
+        except Board.DoesNotExist:
+            raise NotFound(_("Board not found or you do not have access."))
+        if not access.can_manage(board):
+            return Response(
+                {"error": _("Only the board owner or admins can export the board.")},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        compressed = request.query_params.get('gzip', '').lower() in ('1', 'true')
+        stream = export_ndjson(board)
+        if compressed:
+            stream = gzip_stream(stream)
+        response = StreamingHttpResponse(
+            stream, content_type='application/gzip' if compressed else 'application/x-ndjson'
+        )
+        response['Content-Disposition'] = f'attachment; filename="{export_filename(board, compressed)}"'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
+class BoardDuplicateView(APIView):
+    """
+    View for copying a board or creating a board from a template.
+
+    Behaviour:
+    - POST: Deep-copy the board's lists and, by default, its tasks into a new
+      board owned by the user (see `boards.duplicate`).
+    - `include_assignments` also copies the user's own task assignments;
+      members are never copied.
+    - Boards with more than `BOARD_DUPLICATE_ASYNC_THRESHOLD` tasks are copied
+      in the background: the response is `202` with a job to poll at
+      GET /boards/duplications/{id}/.
+    - Accessible to the board's members, and to anyone for public templates.
+    - Respects the user's board-creation limit.
+
+    Endpoint: POST /api/v1/boards/{board_id}/duplicate/
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        request_body=BoardDuplicateSerializer,
+        responses={201: BoardDetailSerializer, 202: BoardDuplicationSerializer, 400: 'Bad Request', 403: 'Forbidden', 404: 'Not Found'}
+    )
+    def post(self, request, board_id):
+        access = board_access(request)
+        board = Board.objects.select_related('owner').filter(pk=board_id).first()
+        if board is None or not (access.can_view(board) or (board.is_template and board.is_public)):
+            raise NotFound(_("Board not found or you do not have access."))
+
+        serializer = BoardDuplicateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        options = serializer.validated_data
+        can_create, remaining = check_user_board_limit(request.user)
+        if not can_create:
+            return Response(
+                {"error": _("You have reached the maximum number of boards allowed.")},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if runs_async(board, options['include_tasks']):
+            job = start_duplication(board, request.user, **options)
+            return Response(BoardDuplicationSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+        try:
+            copy = duplicate_board(board, request.user, **options)
+        except DuplicationError as error:
+            return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+        # Counters and version were updated in the database
+        copy = Board.objects.prefetch_related(members_prefetch()).get(pk=copy.pk)
+        return Response(BoardDetailSerializer(copy).data, status=status.HTTP_201_CREATED)
+
+
+class BoardDuplicationDetailView(APIView):
+    """
+    View for polling a board copy running in the background.
+
+    Behaviour:
+    - GET: Return the status of the copy (`pending`, `running`, `done` or
+      `failed`), the new board's id once done and the error if it failed.
+    - Accessible only to the user who asked for the copy.
+
+    Endpoint: GET /api/v1/boards/duplications/{id}/
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(responses={200: BoardDuplicationSerializer, 404: 'Not Found'})
+    def get(self, request, pk):
+        job = get_object_or_404(BoardDuplication, pk=pk, user=request.user)
+        return Response(BoardDuplicationSerializer(job).data, status=status.HTTP_200_OK)
+
+
+class BoardImportView(APIView):
+    """
+    View for importing a board from a file.
+
+    Behaviour:
+    - POST: Import the uploaded `file` (multipart) and return a report of the
+      created and skipped records, with the line number of each invalid row.
+    - Accepts a board export (NDJSON, optionally gzip-compressed) or a CSV of
+      cards with the columns list, title, description, priority, due_date,
+      is_completed and assignees (see `boards.importer`).
+    - Creates a new board owned by the user (titled `title`, or after the
+      exported board), or adds to `board` if the user owns or administers it.
+    - Rows are written in bulk inside one transaction: a file that cannot be
+      read imports nothing.
+    - Memberships of an export are not restored; assignees must already be
+      accepted members of the board.
+
+    Endpoint: POST /api/v1/boards/import/
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter('file', openapi.IN_FORM, type=openapi.TYPE_FILE, required=True),
+            openapi.Parameter('board', openapi.IN_FORM, type=openapi.TYPE_INTEGER),
+            openapi.Parameter('title', openapi.IN_FORM, type=openapi.TYPE_STRING),
+        ],
+        responses={201: openapi.Response(description='Import report'), 400: 'Bad Request', 403: 'Forbidden', 404: 'Not Found'}
+    )
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"error": _("A file is required.")}, status=status.HTTP_400_BAD_REQUEST)
+
+        board = None
+        if request.data.get('board'):
+            access = board_access(request)
+            try:
+                board = access.get_board(int(request.data['board']))
+            except (Board.DoesNotExist, ValueError):
+                raise NotFound(_("Board not found or you do not have access."))
+            if not access.can_manage(board):
+                return Response(
+                    {"error": _("Only the board owner or admins can import into the board.")},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+        else:
+            can_create, remaining = check_user_board_limit(request.user)
+            if not can_create:
+                return Response(
+                    {"error": _("You have reached the maximum number of boards allowed.")},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        importer = BoardImporter(request.user, board=board, title=request.data.get('title'))
+        try:
+            report = importer.run(read_lines(upload))
+        except BoardImportError as error:
+            return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(report, status=status.HTTP_201_CREATED)
+
+
+class BoardEventsView(View):
+    """
+    View for streaming the change feed of a board as Server-Sent Events.
+
+    Behaviour:
+    - GET: Keep the connection open and send one `data:` line (JSON) per change
+      to the board's tasks, lists, comments, memberships and activities.
+    - Authenticates with the `Authorization: Bearer` header, or `?token=` for
+      browser EventSource clients that cannot set headers.
+    - Accessible only to the board owner and members; the stream ends when
+      the board is deleted or a membership change takes the user's access away.
+    - Sends a comment line every `BOARD_EVENTS_HEARTBEAT` seconds so proxies keep it open.
+    - Meant for an ASGI server: under WSGI every open stream holds a worker.
+
+    Endpoint: GET /api/v1/boards/{board_id}/events/
+    """
+
+    async def get(self, request, board_id):
+        user = await sync_to_async(self.authenticate)(request)
+        if user is None:
+            return JsonResponse(
+                {"detail": _("Authentication credentials were not provided.")},
+                status=status.HTTP_401_UNAUTHORIZED
+            )
+
+        if not await sync_to_async(BoardAccess(user).can_view)(board_id):
+            return JsonResponse(
+                {"error": _("Board not found or you do not have access.")},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        # Subscribe before responding so no event between the two is lost
+        subscription = await get_backend().subscribe(board_id)
+        response = StreamingHttpResponse(self.stream(subscription, user, board_id),
+                                         content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    def authenticate(self, request):
+        """Resolve the user from the JWT in the header or the `token` query parameter"""
+        authentication = JWTAuthentication()
+        try:
+            raw_token = request.GET.get('token')
+            if raw_token:
+                return authentication.get_user(authentication.get_validated_token(raw_token))
+            result = authentication.authenticate(request)
+        except (InvalidToken, AuthenticationFailed):
+            return None
+        return result[0] if result else None
+
+    async def stream(self, subscription, user, board_id):
+        heartbeat = getattr(settings, 'BOARD_EVENTS_HEARTBEAT', 15)
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                message = await subscription.get(heartbeat)
+                if message is None:
+                    yield ': ping\n\n'
+                    continue
+                yield f'data: {message}\n\n'
+
+                event = json.loads(message)
+                if event['type'] == 'board' and event['action'] == 'deleted':
+                    return
+                if event['type'] == 'membership' and event.get('user') == user.pk:
+                    # The user left, was removed or is no longer an accepted member
+                    if not await sync_to_async(BoardAccess(user).can_view)(board_id):
+                        return
+        finally:
+            await subscription.close()
 
 
 class UserInvitationListView(APIView):
@@ -554,7 +1054,7 @@ class UserInvitationListView(APIView):
         user = request.user
         invitations = BoardInvitation.objects.filter(
             Q(invited_email=user.email) | Q(user=user)
-        ).order_by('-created_at').filter(is_used=False)
+        ).order_by('-created_at').filter(is_used=False).select_related('board', 'user', 'invited_by')
         serializer = BoardInvitationSerializer(invitations, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -597,7 +1097,7 @@ class BoardInvitationRespondView(APIView):
             invitation.status = 'rejected'
             invitation.is_used = True
             invitation.save()
-            BoardActivity.objects.create(
+            record_activity(
                 board=invitation.board,
                 action='reject',  # treat as declined
                 user=user,
@@ -631,7 +1131,7 @@ class BoardInvitationRespondView(APIView):
         invitation.user = user
         invitation.save()
 
-        BoardActivity.objects.create(
+        record_activity(
             board=invitation.board,
             action='join',
             user=user,
@@ -701,7 +1201,7 @@ class BoardRemoveMemberView(APIView):
         
         # Verify board existence and user access
         try:
-            board = user.all_boards.get(id=board_id)
+            board = board_access(request).get_board(board_id)
         except Board.DoesNotExist:
             return Response(
                 {"error": _("Board not found or you do not have access.")},
@@ -709,21 +1209,11 @@ class BoardRemoveMemberView(APIView):
             )
         
         # Verify removal permission (owner or admin)
-        if board.owner != user:
-            try:
-                membership = BoardMembership.objects.get(
-                    board=board, user=user, status='accepted'
-                )
-                if membership.role != 'admin':
-                    return Response(
-                        {"error": _("Only the board owner or an admin can remove members.")},
-                        status=status.HTTP_403_FORBIDDEN
-                    )
-            except BoardMembership.DoesNotExist:
-                return Response(
-                    {"error": _("You do not have permission to remove members.")},
-                    status=status.HTTP_403_FORBIDDEN
-                )
+        if not board_access(request).can_manage(board):
+            return Response(
+                {"error": _("Only the board owner or an admin can remove members.")},
+                status=status.HTTP_403_FORBIDDEN
+            )
         
         # Get the target user
         try:
@@ -756,7 +1246,7 @@ class BoardRemoveMemberView(APIView):
         target_membership.delete()
         
         # Log removal activity
-        BoardActivity.objects.create(
+        record_activity(
             board=board,
             action='remove',
             user=user,
@@ -0,0 +1,457 @@
+"""
+API benchmark suite.
+
+Seeds a dataset, calls every URL under `api/` of the URLconf through the test
+client and records, per request, the number of SQL queries, the wall time and
+the response size.
+
+- `ENDPOINTS` says how to call each URL name. A URL with no entry (and not in
+  `SKIPPED`) is reported by `missing_endpoints()`, so new endpoints join the
+  suite when they are added.
+- Every request runs in a savepoint rolled back afterwards, so repetitions
+  and later requests see the same data.
+- Celery tasks queued by the endpoints run inline and emails stay in memory
+  (`without_broker()`), so the suite needs neither a broker nor a mail server.
+- `run_suite()` measures against two datasets, the second `scale` times
+  larger. An endpoint whose query count differs between the two runs a query
+  per row somewhere (an N+1): see `query_growth()` and `EXPECTED_GROWTH`.
+- Results are saved as JSON baselines; `regressions()` reports query counts
+  above a baseline and p95 latencies regressed past a ratio.
+
+Used by `manage.py benchmark_api`, which runs it in a test database created
+for the run (`benchmark_database()`), and the tests tagged `benchmark`.
+"""
+import json
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.tokens import default_token_generator
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+User = get_user_model()
+
+PASSWORD = 'Bench-pass-2024!'
+
+# Rows generated per dataset: member users, boards of the benchmark user,
+# lists per board, tasks per list and comments per task
+DEFAULT_SIZES = {'users': 4, 'boards': 2, 'lists': 3, 'tasks': 5, 'comments': 2}
+
+# URL names not benchmarked, with the reason
+SKIPPED = {
+    'boards:board-events': "Server-Sent Events stream that never completes",
+}
+
+# Requests whose query count grows with the data because of Django itself, with the reason
+EXPECTED_GROWTH = {
+    # Measured: the extra queries are the DELETE ... WHERE id IN (...) statements
+    # Django's deletion collector issues for every 100 cascaded rows
+    'DELETE boards:board-detail': "Django deletes the board's tasks and comments 100 rows per statement",
+    'DELETE lists:list-detail': "Django deletes the list's tasks and comments 100 rows per statement",
+}
+
+
+class Dataset:
+    """The generated rows the endpoints are called with"""
+
+    def __init__(self, **rows):
+        self.__dict__.update(rows)
+
+
+def clamp_sizes(sizes):
+    """Keep a dataset within the per-user and per-board limits"""
+    sizes = {**DEFAULT_SIZES, **sizes}
+    # Leave room for the boards the write endpoints create
+    max_boards = min(getattr(settings, 'MAX_BOARDS_PER_USER', 10),
+                     getattr(settings, 'MAX_MEMBERSHIPS_PER_USER', 20)) - 3
+    sizes['boards'] = max(1, min(sizes['boards'], max_boards))
+    sizes['users'] = max(1, min(sizes['users'], getattr(settings, 'MAX_MEMBERS_PER_BOARD', 50) - 5))
+    for key in ('lists', 'tasks'):
+        sizes[key] = max(2, sizes[key])
+    sizes['comments'] = max(1, sizes['comments'])
+    return sizes
+
+
+def seed_dataset(sizes, prefix='bench'):
+    """
+    Generate a benchmark user owning `boards` boards, each with `lists` lists
+    of `tasks` tasks with one assignee and `comments` comments, shared with
+    `users` accepted members who each also invite the user to a board of theirs.
+    Content is written in bulk; `boards.bulk.bulk_written` does the bookkeeping.
+    """
+    from boards.bulk import bulk_written, create_board
+    from boards.models import BoardActivity, BoardDuplication, BoardInvitation, BoardMembership
+    from lists.models import List
+    from tasks.models import Task, TaskComment
+
+    sizes = clamp_sizes(sizes)
+    password = make_password(PASSWORD)
+
+    def create_user(name, **fields):
+        # One by one so the profile signal runs; the password is hashed once
+        return User.objects.create(email=f'{prefix}-{name}@example.com', username=f'{prefix}-{name}',
+                                   password=password, is_active=True, **fields)
+
+    owner = create_user('owner')
+    staff = create_user('staff', is_staff=True)
+    outsider = create_user('outsider')
+    members = [create_user(f'member-{index}') for index in range(sizes['users'])]
+    today = timezone.localdate()
+
+    boards = []
+    for board_index in range(sizes['boards']):
+        board = create_board(title=f'{prefix} board {board_index}', description='Benchmark board', owner=owner,
+                             is_public=board_index == 0, is_template=board_index == 0)
+        memberships = BoardMembership.objects.bulk_create([
+            BoardMembership(board=board, user=member, invited_by=owner, status='accepted',
+                            role='admin' if index == 0 else 'member')
+            for index, member in enumerate(members)
+        ])
+        lists = List.objects.bulk_create([
+            List(board=board, title=f'List {index}', position=index + 1, rank=(index + 1) << 20)
+            for index in range(sizes['lists'])
+        ])
+        tasks = Task.objects.bulk_create([
+            Task(list=list_obj, title=f'Task {list_index}.{index}', description=f'Benchmark task {index}',
+                 priority=('low', 'medium', 'high', 'urgent')[index % 4], position=index + 1,
+                 rank=(index + 1) << 20, is_completed=index % 3 == 0,
+                 due_date=today + timedelta(days=index % 14 - 3), created_by=owner)
+            for list_index, list_obj in enumerate(lists) for index in range(sizes['tasks'])
+        ])
+        Task.assigned_to.through.objects.bulk_create([
+            Task.assigned_to.through(task_id=task.pk, customuser_id=members[index % len(members)].pk)
+            for index, task in enumerate(tasks)
+        ])
+        authors = [owner] + members
+        TaskComment.objects.bulk_create([
+            TaskComment(task=task, user=authors[index % len(authors)], content=f'Comment {index} on {task.title}')
+            for task in tasks for index in range(sizes['comments'])
+        ])
+        BoardActivity.objects.bulk_create([
+            BoardActivity(board=board, action='create', user=owner, description=f'Created {task.title}')
+            for task in tasks
+        ])
+        BoardInvitation.objects.bulk_create([
+            BoardInvitation(board=board, invited_by=owner, invited_email=f'{prefix}-guest-{index}@example.com')
+            for index in range(sizes['users'])
+        ])
+        bulk_written(board, owner, board_created=True, member_ids={m.user_id for m in memberships},
+                     comments=True, created_tasks=len(tasks),
+                     completed_tasks=sum(task.is_completed for task in tasks))
+        boards.append(board)
+
+    # Invitations received by the benchmark user
+    invitations = []
+    for member in members:
+        board = create_board(title=f'{prefix} board of {member.username}', owner=member)
+        invitations.append(BoardInvitation.objects.create(
+            board=board, invited_by=member, user=owner, invited_email=owner.email,
+        ))
+
+    board = boards[0]
+    lists = list(List.objects.filter(board=board).order_by('position'))
+    task = Task.objects.filter(list=lists[0]).order_by('position').first()
+    member = members[-1]
+    member.generate_verification_token()
+    return Dataset(
+        sizes=sizes, owner=owner, staff=staff, outsider=outsider, member=member, board=board,
+        list=lists[0], other_list=lists[-1], task=task, tasks=list(lists[0].tasks.order_by('position')),
+        comment=TaskComment.objects.filter(task=task, user=owner).first(),
+        invitation=invitations[0], other_invitation=invitations[-1],
+        duplication=BoardDuplication.objects.create(source=board, user=owner, title=board.title,
+                                                    status='done', board=board),
+    )
+
+
+def request(method='get', user='owner', data=None, query=None, label='', format='json', **url_kwargs):
+    """Description of one call of an endpoint; `user` names a user of the dataset (None: anonymous)"""
+    return {'method': method, 'user': user, 'data': data, 'query': query, 'label': label,
+            'format': format, 'kwargs': url_kwargs}
+
+
+def _csv_file():
+    return SimpleUploadedFile('cards.csv', b'list,title,priority\nImported,Imported task,high\n')
+
+
+# URL name -> function of the dataset returning the requests to measure
+ENDPOINTS = {
+    'auth:register': lambda d: [request('post', user=None, data={
+        'email': 'bench-new@example.com', 'username': 'bench-new', 'first_name': 'New', 'last_name': 'User',
+        'password1': PASSWORD, 'password2': PASSWORD})],
+    'auth:login': lambda d: [request('post', user=None, data={'email': d.owner.email, 'password': PASSWORD})],
+    'auth:token_refresh': lambda d: [request('post', user=None, data={'refresh': str(RefreshToken.for_user(d.owner))})],
+    'auth:logout': lambda d: [request('post', data={'refresh_token': str(RefreshToken.for_user(d.owner))})],
+    'auth:password_reset': lambda d: [request('post', user=None, data={'email': d.owner.email})],
+    'auth:password_reset_confirm': lambda d: [request('post', user=None, data={
+        'uid': urlsafe_base64_encode(force_bytes(d.owner.pk)), 'token': default_token_generator.make_token(d.owner),
+        'new_password1': PASSWORD + 'x', 'new_password2': PASSWORD + 'x'})],
+    'auth:verify_email': lambda d: [request(user=None, query={
+        'uid': urlsafe_base64_encode(force_bytes(d.member.pk)), 'token': d.member.email_verification_token})],
+    'users:user_list': lambda d: [request(user='staff')],
+    'users:current_user_detail': lambda d: [request(), request('patch', data={'first_name': 'Bench'})],
+    'users:current_user': lambda d: [request()],
+    'users:user_detail': lambda d: [request(pk=d.owner.pk), request('patch', data={'last_name': 'Owner'}, pk=d.owner.pk)],
+    'users:change_password': lambda d: [request('post', data={
+        'old_password': PASSWORD, 'new_password1': PASSWORD + 'x', 'new_password2': PASSWORD + 'x'}, pk=d.owner.pk)],
+    'users:current_user_change_password': lambda d: [request('post', data={
+        'old_password': PASSWORD, 'new_password1': PASSWORD + 'x', 'new_password2': PASSWORD + 'x'})],
+    'profiles:profile_list': lambda d: [request(), request('patch', data={'bio': 'Benchmark'})],
+    'profiles:current_profile': lambda d: [request(), request('patch', data={'bio': 'Benchmark'})],
+    'profiles:profile_detail': lambda d: [request(pk=d.owner.pk), request('patch', data={'bio': 'Benchmark'}, pk=d.owner.pk)],
+    'boards:board-list': lambda d: [request(), request('post', data={'title': 'New board'})],
+    'boards:board-detail': lambda d: [
+        request(pk=d.board.pk), request('patch', data={'title': 'Renamed'}, pk=d.board.pk),
+        request('delete', pk=d.board.pk)],
+    'boards:board-snapshot': lambda d: [request(pk=d.board.pk)],
+    'boards:public-boards': lambda d: [request()],
+    'boards:board-templates': lambda d: [request()],
+    'boards:board-members': lambda d: [request(board_id=d.board.pk)],
+    'boards:board-member-detail': lambda d: [request('delete', board_id=d.board.pk, user_id=d.member.pk)],
+    'boards:board-invitations': lambda d: [
+        request(board_id=d.board.pk),
+        request('post', data={'invited_email': 'bench-invitee@example.com'}, board_id=d.board.pk)],
+    'boards:board-invite-user': lambda d: [
+        request('post', data={'identifier': d.outsider.email}, board_id=d.board.pk)],
+    'boards:board-leave': lambda d: [request('post', user='member', board_id=d.board.pk)],
+    'boards:board-activities': lambda d: [request(board_id=d.board.pk)],
+    'boards:board-changes': lambda d: [request(board_id=d.board.pk), request(
+        query={'since': 1}, label='since', board_id=d.board.pk)],
+    'boards:board-stats': lambda d: [request(board_id=d.board.pk)],
+    'boards:board-export': lambda d: [request(board_id=d.board.pk)],
+    'boards:board-duplicate': lambda d: [request('post', data={'include_assignments': True}, board_id=d.board.pk)],
+    'boards:board-duplication-detail': lambda d: [request(pk=d.duplication.pk)],
+    'boards:board-import': lambda d: [request('post', data={'file': _csv_file(), 'board': d.board.pk},
+                                              format='multipart')],
+    'boards:board-lists': lambda d: [request(board_id=d.board.pk),
+                                     request('post', data={'title': 'New list'}, board_id=d.board.pk)],
+    'lists:list-detail': lambda d: [request(pk=d.list.pk), request('patch', data={'title': 'Renamed'}, pk=d.list.pk),
+                                    request('delete', pk=d.list.pk)],
+    'lists:list-move': lambda d: [request('post', data={'position': 1}, pk=d.other_list.pk)],
+    'tasks:user-tasks': lambda d: [request(user='member')],
+    'tasks:task-detail': lambda d: [request(pk=d.task.pk), request('patch', data={'title': 'Renamed'}, pk=d.task.pk),
+                                    request('delete', pk=d.task.pk)],
+    'tasks:task-batch': lambda d: [request('post', data={'operations': [
+        {'op': 'complete', 'task': task.pk, 'is_completed': True} for task in d.tasks]})],
+    'tasks:task-move': lambda d: [request('post', data={'new_list': d.other_list.pk, 'new_position': 1}, pk=d.task.pk)],
+    'tasks:task-toggle-complete': lambda d: [request('post', pk=d.task.pk)],
+    'tasks:task-comments': lambda d: [request(task_id=d.task.pk),
+                                      request('post', data={'content': 'New comment'}, task_id=d.task.pk)],
+    'tasks:comment-detail': lambda d: [
+        request(task_id=d.task.pk, pk=d.comment.pk),
+        request('patch', data={'content': 'Edited'}, task_id=d.task.pk, pk=d.comment.pk),
+        request('delete', task_id=d.task.pk, pk=d.comment.pk)],
+    'tasks:list-tasks': lambda d: [request(list_id=d.list.pk),
+                                   request('post', data={'title': 'New task'}, list_id=d.list.pk)],
+    'search:search': lambda d: [request(query={'q': 'Task'})],
+    'invitations:invitation_list': lambda d: [request()],
+    'invitations:invitation_detail': lambda d: [request('post', data={'action': 'reject'}, pk=d.other_invitation.pk)],
+    'invitations:invitation_respond': lambda d: [request('post', data={'action': 'accept'}, pk=d.invitation.pk)],
+    'instrumentation:routes': lambda d: [request(user='staff')],
+}
+
+
+def api_url_names(patterns=None, namespace=''):
+    """Names of the URLs under `api/` of the URLconf"""
+    names = []
+    for pattern in patterns if patterns is not None else get_resolver().url_patterns:
+        if isinstance(pattern, URLResolver):
+            if patterns is None and not str(pattern.pattern).startswith('api/'):
+                continue
+            prefix = namespace + (f'{pattern.namespace}:' if pattern.namespace else '')
+            names += api_url_names(pattern.url_patterns, prefix)
+        elif isinstance(pattern, URLPattern) and pattern.name and patterns is not None:
+            names.append(namespace + pattern.name)
+    return names
+
+
+def missing_endpoints():
+    """API URL names the suite does not know how to call"""
+    return [name for name in api_url_names() if name not in ENDPOINTS and name not in SKIPPED]
+
+
+def request_key(name, spec):
+    key = f"{spec['method'].upper()} {name}"
+    return f"{key} ({spec['label']})" if spec['label'] else key
+
+
+def send(clients, name, spec):
+    """Perform one request; returns `(status code, response size)`"""
+    client = clients[spec['user']]
+    url = reverse(name, kwargs=spec['kwargs'])
+    data = spec['data']
+    if spec['method'] == 'get':
+        response = client.get(url, spec['query'] or {})
+    else:
+        if spec['query']:
+            url = f"{url}?{'&'.join(f'{key}={value}' for key, value in spec['query'].items())}"
+        response = getattr(client, spec['method'])(url, data, format=spec['format'])
+    if response.streaming:
+        size = sum(len(piece) for piece in response.streaming_content)
+    else:
+        size = len(response.content)
+    return response.status_code, size
+
+
+def measure(clients, name, spec, repeat):
+    """Queries, sizes and timings of `repeat` calls, after a warm-up call"""
+    timings = []
+    for attempt in range(repeat + 1):
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                status_code, size = send(clients, name, spec)
+                elapsed = (time.perf_counter() - started) * 1000
+            transaction.set_rollback(True)
+        if attempt:
+            timings.append(elapsed)
+        if spec['data'] and spec['format'] == 'multipart':
+            # Uploaded files are consumed by the request
+            spec = {**spec, 'data': {**spec['data'], 'file': _csv_file()}}
+    return {
+        'status': status_code,
+        'queries': len(queries),
+        'bytes': size,
+        'p50_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+    }
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def clients_for(dataset):
+    # Server errors are measured and reported like any other status
+    clients = {None: APIClient(raise_request_exception=False)}
+    for role in ('owner', 'staff', 'member'):
+        client = APIClient(raise_request_exception=False)
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(getattr(dataset, role))}')
+        clients[role] = client
+    return clients
+
+
+def measure_dataset(dataset, repeat, small_results=None, progress=None):
+    """
+    `{request key: measurements}` of every endpoint against `dataset`; the
+    query count and size from `small_results` are added as `queries_small`
+    and `bytes_small`.
+    """
+    clients = clients_for(dataset)
+    results = {}
+    for name in api_url_names():
+        if name in SKIPPED or name not in ENDPOINTS:
+            continue
+        for spec in ENDPOINTS[name](dataset):
+            key = request_key(name, spec)
+            measured = results[key] = measure(clients, name, spec, repeat)
+            if small_results is not None:
+                measured['queries_small'] = small_results[key]['queries']
+                measured['bytes_small'] = small_results[key]['bytes']
+            if progress:
+                progress(key, measured)
+    return results
+
+
+@contextmanager
+def without_broker():
+    """Run Celery tasks in the calling process and send emails to `django.core.mail.outbox`"""
+    from core import celery_app
+
+    eager = celery_app.conf.task_always_eager
+    celery_app.conf.task_always_eager = True
+    try:
+        with override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'):
+            yield
+    finally:
+        celery_app.conf.task_always_eager = eager
+
+
+@contextmanager
+def benchmark_database(interactive=True):
+    """
+    Point the default database at a new test database, as the test runner
+    does, and destroy it afterwards: the suite never writes to or locks the
+    configured database.
+    """
+    old_name = connection.settings_dict['NAME']
+    name = connection.creation.create_test_db(verbosity=0, autoclobber=not interactive, serialize=False)
+    try:
+        yield name
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def run_suite(sizes=None, scale=2, repeat=5, progress=None):
+    """
+    Measure every endpoint against a dataset of `sizes` and one `scale` times
+    larger, in a transaction rolled back afterwards. The timings come from the
+    larger dataset; `queries_small` and `bytes_small` from the smaller one.
+    """
+    sizes = clamp_sizes(sizes or {})
+    large = clamp_sizes({key: value * scale for key, value in sizes.items()})
+    with without_broker(), transaction.atomic():
+        small_results = measure_dataset(seed_dataset(sizes, 'bench-small'), max(1, repeat // 2))
+        results = measure_dataset(seed_dataset(large, 'bench-large'), repeat, small_results, progress)
+        transaction.set_rollback(True)
+    return {'sizes': sizes, 'large_sizes': large, 'repeat': repeat, 'endpoints': results}
+
+
+def query_growth(results):
+    """
+    Requests making more queries against the larger dataset, except those of
+    `EXPECTED_GROWTH`: `[(key, small, large)]`
+    """
+    return [
+        (key, measured['queries_small'], measured['queries'])
+        for key, measured in results['endpoints'].items()
+        if measured['queries'] > measured['queries_small'] and key not in EXPECTED_GROWTH
+    ]
+
+
+def server_errors(results):
+    """Requests answered with a 5xx status"""
+    return [key for key, measured in results['endpoints'].items() if measured['status'] >= 500]
+
+
+def regressions(results, baseline, p95_ratio=1.5, min_ms=2.0):
+    """
+    Differences from `baseline` worth failing on: more queries than in the
+    baseline, or a p95 more than `p95_ratio` times the baseline's (and at
+    least `min_ms` slower, to ignore noise on fast endpoints).
+    """
+    problems = []
+    for key, measured in results['endpoints'].items():
+        previous = baseline.get('endpoints', {}).get(key)
+        if previous is None:
+            continue
+        if measured['queries'] > previous['queries']:
+            problems.append(f"{key}: {measured['queries']} queries, baseline {previous['queries']}")
+        if (measured['p95_ms'] > previous['p95_ms'] * p95_ratio
+                and measured['p95_ms'] - previous['p95_ms'] >= min_ms):
+            problems.append(f"{key}: p95 {measured['p95_ms']:.1f} ms, baseline {previous['p95_ms']:.1f} ms")
+    return problems
+
+
+def load_baseline(path):
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def save_baseline(results, path):
+    with open(path, 'w') as handle:
+        json.dump(results, handle, indent=2, sort_keys=True)
+        handle.write('\n')
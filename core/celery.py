@@ -12,3 +12,7 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 
 # Load task modules from all registered Django apps.
 app.autodiscover_tasks()
+
+# Task durations and retries for GET /metrics
+from core.metrics import connect_celery_signals
+connect_celery_signals()
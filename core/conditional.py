@@ -0,0 +1,50 @@
+"""
+Conditional GET support for board reads.
+
+Every board carries a `version` that is bumped on any write to the board or
+its content. Read endpoints build a weak ETag from it, answer a matching
+`If-None-Match` with 304 before running their heavy querysets, and send the
+ETag with full responses.
+"""
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def board_etag(scope, version):
+    """Weak ETag of one read (`scope`, e.g. "board-12") of a board at `version`"""
+    if version is None:
+        return None
+    return f'W/"{scope}-{version}"'
+
+
+def board_version(board_id):
+    """Current version of a board, or None if it does not exist"""
+    from boards.models import Board
+
+    return Board.objects.filter(pk=board_id).values_list('version', flat=True).first()
+
+
+def _etag_matches(request, etag):
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    # Weak comparison: ignore the W/ prefix on both sides
+    opaque = etag.removeprefix('W/')
+    return any(tag.strip().removeprefix('W/') == opaque for tag in header.split(','))
+
+
+def not_modified(request, etag):
+    """A 304 response when the client already has `etag`, else None"""
+    if etag and _etag_matches(request, etag):
+        return with_etag(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+    return None
+
+
+def with_etag(response, etag):
+    """Attach `etag` and make clients revalidate before reusing the response"""
+    if etag:
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+    return response
@@ -0,0 +1,23 @@
+"""
+Model support for denormalized counter columns (see `boards.counters`).
+
+Counter columns are only changed with `F()` UPDATEs in the database. A full
+`save()` of an instance loaded earlier would write back values that other
+transactions may have changed since, so it leaves them out.
+"""
+from django.db import transaction
+
+
+class CounterFieldsMixin:
+    """Model mixin: `save()` never writes the `counter_fields` of existing rows"""
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.counter_fields
+            ]
+        # Signal handlers adjusting counters run in the transaction of the save
+        with transaction.atomic(using=kwargs.get('using'), savepoint=False):
+            super().save(*args, **kwargs)
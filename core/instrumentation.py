@@ -0,0 +1,223 @@
+"""
+Per-request SQL and timing instrumentation.
+
+`InstrumentationMiddleware` (core.middleware) opens a `RequestMetrics` for
+each request when `REQUEST_INSTRUMENTATION` is on:
+
+- Every SQL statement goes through `RequestMetrics` as a database execute
+  wrapper, which counts it, times it and keeps its text.
+- DRF serializers are timed through `BaseSerializer.data` (see
+  `instrument_serializers()`). The time includes the lazy queries the
+  serializer runs, which are also counted as database time.
+- The view time runs from the view being resolved to the response being
+  rendered.
+
+The totals are sent in a `Server-Timing` header and added to the per-route
+histograms of `routes`, served to staff at GET /api/v1/instrumentation/.
+Requests slower than `REQUEST_SLOW_MS` are logged with their most repeated
+statements: a statement run once per row (an N+1) stands out there.
+Histograms live in the memory of each process.
+"""
+import functools
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.db import connections
+from django.utils import timezone
+
+# Upper bounds of the histogram buckets; larger values fall in "+Inf"
+DURATION_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+# The metrics of the request handled by this thread, if instrumented
+current_metrics = ContextVar('current_metrics', default=None)
+
+
+class RequestMetrics:
+    """Queries, database time, serializer time and view time of one request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.view_started = None
+        self.view_time = None
+        self.total_time = None
+        self.statements = Counter()
+        self.serializing = False
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+            self.statements[sql] += 1
+
+    def finish(self):
+        now = time.perf_counter()
+        self.total_time = now - self.started
+        if self.view_started is not None:
+            self.view_time = now - self.view_started
+
+    def server_timing(self):
+        """Value of the Server-Timing header"""
+        metrics = [f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries"',
+                   f'serializer;dur={self.serializer_time * 1000:.1f}']
+        if self.view_time is not None:
+            metrics.append(f'view;dur={self.view_time * 1000:.1f}')
+        metrics.append(f'total;dur={self.total_time * 1000:.1f}')
+        return ', '.join(metrics)
+
+    def repeated_statements(self, limit=5):
+        """`[(count, fingerprint)]` of the statements run more than once, most repeated first"""
+        fingerprints = Counter()
+        for sql, count in self.statements.items():
+            fingerprints[fingerprint(sql)] += count
+        return [(count, sql) for sql, count in fingerprints.most_common(limit) if count > 1]
+
+
+@contextmanager
+def track_queries(metrics):
+    """Pass the SQL statements run in the block, on every database, through `metrics`"""
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(metrics))
+        yield
+
+
+def fingerprint(sql):
+    """`sql` without its literals, so the same statement on other rows compares equal"""
+    sql = re.sub(r"'(?:[^']|'')*'", '?', sql)
+    sql = re.sub(r'\b\d+(?:\.\d+)?\b', '?', sql)
+    sql = re.sub(r'\bIN \((?:[^()]|\([^()]*\))*\)', 'IN (...)', sql, flags=re.IGNORECASE)
+    return re.sub(r'\s+', ' ', sql).strip()
+
+
+def instrument_serializers():
+    """Time `serializer.data` of the DRF serializers of instrumented requests (once per process)"""
+    from rest_framework.serializers import BaseSerializer
+
+    data = BaseSerializer.__dict__['data']
+    if getattr(data.fget, 'instrumented', False):
+        return
+
+    @functools.wraps(data.fget)
+    def timed_data(serializer):
+        metrics = current_metrics.get()
+        # Nested serializers are part of the outermost one's time
+        if metrics is None or metrics.serializing:
+            return data.fget(serializer)
+        metrics.serializing = True
+        started = time.perf_counter()
+        try:
+            return data.fget(serializer)
+        finally:
+            metrics.serializing = False
+            metrics.serializer_time += time.perf_counter() - started
+
+    timed_data.instrumented = True
+    BaseSerializer.data = property(timed_data)
+
+
+class Histogram:
+    """Counts of observed values per bucket, with their sum and maximum"""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        index = next((i for i, bound in enumerate(self.bounds) if value <= bound), len(self.bounds))
+        self.counts[index] += 1
+        self.total += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def as_dict(self):
+        buckets = {f'<={bound}': count for bound, count in zip(self.bounds, self.counts)}
+        buckets['+Inf'] = self.counts[-1]
+        return {
+            'sum': round(self.sum, 3),
+            'mean': round(self.sum / self.total, 3) if self.total else 0.0,
+            'max': round(self.max, 3),
+            'buckets': buckets,
+        }
+
+
+class RouteStats:
+    def __init__(self):
+        self.requests = 0
+        self.server_errors = 0
+        self.duration_ms = Histogram(DURATION_BUCKETS_MS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.db_ms = 0.0
+        self.serializer_ms = 0.0
+
+    def record(self, metrics, status_code):
+        self.requests += 1
+        self.server_errors += status_code >= 500
+        self.duration_ms.observe(metrics.total_time * 1000)
+        self.queries.observe(metrics.queries)
+        self.db_ms += metrics.db_time * 1000
+        self.serializer_ms += metrics.serializer_time * 1000
+
+
+class RouteHistograms:
+    """Per-route statistics of the instrumented requests of this process"""
+
+    # Sort keys of `report()`
+    ORDERINGS = {
+        'queries': lambda stats: stats.queries.sum,
+        'duration': lambda stats: stats.duration_ms.sum,
+        'db': lambda stats: stats.db_ms,
+        'requests': lambda stats: stats.requests,
+    }
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.routes = {}
+            self.since = timezone.now()
+
+    def record(self, method, route, metrics, status_code):
+        with self.lock:
+            stats = self.routes.get((method, route))
+            if stats is None:
+                stats = self.routes[(method, route)] = RouteStats()
+            stats.record(metrics, status_code)
+
+    def report(self, ordering='queries'):
+        """The routes, highest total of `ordering` first"""
+        key = self.ORDERINGS[ordering]
+        with self.lock:
+            items = sorted(self.routes.items(), key=lambda item: key(item[1]), reverse=True)
+            return {
+                'since': self.since,
+                'routes': [{
+                    'method': method,
+                    'route': route,
+                    'requests': stats.requests,
+                    'server_errors': stats.server_errors,
+                    'queries': stats.queries.as_dict(),
+                    'duration_ms': stats.duration_ms.as_dict(),
+                    'db_ms': {'sum': round(stats.db_ms, 3), 'mean': round(stats.db_ms / stats.requests, 3)},
+                    'serializer_ms': {'sum': round(stats.serializer_ms, 3),
+                                      'mean': round(stats.serializer_ms / stats.requests, 3)},
+                } for (method, route), stats in items],
+            }
+
+
+routes = RouteHistograms()
@@ -0,0 +1,9 @@
+from django.urls import path
+from core.views import InstrumentationView
+
+app_name = 'instrumentation'
+
+urlpatterns = [
+    # Per-route request statistics (staff only)
+    path("", InstrumentationView.as_view(), name="routes"),  # GET: statistics, DELETE: reset
+]
@@ -0,0 +1,381 @@
+"""
+Prometheus metrics, without the Prometheus client library.
+
+Metric families are declared below as `Counter`s and `Histogram`s and served
+in the Prometheus text format at GET /metrics (`exposition()`):
+
+- HTTP requests per view, method and status, their latency, SQL query count
+  and database time (core.middleware.MetricsMiddleware)
+- Celery task durations per final state, and retries (`connect_celery_signals()`)
+- Email send latency and avatar thumbnail generation time (the tasks)
+
+Nothing is recorded unless METRICS_ENABLED is on. Samples are kept in a store:
+
+- without METRICS_DIR, in the memory of the process (`MemoryStore`);
+- with METRICS_DIR, in one memory-mapped file per process in that directory
+  (`FileStore`). Gunicorn workers and Celery pool processes each write their
+  own file, and /metrics adds up the files of every process, including the
+  ones that exited, so counters never go back. The files of exited processes
+  are merged into one archive file when metrics are collected. Empty the
+  directory before the processes start.
+"""
+import fcntl
+import glob
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+PREFIX = 'trello_'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+TASK_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+# Stores
+
+class MemoryStore:
+    """Sample values of this process"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.values = {}
+
+    def inc(self, key, amount):
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def collect(self):
+        with self.lock:
+            return dict(self.values)
+
+
+class FileStore:
+    """
+    Sample values of each process in `<directory>/<pid>.db`.
+
+    A file is a header holding the bytes in use, then one entry per sample:
+    the key length (4 bytes), the key and padding to 8 bytes, and the value
+    (a double). Entries are only appended, and the header is updated after
+    the entry is written, so readers never see half an entry.
+
+    Every value is a sum (histograms are stored as per-bucket counters), so the
+    files of exited processes can be added into `archive.db` and removed. This
+    keeps the directory, and the cost of a scrape, from growing with every
+    recycled Gunicorn worker or Celery child.
+    """
+    INITIAL_SIZE = 64 * 1024
+    HEADER = 8
+    ARCHIVE = 'archive.db'
+    LOCK = 'merge.lock'
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.pid = None
+
+    @contextmanager
+    def _locked(self, operation):
+        """Hold the directory lock: shared to open a file, exclusive to merge"""
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, self.LOCK), 'a') as lock:
+            fcntl.flock(lock, operation)
+            yield
+
+    def _open(self):
+        # Forked processes (Gunicorn --preload, Celery prefork) write their own file
+        self.pid = os.getpid()
+        path = os.path.join(self.directory, f'{self.pid}.db')
+        # A new process reusing the PID of a merged one must not write to a removed file
+        with self._locked(fcntl.LOCK_SH):
+            self.file = os.fdopen(os.open(path, os.O_RDWR | os.O_CREAT, 0o644), 'r+b')
+        size = os.fstat(self.file.fileno()).st_size
+        if size < self.INITIAL_SIZE:
+            self.file.truncate(self.INITIAL_SIZE)
+            size = self.INITIAL_SIZE
+        self.map = mmap.mmap(self.file.fileno(), size)
+        self.used = struct.unpack_from('i', self.map, 0)[0] or self.HEADER
+        self.offsets = {key: offset for key, _value, offset in read_entries(self.map, self.used)}
+
+    def _add(self, key):
+        encoded = key.encode()
+        value_offset = self.used + _padded(4 + len(encoded))
+        end = value_offset + 8
+        if end > len(self.map):
+            size = len(self.map)
+            while end > size:
+                size *= 2
+            self.map.close()
+            self.file.truncate(size)
+            self.map = mmap.mmap(self.file.fileno(), size)
+        struct.pack_into(f'i{len(encoded)}s', self.map, self.used, len(encoded), encoded)
+        struct.pack_into('d', self.map, value_offset, 0.0)
+        self.used = end
+        struct.pack_into('i', self.map, 0, self.used)
+        self.offsets[key] = value_offset
+        return value_offset
+
+    def inc(self, key, amount):
+        with self.lock:
+            if self.pid != os.getpid():
+                self._open()
+            offset = self.offsets.get(key)
+            if offset is None:
+                offset = self._add(key)
+            value = struct.unpack_from('d', self.map, offset)[0]
+            struct.pack_into('d', self.map, offset, value + amount)
+
+    def collect(self):
+        """Values of every process, added up, after merging the files of exited ones"""
+        with self._locked(fcntl.LOCK_EX):
+            archive = os.path.join(self.directory, self.ARCHIVE)
+            exited = [path for path in glob.glob(os.path.join(self.directory, '*.db'))
+                      if path != archive and not _running(path)]
+            if exited:
+                self._write_archive(archive, _add_files([archive] + exited))
+                for path in exited:
+                    os.remove(path)
+            return _add_files(glob.glob(os.path.join(self.directory, '*.db')))
+
+    def _write_archive(self, path, values):
+        entries = bytearray(self.HEADER)
+        for key, value in values.items():
+            encoded = key.encode()
+            entries += struct.pack(f'i{_padded(4 + len(encoded)) - 4}sd', len(encoded), encoded, value)
+        struct.pack_into('i', entries, 0, len(entries))
+        temporary = f'{path}.{os.getpid()}.tmp'
+        with open(temporary, 'wb') as file:
+            file.write(entries)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, path)
+
+
+def _running(path):
+    """Whether the process that writes `path` (`<pid>.db`) still runs"""
+    try:
+        os.kill(int(os.path.basename(path)[:-len('.db')]), 0)
+    except ProcessLookupError:
+        return False
+    except (ValueError, PermissionError):
+        pass
+    return True
+
+
+def _add_files(paths):
+    values = {}
+    for path in paths:
+        try:
+            with open(path, 'rb') as file:
+                data = file.read()
+        except FileNotFoundError:
+            continue
+        if len(data) < FileStore.HEADER:
+            continue
+        for key, value, _offset in read_entries(data, struct.unpack_from('i', data, 0)[0]):
+            values[key] = values.get(key, 0.0) + value
+    return values
+
+
+def _padded(size):
+    return (size + 7) // 8 * 8
+
+
+def read_entries(data, used):
+    """`(key, value, value offset)` of the entries of a `FileStore` file"""
+    offset = FileStore.HEADER
+    while offset < used:
+        length = struct.unpack_from('i', data, offset)[0]
+        key = bytes(data[offset + 4:offset + 4 + length]).decode()
+        value_offset = offset + _padded(4 + length)
+        yield key, struct.unpack_from('d', data, value_offset)[0], value_offset
+        offset = value_offset + 8
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                directory = settings.METRICS_DIR
+                _store = FileStore(directory) if directory else MemoryStore()
+    return _store
+
+
+def reset_store():
+    """Forget the store, e.g. after METRICS_DIR changed"""
+    global _store
+    _store = None
+
+
+# Metric families
+
+REGISTRY = {}
+
+
+def sample_key(name, labels):
+    return json.dumps([name, sorted(labels.items())])
+
+
+class Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = PREFIX + name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        REGISTRY[self.name] = self
+
+    def _labels(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes the labels {', '.join(self.labelnames)}")
+        return {name: str(value) for name, value in labels.items()}
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        if not settings.METRICS_ENABLED:
+            return
+        get_store().inc(sample_key(self.name, self._labels(labels)), amount)
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DURATION_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        if not settings.METRICS_ENABLED:
+            return
+        labels = self._labels(labels)
+        store = get_store()
+        # Buckets are stored per bound and added up by `exposition()`
+        bound = next((bound for bound in self.buckets if value <= bound), math.inf)
+        store.inc(sample_key(self.name + '_bucket', {**labels, 'le': _format_value(bound)}), 1)
+        store.inc(sample_key(self.name + '_sum', labels), value)
+        store.inc(sample_key(self.name + '_count', labels), 1)
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the seconds spent in the block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+
+HTTP_REQUESTS = Counter(
+    'http_requests_total', "HTTP requests handled, by view, method and status code.",
+    ('view', 'method', 'status'))
+HTTP_REQUEST_SECONDS = Histogram(
+    'http_request_duration_seconds', "Time to build HTTP responses, by view and method.",
+    ('view', 'method'))
+HTTP_REQUEST_QUERIES = Histogram(
+    'http_request_db_queries', "SQL queries run per HTTP request, by view and method.",
+    ('view', 'method'), buckets=QUERY_BUCKETS)
+HTTP_REQUEST_DB_SECONDS = Histogram(
+    'http_request_db_duration_seconds', "Time spent in SQL queries per HTTP request, by view and method.",
+    ('view', 'method'))
+CELERY_TASK_SECONDS = Histogram(
+    'celery_task_duration_seconds', "Celery task run time, by task and final state.",
+    ('task', 'state'), buckets=TASK_BUCKETS)
+CELERY_TASK_RETRIES = Counter(
+    'celery_task_retries_total', "Celery task retries scheduled, by task.", ('task',))
+EMAIL_SEND_SECONDS = Histogram(
+    'email_send_duration_seconds', "Time to hand an email to the mail server, by task.", ('task',))
+AVATAR_THUMBNAIL_SECONDS = Histogram(
+    'avatar_thumbnail_duration_seconds', "Time to generate and store an avatar thumbnail.")
+
+
+# Celery
+
+_task_started = {}
+
+
+def _start_task_timer(task_id=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+
+
+def _observe_task(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None and task is not None:
+        CELERY_TASK_SECONDS.observe(time.perf_counter() - started, task=task.name,
+                                    state=(state or 'unknown').lower())
+
+
+def _count_retry(sender=None, **kwargs):
+    CELERY_TASK_RETRIES.inc(task=sender.name)
+
+
+def connect_celery_signals():
+    """Record the duration and retries of every task run by this process"""
+    from celery.signals import task_postrun, task_prerun, task_retry
+
+    task_prerun.connect(_start_task_timer, weak=False)
+    task_postrun.connect(_observe_task, weak=False)
+    task_retry.connect(_count_retry, weak=False)
+
+
+# Exposition
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, int) or float(value).is_integer():
+        return f'{float(value):.1f}'
+    return repr(float(value))
+
+
+def _escape(value):
+    return value.replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _sample(name, labels, value):
+    if labels:
+        name += '{' + ','.join(f'{label}="{_escape(text)}"' for label, text in labels) + '}'
+    return f'{name} {_format_value(value)}'
+
+
+def exposition():
+    """Every metric in the Prometheus text format (version 0.0.4)"""
+    samples = {}
+    for key, value in get_store().collect().items():
+        name, labels = json.loads(key)
+        samples.setdefault(name, {})[tuple(map(tuple, labels))] = value
+
+    lines = []
+    for name, metric in sorted(REGISTRY.items()):
+        lines.append(f'# HELP {name} {metric.documentation}')
+        lines.append(f'# TYPE {name} {metric.type}')
+        if metric.type == 'counter':
+            for labels, value in sorted(samples.get(name, {}).items()):
+                lines.append(_sample(name, labels, value))
+            continue
+        buckets = samples.get(name + '_bucket', {})
+        sums = samples.get(name + '_sum', {})
+        for labels, count in sorted(samples.get(name + '_count', {}).items()):
+            cumulative = 0.0
+            for bound in metric.buckets + (math.inf,):
+                le = ('le', _format_value(bound))
+                cumulative += buckets.get(tuple(sorted(labels + (le,))), 0.0)
+                lines.append(_sample(name + '_bucket', labels + (le,), cumulative))
+            lines.append(_sample(name + '_sum', labels, sums.get(labels, 0.0)))
+            lines.append(_sample(name + '_count', labels, count))
+    return '\n'.join(lines) + '\n'
@@ -1,5 +1,15 @@
+import logging
+import time
+
 from django.utils import translation
 from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from core import metrics as prometheus
+from core.instrumentation import RequestMetrics, current_metrics, instrument_serializers, routes, track_queries
+
+logger = logging.getLogger(__name__)
+
 
 class APILanguageMiddleware:
     """
@@ -36,3 +46,88 @@ class APILanguageMiddleware:
         # Optional: set "Content-Language" header in response
         response["Content-Language"] = request.LANGUAGE_CODE
         return response
+
+
+class ActivityBufferMiddleware:
+    """
+    Middleware that collects the board activity entries committed while a
+    request is handled and writes them with one bulk INSERT before the
+    response is returned (see `boards.activity`).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        from boards.activity import buffered_activities
+
+        with buffered_activities():
+            return self.get_response(request)
+
+
+class InstrumentationMiddleware:
+    """
+    Opt-in (`REQUEST_INSTRUMENTATION`) measurement of each request: SQL
+    queries, database, serializer and view time, sent in a Server-Timing
+    header and aggregated per route (see `core.instrumentation`). Requests
+    slower than `REQUEST_SLOW_MS` are logged with their most repeated SQL.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        instrument_serializers()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = request.instrumentation = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            with track_queries(metrics):
+                response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        metrics.finish()
+
+        response['Server-Timing'] = metrics.server_timing()
+        match = request.resolver_match
+        routes.record(request.method, match.route if match else '<unmatched>', metrics, response.status_code)
+        if metrics.total_time * 1000 >= settings.REQUEST_SLOW_MS:
+            repeated = metrics.repeated_statements(settings.REQUEST_SLOW_TOP_SQL)
+            logger.warning(
+                "Slow request %s %s: %d, %.0f ms, %d queries in %.0f ms, serializers %.0f ms%s",
+                request.method, request.get_full_path(), response.status_code, metrics.total_time * 1000,
+                metrics.queries, metrics.db_time * 1000, metrics.serializer_time * 1000,
+                ''.join(f"\n  {count}x {sql}" for count, sql in repeated),
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.instrumentation.view_started = time.perf_counter()
+
+
+class MetricsMiddleware:
+    """
+    Request count, latency, SQL queries and database time of each view for
+    GET /metrics (see `core.metrics`); off when METRICS_ENABLED is false.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        with track_queries(metrics):
+            response = self.get_response(request)
+        metrics.finish()
+
+        match = request.resolver_match
+        # Unknown URLs share one label, so scanners cannot add series
+        labels = {'view': match.view_name if match else '<unmatched>', 'method': request.method}
+        prometheus.HTTP_REQUESTS.inc(status=response.status_code, **labels)
+        prometheus.HTTP_REQUEST_SECONDS.observe(metrics.total_time, **labels)
+        prometheus.HTTP_REQUEST_QUERIES.observe(metrics.queries, **labels)
+        prometheus.HTTP_REQUEST_DB_SECONDS.observe(metrics.db_time, **labels)
+        return response
@@ -0,0 +1,109 @@
+import base64
+import binascii
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination on `(created_at, id)`.
+
+    - The cursor is an opaque token holding the last row's created_at and id,
+      and any extra position of the view (see `decode_cursor_parts`).
+    - Every page is fetched with a `WHERE (created_at, id) < cursor` filter
+      instead of an OFFSET, so deep pages cost the same as the first one.
+    - Page size comes from `?page_size=`, bounded by `API_MAX_PAGE_SIZE`.
+
+    Response: {"next": <url or null>, "results": [...]}
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = _("Invalid cursor.")
+
+    def __init__(self, descending=True):
+        self.descending = descending
+        self.next_cursor = None
+        self.request = None
+
+    def get_page_size(self, request):
+        default = getattr(settings, 'API_PAGE_SIZE', 50)
+        maximum = getattr(settings, 'API_MAX_PAGE_SIZE', 200)
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, default))
+        except (TypeError, ValueError):
+            return default
+        return max(1, min(page_size, maximum))
+
+    def encode_cursor(self, obj, *extra):
+        raw = '|'.join([obj.created_at.isoformat(), str(obj.pk), *extra])
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        created_at, pk, _extra = self.decode_cursor_parts(cursor)
+        return created_at, pk
+
+    def decode_cursor_parts(self, cursor):
+        """`(created_at, id, [extra strings passed to encode_cursor])` of a cursor"""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            created_at, pk, *extra = base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+            created_at = parse_datetime(created_at)
+            pk = int(pk)
+        except (TypeError, ValueError, UnicodeDecodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        return created_at, pk, extra
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+
+        if self.descending:
+            queryset = queryset.order_by('-created_at', '-pk')
+        else:
+            queryset = queryset.order_by('created_at', 'pk')
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            created_at, pk = self.decode_cursor(cursor)
+            if self.descending:
+                queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+            else:
+                queryset = queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk))
+
+        # Fetch one extra row to know whether there is a next page
+        page = list(queryset[:page_size + 1])
+        if len(page) > page_size:
+            page = page[:page_size]
+            self.next_cursor = self.encode_cursor(page[-1])
+        return page
+
+    def get_next_link(self):
+        if not self.next_cursor:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
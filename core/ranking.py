@@ -0,0 +1,191 @@
+"""
+Sparse integer ranks for ordering lists and tasks.
+
+In rank mode (`ORDERING_MODE = 'rank'`) every list and task carries a `rank`
+spaced `RANK_GAP` apart from its neighbours. A move writes a single row with
+the midpoint of its new neighbours' ranks instead of shifting every sibling.
+When two neighbours get too close, the siblings are re-spaced by `rebalance`,
+normally from a background Celery task.
+
+The API keeps exposing the 1-based `position`; in rank mode it is derived
+from the rank order instead of being stored.
+"""
+from django.conf import settings
+from django.db import models
+from django.db.models import F, OuterRef, Q
+from django.db.models.functions import Coalesce, RowNumber
+
+# Distance between consecutive ranks after a rebalance
+RANK_GAP = 1 << 20
+
+# Schedule a background rebalance once a gap gets narrower than this
+RANK_REBALANCE_THRESHOLD = 64
+
+
+def rank_ordering_enabled():
+    """Whether lists and tasks are ordered by sparse ranks"""
+    return getattr(settings, 'ORDERING_MODE', 'position') == 'rank'
+
+
+def ordering_fields():
+    """Fields that define the display order of lists and tasks"""
+    if rank_ordering_enabled():
+        # `position` keeps legacy rows (rank 0) in their original order
+        return ('rank', 'position', 'created_at', 'id')
+    return ('position', 'created_at')
+
+
+def preceding_q():
+    """
+    Q object matching rows that come before the outer row in display order,
+    for counting a row's position in a correlated subquery.
+    """
+    condition = Q()
+    equal = Q()
+    for field in ordering_fields():
+        condition |= equal & Q(**{f'{field}__lt': OuterRef(field)})
+        equal &= Q(**{field: OuterRef(field)})
+    return condition
+
+
+def rank_between(before, after):
+    """
+    Return a rank strictly between `before` and `after` (either may be None),
+    or None when there is no integer left between them.
+    """
+    ranks = ranks_between(before, after, 1)
+    return ranks[0] if ranks else None
+
+
+def ranks_between(before, after, count):
+    """
+    Return `count` increasing ranks evenly spaced strictly between `before`
+    and `after` (either may be None), or None when they do not fit.
+    """
+    if before is None and after is None:
+        return [RANK_GAP * index for index in range(1, count + 1)]
+    if before is None:
+        return [after - RANK_GAP * index for index in range(count, 0, -1)]
+    if after is None:
+        return [before + RANK_GAP * index for index in range(1, count + 1)]
+    step = (after - before) // (count + 1)
+    if step < 1:
+        return None
+    return [before + step * index for index in range(1, count + 1)]
+
+
+def needs_rebalance(before, rank, after):
+    """Whether the gap around a freshly assigned rank is getting too narrow"""
+    gaps = []
+    if before is not None:
+        gaps.append(rank - before)
+    if after is not None:
+        gaps.append(after - rank)
+    return bool(gaps) and min(gaps) < RANK_REBALANCE_THRESHOLD
+
+
+def neighbour_ranks(siblings, new_position):
+    """
+    Ranks of the rows that will surround an item moved to the 1-based
+    `new_position` among `siblings` (which must exclude the moved item).
+    """
+    siblings = siblings.order_by(*ordering_fields())
+    if new_position <= 1:
+        after = siblings.values_list('rank', flat=True).first()
+        return None, after
+    ranks = list(siblings.values_list('rank', flat=True)[new_position - 2:new_position])
+    if not ranks:
+        # Past the end: append after the last sibling
+        return siblings.values_list('rank', flat=True).last(), None
+    before = ranks[0]
+    after = ranks[1] if len(ranks) > 1 else None
+    return before, after
+
+
+def last_rank(siblings):
+    """Rank to append a new item after `siblings`"""
+    last = siblings.order_by(*ordering_fields()).values_list('rank', flat=True).last()
+    return rank_between(last, None)
+
+
+def rebalance(siblings):
+    """Re-space the ranks of `siblings` evenly, keeping their current order"""
+    rows = list(siblings.order_by(*ordering_fields()).only('pk', 'rank'))
+    for index, row in enumerate(rows, start=1):
+        row.rank = index * RANK_GAP
+    siblings.model.objects.bulk_update(rows, ['rank'], batch_size=500)
+    return len(rows)
+
+
+class RankedQuerySet(models.QuerySet):
+    """
+    QuerySet for models ordered inside a group (tasks in a list, lists in a board).
+    Subclasses set `rank_group_field` to the group's foreign key column.
+    """
+    rank_group_field = None
+
+    def in_display_order(self):
+        """Order rows the way they are shown to users"""
+        return self.order_by(*ordering_fields())
+
+    def with_ordinal_position(self, whole_groups=True):
+        """
+        In rank mode, annotate `ordinal_position`: the row's 1-based slot in its group.
+        - whole_groups=True: a window function; only valid when every row
+          of the selected groups is in the queryset.
+        - whole_groups=False: a correlated count, valid for any subset.
+        """
+        if not rank_ordering_enabled():
+            return self
+        group = self.rank_group_field
+        if whole_groups:
+            return self.annotate(ordinal_position=models.Window(
+                expression=RowNumber(),
+                partition_by=[F(group)],
+                order_by=[F(field).asc() for field in ordering_fields()],
+            ))
+        preceding = (
+            self.model._default_manager.filter(**{group: OuterRef(group)})
+            .filter(preceding_q())
+            .order_by().values(group).annotate(total=models.Count('pk')).values('total')
+        )
+        return self.annotate(ordinal_position=Coalesce(models.Subquery(preceding), 0) + 1)
+
+
+def display_position(instance):
+    """1-based position of a list or task as exposed by the API"""
+    if not rank_ordering_enabled():
+        return instance.position
+    if hasattr(instance, 'ordinal_position'):
+        return instance.ordinal_position
+    manager = instance.__class__._default_manager
+    group = manager.get_queryset().rank_group_field
+    return (
+        manager.filter(**{group: getattr(instance, group)})
+        .with_ordinal_position(whole_groups=False)
+        .values_list('ordinal_position', flat=True)
+        .get(pk=instance.pk)
+    )
+
+
+def move_by_rank(instance, siblings, new_position, on_low_gap):
+    """
+    Give `instance` the rank of slot `new_position` among `siblings`
+    (append when None) without touching any sibling row.
+    Re-spaces the siblings synchronously only when no gap is left, and calls
+    `on_low_gap` when a background rebalance should be scheduled.
+    The caller saves `instance`.
+    """
+    if new_position is None:
+        before, after = siblings.order_by(*ordering_fields()).values_list('rank', flat=True).last(), None
+    else:
+        before, after = neighbour_ranks(siblings, new_position)
+    rank = rank_between(before, after)
+    if rank is None:
+        rebalance(siblings)
+        before, after = neighbour_ranks(siblings, new_position)
+        rank = rank_between(before, after)
+    elif needs_rebalance(before, rank, after):
+        on_low_gap()
+    instance.rank = rank
+    return rank
@@ -0,0 +1,73 @@
+"""
+Fast JSON rendering for DRF responses.
+
+`FastJSONRenderer` encodes with orjson when it is installed and falls back to
+DRF's stdlib `JSONRenderer` otherwise. The output is byte-for-byte the one of
+`JSONRenderer` with the default COMPACT_JSON / UNICODE_JSON settings: types
+orjson does not format the way DRF does (datetimes, lazy translation
+strings, decimals, querysets, ...) are passed to DRF's encoder, and U+2028 /
+U+2029 are escaped. Everything else is rendered by `JSONRenderer`:
+
+- requests for indented output (`; indent=4`, the browsable API);
+- data orjson rejects (integers beyond 64 bits);
+- floats orjson writes differently: the ones Python writes with an exponent
+  (`1e+16`, `1e-05`, where orjson writes `1e16`, `0.00001`), and NaN and
+  infinities, which orjson turns into `null` and DRF refuses under STRICT_JSON.
+
+`manage.py benchmark_json` compares the two.
+"""
+import math
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
+
+ORJSON_OPTIONS = (
+    # DRF formats datetimes as ISO 8601 with "Z" for UTC; let its encoder do it
+    orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+) if orjson else 0
+
+
+def has_stdlib_float(data):
+    """Whether `data` holds a float orjson would not write like the stdlib (see above)"""
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, float):
+            # repr() switches to an exponent outside [1e-4, 1e16)
+            if not math.isfinite(value) or (value and not 1e-4 <= abs(value) < 1e16):
+                return True
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return False
+
+
+class FastJSONRenderer(JSONRenderer):
+    encoder_default = JSONEncoder().default
+
+    def default(self, obj):
+        value = self.encoder_default(obj)
+        if has_stdlib_float(value):
+            # e.g. a Decimal encoded as a float; makes orjson raise, so JSONRenderer renders
+            raise TypeError
+        return value
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (orjson is None or data is None or self.ensure_ascii or not self.compact
+                or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+                or has_stdlib_float(data)):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Keep the output a strict JavaScript subset, as JSONRenderer does
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
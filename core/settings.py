@@ -49,6 +49,7 @@ INSTALLED_APPS = [
     'boards.apps.BoardsConfig',
     'lists.apps.ListsConfig',
     'tasks.apps.TasksConfig',
+    'search.apps.SearchConfig',
 
     # third-party
     'rest_framework',
@@ -59,6 +60,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
+    "core.middleware.InstrumentationMiddleware",
+    "core.middleware.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.locale.LocaleMiddleware",
@@ -69,6 +72,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "core.middleware.ActivityBufferMiddleware",
 ]
 
 ROOT_URLCONF = "core.urls"
@@ -187,6 +191,16 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # orjson when installed, DRF's stdlib JSON otherwise (see core/renderers.py)
+    'DEFAULT_RENDERER_CLASSES': (
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'core.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
 }
 
 from datetime import timedelta
@@ -203,12 +217,19 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
 # Celery Configuration
+from celery.schedules import crontab
 CELERY_BROKER_URL = env('CELERY_BROKER_URL', default='redis://localhost:6379/0')
 CELERY_RESULT_BACKEND = env('CELERY_RESULT_BACKEND', default=CELERY_BROKER_URL)
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    'archive-board-activities': {
+        'task': 'boards.tasks.archive_board_activities',
+        'schedule': crontab(hour=3, minute=30),
+    },
+}
 
 # Email Configuration
 EMAIL_BACKEND = env('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
@@ -230,4 +251,72 @@ FRONTEND_URL = env('FRONTEND_URL', default='http://localhost:5173/')
 MAX_BOARDS_PER_USER = 10            # Each user can create up to 10 boards
 MAX_MEMBERS_PER_BOARD = 50          # A board can have at most 50 accepted members
 MAX_MEMBERSHIPS_PER_USER = 20       # A user can participate in up to 20 boards
-
+TASK_BATCH_MAX_OPERATIONS = 500     # Operations accepted by one POST /tasks/batch/
+
+# The limits read counters stored on users and boards (see boards/counters.py).
+# `manage.py migrate` recomputes them, so counter columns added to existing rows
+# are filled in on deploy; on very large databases turn this off and run
+# `manage.py recount` once after the migration instead.
+RECOUNT_AFTER_MIGRATE = env.bool('RECOUNT_AFTER_MIGRATE', default=True)
+
+# Board permissions: seconds to cache each user's board roles across requests
+# (0 = resolve once per request only). Membership changes invalidate the cache,
+# which must therefore be shared by every process: the setting is ignored while
+# the default cache is the per-process LocMemCache (configure CACHES first).
+BOARD_ACCESS_CACHE_TIMEOUT = env.int('BOARD_ACCESS_CACHE_TIMEOUT', default=0)
+
+# Real-time board change feed (GET /boards/{id}/events/, see boards/events.py)
+BOARD_EVENTS_BACKEND = env('BOARD_EVENTS_BACKEND', default='boards.events.InProcessBackend')
+BOARD_EVENTS_REDIS_URL = env('BOARD_EVENTS_REDIS_URL', default='redis://localhost:6379/1')
+BOARD_EVENTS_HEARTBEAT = 15         # Seconds between keep-alive comments on idle streams
+
+# Board activity log (see boards/activity.py): entries are written in one bulk
+# INSERT per request; set BOARD_ACTIVITY_ASYNC to hand them to Celery instead.
+BOARD_ACTIVITY_ASYNC = env.bool('BOARD_ACTIVITY_ASYNC', default=False)
+BOARD_ACTIVITY_BATCH_SIZE = 200     # Entries per INSERT / per Celery task
+# Older activities are moved to gzip NDJSON archives on the default storage
+# (nightly by Celery beat, or `manage.py archive_activities`)
+BOARD_ACTIVITY_RETENTION_DAYS = env.int('BOARD_ACTIVITY_RETENTION_DAYS', default=90)
+BOARD_ACTIVITY_ARCHIVE_PATH = 'activity-archive'
+
+# Full-text search (GET /search/, see search/backends.py): PostgreSQL text search
+# configuration of the index; changing it requires recreating the searchdocument_fts index
+SEARCH_CONFIG = env('SEARCH_CONFIG', default='simple')
+
+# Board statistics (GET /boards/{id}/stats/, see boards/stats.py)
+BOARD_STATS_MAX_DAYS = 365          # Longest daily series returned
+
+# Board export (GET /boards/{id}/export/, `manage.py export_board`)
+BOARD_EXPORT_CHUNK_SIZE = 2000      # Rows fetched per database round trip
+
+# Board import (POST /boards/import/, `manage.py import_board`)
+BOARD_IMPORT_CHUNK_SIZE = 2000      # Rows written per bulk INSERT
+
+# Board duplication (POST /boards/{id}/duplicate/, see boards/duplicate.py)
+BOARD_DUPLICATE_BATCH_SIZE = 2000   # Rows written per bulk INSERT
+BOARD_DUPLICATE_ASYNC_THRESHOLD = 1000  # Boards with more tasks are copied by Celery
+
+# Keyset pagination (public boards, activities, comments, my-tasks)
+API_PAGE_SIZE = 50                  # Default number of items per page
+API_MAX_PAGE_SIZE = 200             # Upper bound for ?page_size=
+
+# Ordering of lists and tasks:
+#   'position' - dense positions; a move shifts every sibling in between
+#   'rank'     - sparse ranks; a move writes a single row (see core/ranking.py).
+#                Run `manage.py rebalance_ranks` once before switching.
+ORDERING_MODE = env('ORDERING_MODE', default='position')
+
+# Request instrumentation (see core/instrumentation.py): SQL queries, database,
+# serializer and view time per request in a Server-Timing header, aggregated per
+# route at GET /api/v1/instrumentation/ (staff only)
+REQUEST_INSTRUMENTATION = env.bool('REQUEST_INSTRUMENTATION', default=False)
+REQUEST_SLOW_MS = env.int('REQUEST_SLOW_MS', default=500)  # Slower requests are logged
+REQUEST_SLOW_TOP_SQL = 5            # Most repeated statements logged with a slow request
+
+# Prometheus metrics at GET /metrics (see core/metrics.py), off by default. Unless
+# DEBUG is on, /metrics is only served with METRICS_TOKEN set. With several worker
+# processes (Gunicorn, Celery prefork), set METRICS_DIR to a directory shared by
+# all of them and emptied before they start: each process writes its own file.
+METRICS_ENABLED = env.bool('METRICS_ENABLED', default=False)
+METRICS_DIR = env('METRICS_DIR', default='')
+METRICS_TOKEN = env('METRICS_TOKEN', default='')  # Scrapers send "Authorization: Bearer <token>"
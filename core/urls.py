@@ -22,6 +22,7 @@ from django.conf.urls.static import static
 from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
+from core.views import metrics_view
 
 schema_view = get_schema_view(
     openapi.Info(
@@ -54,9 +55,18 @@ urlpatterns = [
     # Task management
     path('api/v1/tasks/', include('tasks.urls')),
     
+    # Search across the user's boards
+    path('api/v1/search/', include('search.urls')),
+
     # Invitation management (separate resource)
     path('api/v1/invitations/', include('boards.invitation_urls')),
 
+    # Request instrumentation statistics (staff only)
+    path('api/v1/instrumentation/', include('core.instrumentation_urls')),
+
+    # Prometheus metrics
+    path('metrics', metrics_view, name='metrics'),
+
     # Swagger & ReDoc
     re_path(r'^swagger(?P<format>\.json|\.yaml)$', schema_view.without_ui(cache_timeout=0), name='schema-json'),
     path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.utils.translation import gettext as _
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+
+from core import metrics
+from core.instrumentation import RouteHistograms, routes
+
+
+class InstrumentationView(APIView):
+    """
+    View for the per-route request statistics of the instrumentation middleware.
+
+    Behaviour:
+    - GET: Requests, server errors, SQL query and duration histograms, database
+      and serializer time of each route served by this process since start or
+      the last reset, the routes running the most queries first
+      (`?ordering=duration|db|requests` to sort otherwise).
+    - DELETE: Reset the statistics.
+    - Staff only; empty unless REQUEST_INSTRUMENTATION is on (see `core.instrumentation`).
+
+    Endpoint: GET/DELETE /api/v1/instrumentation/
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    @swagger_auto_schema(
+        manual_parameters=[openapi.Parameter('ordering', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                                             enum=list(RouteHistograms.ORDERINGS))],
+        responses={200: openapi.Response(description='Per-route statistics'), 400: 'Bad Request', 403: 'Forbidden'}
+    )
+    def get(self, request):
+        ordering = request.query_params.get('ordering', 'queries')
+        if ordering not in RouteHistograms.ORDERINGS:
+            return Response(
+                {"error": _("Ordering must be one of: %(orderings)s.") % {
+                    'orderings': ', '.join(RouteHistograms.ORDERINGS)}},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        report = routes.report(ordering)
+        return Response({'enabled': settings.REQUEST_INSTRUMENTATION,
+                         'slow_ms': settings.REQUEST_SLOW_MS, **report}, status=status.HTTP_200_OK)
+
+    @swagger_auto_schema(responses={204: 'No Content', 403: 'Forbidden'})
+    def delete(self, request):
+        routes.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint: every metric of `core.metrics` in the text
+    exposition format. Not found unless METRICS_ENABLED is on. Requires
+    `Authorization: Bearer <METRICS_TOKEN>`; without METRICS_TOKEN, only
+    served with DEBUG on.
+
+    Endpoint: GET /metrics
+    """
+    if not settings.METRICS_ENABLED:
+        raise Http404
+    token = settings.METRICS_TOKEN
+    if not token:
+        if not settings.DEBUG:
+            return HttpResponse(status=403)
+    elif not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponse(status=401, headers={'WWW-Authenticate': 'Bearer'})
+    return HttpResponse(metrics.exposition(), content_type=metrics.CONTENT_TYPE)
@@ -92,7 +92,7 @@ export const useBoardsStore = defineStore('boards', {
     async fetchActivities(boardId) {
       try {
         const res = await api.get(`/boards/${boardId}/activities/`);
-        return res.data;
+        return res.data.results;
       } catch (e) {
         console.error(e);
         throw e.response?.data || e;
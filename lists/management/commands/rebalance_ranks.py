@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from core import ranking
+from lists.models import List
+from tasks.models import Task
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-space the ordering ranks of lists and tasks. "
+        "Run it once before switching ORDERING_MODE to 'rank' so existing rows keep their order."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--board', type=int, help="Only rebalance this board")
+
+    def handle(self, *args, **options):
+        boards = List.objects.order_by().values_list('board_id', flat=True).distinct()
+        if options['board']:
+            boards = [options['board']]
+
+        lists_count = tasks_count = 0
+        for board_id in boards:
+            lists_count += ranking.rebalance(List.objects.filter(board_id=board_id))
+            for list_id in List.objects.filter(board_id=board_id).values_list('id', flat=True):
+                tasks_count += ranking.rebalance(Task.objects.filter(list_id=list_id))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebalanced {lists_count} lists and {tasks_count} tasks."
+        ))
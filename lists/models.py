@@ -1,16 +1,38 @@
 from django.db import models
 from django.utils.translation import gettext_lazy as _
+from core import ranking
+from core.counters import CounterFieldsMixin
 
-class List(models.Model):
+
+class ListQuerySet(ranking.RankedQuerySet):
+    rank_group_field = 'board_id'
+
+
+class List(CounterFieldsMixin, models.Model):
     title = models.CharField(max_length=255)
     board = models.ForeignKey('boards.Board', on_delete=models.CASCADE, related_name='lists')
     position = models.PositiveIntegerField(default=0)
+    # Sparse ordering key used when ORDERING_MODE == 'rank' (see core.ranking)
+    rank = models.BigIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     color = models.CharField(max_length=20, default='blue')
-    
+    # Board version of the last write to this row; drives delta sync (see boards.changes)
+    change_seq = models.PositiveBigIntegerField(default=0, editable=False)
+    # Tasks of the list (see boards.counters)
+    tasks_count = models.PositiveIntegerField(default=0, editable=False)
+    completed_tasks_count = models.PositiveIntegerField(default=0, editable=False)
+
+    counter_fields = ('tasks_count', 'completed_tasks_count')
+
+    objects = ListQuerySet.as_manager()
+
     class Meta:
         ordering = ['position', 'created_at']
+        indexes = [
+            models.Index(fields=['board', 'rank'], name='list_board_rank'),
+            models.Index(fields=['board', 'change_seq'], name='list_board_change_seq'),
+        ]
 
     
     def save(self, *args, **kwargs):
@@ -20,71 +42,63 @@ class List(models.Model):
                 models.Max('position')
             )['position__max']
             self.position = (last_position or 0) + 1
+
+        if not self.pk and not self.rank and ranking.rank_ordering_enabled():
+            self.rank = ranking.last_rank(List.objects.filter(board_id=self.board_id))
         
         self.full_clean()
         super().save(*args, **kwargs)
     
     def move_to_position(self, new_position):
-        """Move list to a new position safely on SQLite/SQLite-like DBs.
-
-        This implementation avoids transient UNIQUE(board, position) conflicts by:
-        1) Temporarily moving the current list to a high position out of the active range
-        2) Shifting affected sibling rows one-by-one in a safe order
-        3) Placing the current list at its final position
-        """
+        """Move list to a new position within its board, shifting the lists in between with one UPDATE"""
         old_position = self.position
         # Clamp to at least 1 early
         if new_position < 1:
             new_position = 1
-        if old_position == new_position:
-            return
-        
         # Use a transaction to ensure atomicity
         from django.db import transaction
+
+        if ranking.rank_ordering_enabled():
+            # Rank mode: rewrite only this list's rank
+            from .tasks import rebalance_list_ranks
+
+            board_id = self.board_id
+            siblings = List.objects.filter(board_id=board_id).exclude(pk=self.pk)
+            with transaction.atomic():
+                ranking.move_by_rank(
+                    self, siblings, new_position,
+                    on_low_gap=lambda: transaction.on_commit(lambda: rebalance_list_ranks.delay(board_id)),
+                )
+                self.save(update_fields=['rank'])
+            return
+
+        if old_position == new_position:
+            return
         
         with transaction.atomic():
-            # Determine bounds and a safe temporary position (higher than any existing position)
-            board_qs = List.objects.filter(board=self.board)
-            total_lists = board_qs.count()
+            siblings = List.objects.filter(board_id=self.board_id).exclude(pk=self.pk)
             # Clamp to the end of the board
-            if new_position > total_lists:
-                new_position = total_lists
-            max_position = board_qs.aggregate(models.Max('position'))['position__max'] or 0
-            temp_position = max_position + 1000  # Use a high temporary position
-            
-            # Step 1: Move this list to a temporary position
-            self.position = temp_position
-            self.save(update_fields=['position'])
-            
-            # Step 2: Shift other lists without violating UNIQUE(board, position)
+            new_position = min(new_position, siblings.count() + 1)
+
             if new_position > old_position:
                 # Moving down: shift lists up (decrease their positions)
-                affected_ids = (board_qs
-                                .filter(position__gt=old_position, position__lte=new_position)
-                                .order_by('position')
-                                .values_list('pk', flat=True))
-                for pk in affected_ids:
-                    # Update each row individually to avoid transient duplicates
-                    List.objects.filter(pk=pk).update(position=models.F('position') - 1)
-            else:
+                siblings.filter(
+                    position__gt=old_position, position__lte=new_position
+                ).update(position=models.F('position') - 1)
+            elif new_position < old_position:
                 # Moving up: shift lists down (increase their positions)
-                affected_ids = (board_qs
-                                .filter(position__gte=new_position, position__lt=old_position)
-                                .order_by('-position')
-                                .values_list('pk', flat=True))
-                for pk in affected_ids:
-                    # Update each row individually to avoid transient duplicates
-                    List.objects.filter(pk=pk).update(position=models.F('position') + 1)
-            
-            # Step 3: Place this list at its final position
+                siblings.filter(
+                    position__gte=new_position, position__lt=old_position
+                ).update(position=models.F('position') + 1)
+
             self.position = new_position
             self.save(update_fields=['position'])
     
     @property
-    def tasks_count(self):
-        """Number of tasks in this list"""
-        return self.tasks.count()
-    
+    def display_position(self):
+        """1-based position shown by the API"""
+        return ranking.display_position(self)
+
     def __str__(self):
         return _("%(board_title)s - %(list_title)s") % {
             'board_title': self.board.title,
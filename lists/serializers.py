@@ -10,6 +10,7 @@ class ListSerializer(serializers.ModelSerializer):
     - Contains main list information
     - Optimized for speed and minimum payload size.
     """
+    position = serializers.IntegerField(source='display_position', read_only=True)
 
     class Meta:
         model = List
@@ -23,6 +24,8 @@ class ListDetailSerializer(serializers.ModelSerializer):
     - Shows all information of a specific list.
     - Used on the list details page.
     """
+    position = serializers.IntegerField(source='display_position', read_only=True)
+
     class Meta:
         model = List
         fields = ['id', 'title', 'color', 'position', 'created_at', 'updated_at']
@@ -0,0 +1,16 @@
+from celery import shared_task
+from django.db import transaction
+
+from core import ranking
+
+
+@shared_task
+def rebalance_list_ranks(board_id):
+    """
+    Celery task to re-space the ranks of every list in a board
+    once the gaps between neighbours run low (rank ordering mode).
+    """
+    from .models import List
+
+    with transaction.atomic():
+        return ranking.rebalance(List.objects.select_for_update().filter(board_id=board_id))
@@ -191,6 +191,24 @@ class ListFlowTests(APITestCase):
         self.assertEqual(list1.position, 5)
         self.assertEqual(list2.position, 6)
         
+    def test_move_list_rank_mode(self):
+        """Rank ordering mode: moving a list rewrites only its rank"""
+        from django.test import override_settings
+
+        with override_settings(ORDERING_MODE='rank'):
+            # Lists created before rank mode keep rank 0 and their position order
+            existing = list(self.board.lists.order_by('position').values_list('id', flat=True))
+            lists = [List.objects.create(board=self.board, title=f'List {i}') for i in range(3)]
+            self.client.force_authenticate(user=self.owner)
+
+            response = self.client.post(f'/api/v1/lists/{lists[2].id}/move/', {'position': 1})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+            response = self.client.get(f'/api/v1/boards/{self.board.id}/lists/')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual([item['id'] for item in response.data], [lists[2].id, *existing, lists[0].id, lists[1].id])
+            self.assertEqual([item['position'] for item in response.data], list(range(1, len(existing) + 4)))
+
     def test_move_list_by_regular_member_fails(self):
         """Move list by regular member: should be rejected (403)"""
         list_obj = List.objects.create(board=self.board, title='List', position=1)
@@ -6,6 +6,10 @@ from django.shortcuts import get_object_or_404
 from django.utils.translation import gettext_lazy as _
 from drf_yasg.utils import swagger_auto_schema
 
+from boards.activity import record_activity
+from boards.permissions import board_access
+from core.conditional import board_etag, board_version, not_modified, with_etag
+
 from .models import List
 from .serializers import (
     ListSerializer, ListDetailSerializer, ListCreateSerializer,
@@ -22,32 +26,34 @@ class ListListView(APIView):
     - POST: Create a new list in the board.
     - Lists are ordered by position.
     - Only available to authenticated users with board access.
+    - GET sends the board version as ETag and answers a matching
+      If-None-Match with 304.
     
     Endpoint: GET/POST /api/v1/boards/{board_id}/lists/
     """
     permission_classes = [permissions.IsAuthenticated]
     
-    def get_board_and_check_permission(self, board_id, user):
+    def get_board_and_check_permission(self, board_id, request):
         """Get board and check if user has access"""
         from boards.models import Board
         
         board = get_object_or_404(Board, id=board_id)
         
         # Check if user is owner or member of the board
-        if not (board.owner == user or board.memberships.filter(user=user, status='accepted').exists()):
+        if not board_access(request).can_view(board):
             raise PermissionDenied(_("You don't have permission to access this board."))
         
         return board 
     
 
-    def get_board_and_check_permission_admin(self, board_id, user):
+    def get_board_and_check_permission_admin(self, board_id, request):
         """Get board and check if user has access"""
         from boards.models import Board
         
         board = get_object_or_404(Board, id=board_id)
         
         # Check if user is owner or admin member of the board
-        if not (board.owner == user or board.memberships.filter(user=user, status='accepted', role='admin').exists()):
+        if not board_access(request).can_manage(board):
             raise PermissionDenied(_("You don't have permission to access this board."))
         
         return board 
@@ -57,16 +63,23 @@ class ListListView(APIView):
     @swagger_auto_schema(operation_summary=_("List all lists in a board"), responses={200: ListSerializer(many=True)})
     def get(self, request, board_id):
         """List all lists in a board"""
-        board = self.get_board_and_check_permission(board_id, request.user)
-        lists = board.lists.all()
+        etag = None
+        if board_access(request).can_view(board_id):
+            etag = board_etag(f'lists-{board_id}', board_version(board_id))
+            cached = not_modified(request, etag)
+            if cached:
+                return cached
+
+        board = self.get_board_and_check_permission(board_id, request)
+        lists = board.lists.with_ordinal_position().in_display_order()
         
         serializer = ListSerializer(lists, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return with_etag(Response(serializer.data, status=status.HTTP_200_OK), etag)
     
     @swagger_auto_schema(operation_summary=_("Create a new list in a board"), request_body=ListCreateSerializer, responses={201: ListDetailSerializer, 400: _("Validation Error")})
     def post(self, request, board_id):
         """Create a new list in a board"""
-        board = self.get_board_and_check_permission_admin(board_id, request.user)
+        board = self.get_board_and_check_permission_admin(board_id, request)
         
         data = request.data.copy()
         data['board'] = board.id
@@ -75,6 +88,12 @@ class ListListView(APIView):
 
         if serializer.is_valid():
             list_obj = serializer.save()
+            record_activity(
+                board=board,
+                action='create',
+                user=request.user,
+                description=_("List '%(title)s' created by %(user)s") % {'title': list_obj.title, 'user': request.user}
+            )
             response_serializer = ListDetailSerializer(list_obj)
             return Response(response_serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -83,38 +102,48 @@ class ListListView(APIView):
 class ListDetailView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
-    def get_list_and_check_permission(self, pk, user):
+    def get_list_and_check_permission(self, pk, request):
         list_obj = get_object_or_404(List, id=pk)
-        board = list_obj.board
-        if not (board.owner == user or board.memberships.filter(user=user, status='accepted').exists()):
+        if not board_access(request).can_view(list_obj.board_id):
             raise PermissionDenied(_("You don't have permission to access this list."))
         return list_obj
     
-    def get_list_and_check_permission_admin(self, pk, user):
+    def get_list_and_check_permission_admin(self, pk, request):
         list_obj = get_object_or_404(List, id=pk)
-        board = list_obj.board
-        if not (board.owner == user or board.memberships.filter(user=user, status='accepted', role='admin').exists()):
+        if not board_access(request).can_manage(list_obj.board_id):
             raise PermissionDenied(_("You don't have permission to access this list."))
         return list_obj
     
     @swagger_auto_schema(operation_summary=_("Retrieve a list"), responses={200: ListDetailSerializer})
     def get(self, request, pk):
-        list_obj = self.get_list_and_check_permission(pk, request.user)
+        list_obj = self.get_list_and_check_permission(pk, request)
         serializer = ListDetailSerializer(list_obj)
         return Response(serializer.data, status=status.HTTP_200_OK)
     
     @swagger_auto_schema(operation_summary=_("Partially update a list"), request_body=ListUpdateSerializer, responses={200: ListDetailSerializer, 400: _("Validation Error")})
     def patch(self, request, pk):
-        list_obj = self.get_list_and_check_permission_admin(pk, request.user)
+        list_obj = self.get_list_and_check_permission_admin(pk, request)
         serializer = ListUpdateSerializer(list_obj, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
+            record_activity(
+                board=list_obj.board_id,
+                action='update',
+                user=request.user,
+                description=_("List '%(title)s' updated by %(user)s") % {'title': list_obj.title, 'user': request.user}
+            )
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     @swagger_auto_schema(operation_summary=_("Delete a list"), responses={204: _("No Content")})
     def delete(self, request, pk):
-        list_obj = self.get_list_and_check_permission_admin(pk, request.user)
+        list_obj = self.get_list_and_check_permission_admin(pk, request)
+        record_activity(
+            board=list_obj.board_id,
+            action='delete',
+            user=request.user,
+            description=_("List '%(title)s' deleted by %(user)s") % {'title': list_obj.title, 'user': request.user}
+        )
         list_obj.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
@@ -122,20 +151,27 @@ class ListDetailView(APIView):
 class ListMoveView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
-    def get_list_and_check_permission(self, pk, user):
+    def get_list_and_check_permission(self, pk, request):
         list_obj = get_object_or_404(List, id=pk)
-        board = list_obj.board
-        if not (board.owner == user or board.memberships.filter(user=user, status='accepted', role='admin').exists()):
+        if not board_access(request).can_manage(list_obj.board_id):
             raise PermissionDenied(_("You don't have permission to move this list."))
         return list_obj
     
     @swagger_auto_schema(operation_summary=_("Move list to new position"), request_body=ListMoveSerializer, responses={200: ListDetailSerializer, 400: _("Validation Error")})
     def post(self, request, pk):
-        list_obj = self.get_list_and_check_permission(pk, request.user)
+        list_obj = self.get_list_and_check_permission(pk, request)
         serializer = ListMoveSerializer(data=request.data)
         if serializer.is_valid():
             new_position = serializer.validated_data['position']
             list_obj.move_to_position(new_position)
+            record_activity(
+                board=list_obj.board_id,
+                action='move',
+                user=request.user,
+                description=_("List '%(title)s' moved to position %(position)s by %(user)s") % {
+                    'title': list_obj.title, 'position': new_position, 'user': request.user
+                }
+            )
             response_serializer = ListDetailSerializer(list_obj)
             return Response(response_serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,19 @@
+"""
+HTTP load generator for the API.
+
+Virtual users log in through /api/v1/auth/login/ and replay weighted
+scenarios (open a board snapshot, move a card, toggle completion, comment,
+poll activities) against a running server, over the real URL map. The
+report gives throughput, latency percentiles and error rates per endpoint.
+
+    python manage.py seed_scale --users 1000 --tasks 100000
+    python manage.py runserver --noreload
+    python -m loadtest --url http://127.0.0.1:8000/api/v1 --workers 50 --duration 60
+
+Only the standard library is used; Django is not imported.
+"""
+from .runner import parse_weights, run_load
+from .scenarios import SCENARIOS, VirtualUser
+from .stats import Stats, format_report
+
+__all__ = ('SCENARIOS', 'Stats', 'VirtualUser', 'format_report', 'parse_weights', 'run_load')
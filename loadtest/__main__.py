@@ -0,0 +1,69 @@
+"""
+python -m loadtest --workers 50 --duration 60
+
+Logs in as the users created by `manage.py seed_scale` (seed-0@example.com,
+seed-1@example.com, ...) unless told otherwise, prints the report and exits
+with status 1 when the error rate is above --max-error-rate.
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+from .runner import parse_weights, run_load
+from .stats import format_report
+
+# Same as boards.seed.DEFAULT_PASSWORD; repeated to keep Django out of the harness
+SEED_PASSWORD = 'Seed-pass-2024!'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m loadtest', description="Replay user scenarios against the API.")
+    parser.add_argument('--url', default='http://127.0.0.1:8000/api/v1', help="API root of the server under test.")
+    parser.add_argument('--workers', type=int, default=10, help="Concurrent virtual users.")
+    parser.add_argument('--duration', type=float, default=60.0, help="Seconds to run after the ramp-up.")
+    parser.add_argument('--ramp-up', type=float, default=0.0, help="Seconds over which the workers start.")
+    parser.add_argument('--users', type=int, default=None, help="Accounts to log in as (default: one per worker).")
+    parser.add_argument('--email-template', default='seed-{n}@example.com', help="Email of account n.")
+    parser.add_argument('--password', default=SEED_PASSWORD)
+    parser.add_argument('--weights', default='', help="Scenario weights, e.g. open_board=50,comment=0.")
+    parser.add_argument('--think', type=float, default=1.0, help="Maximum pause between two actions, in seconds.")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed of the virtual users.")
+    parser.add_argument('--timeout', type=float, default=30.0, help="Seconds before a request counts as failed.")
+    parser.add_argument('--max-error-rate', type=float, default=0.01, help="Fail above this share of errors.")
+    parser.add_argument('--json', dest='json_path', help="Also write the results to this file.")
+    parser.add_argument('--quiet', action='store_true', help="No progress lines.")
+    options = parser.parse_args(argv)
+
+    if options.workers < 1:
+        parser.error("--workers must be at least 1.")
+    try:
+        weights = parse_weights(options.weights)
+    except ValueError as error:
+        parser.error(str(error))
+    accounts = [options.email_template.format(n=n) for n in range(options.users or options.workers)]
+
+    def progress(stats, elapsed):
+        print(f"{elapsed:6.0f}s  {stats.requests} requests, {stats.failures} errors", file=sys.stderr)
+
+    summary = asyncio.run(run_load(
+        options.url, accounts, options.password, workers=options.workers, duration=options.duration,
+        weights=weights, think=options.think, ramp_up=options.ramp_up, seed=options.seed,
+        timeout=options.timeout, progress=None if options.quiet else progress,
+    ))
+    print(format_report(summary))
+    if options.json_path:
+        with open(options.json_path, 'w') as output:
+            json.dump(summary, output, indent=2)
+
+    if not summary['workers']:
+        print("No virtual user could log in and find a board.", file=sys.stderr)
+        return 1
+    if summary['total']['error_rate'] > options.max_error_rate:
+        print(f"Error rate {summary['total']['error_rate']:.2%} above {options.max_error_rate:.2%}.", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+Minimal asyncio HTTP/1.1 client for the load generator.
+
+Each virtual user holds one keep-alive connection, like a browser tab, and
+sends one request at a time over it. Only the standard library is used, so the
+harness runs wherever the project does. Responses are read whole: bodies with
+a Content-Length, chunked bodies, and bodies delimited by the server closing
+the connection.
+"""
+import asyncio
+import json
+from urllib.parse import urlsplit
+
+
+class HTTPError(Exception):
+    """The server's answer could not be read as HTTP"""
+
+
+class Response:
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body) if self.body else None
+
+
+class HTTPClient:
+    """
+    Requests to the server of `base_url`; paths are relative to its path,
+    e.g. `HTTPClient('http://127.0.0.1:8000/api/v1').request('GET', '/boards/')`.
+    """
+
+    def __init__(self, base_url, timeout=30.0):
+        url = urlsplit(base_url)
+        if url.scheme not in ('http', 'https'):
+            raise ValueError(f"Unsupported URL: {base_url}")
+        self.host = url.hostname
+        self.port = url.port or (443 if url.scheme == 'https' else 80)
+        self.ssl = url.scheme == 'https'
+        self.host_header = url.netloc
+        self.prefix = url.path.rstrip('/')
+        self.timeout = timeout
+        self.reader = self.writer = None
+
+    async def request(self, method, path, payload=None, headers=None):
+        body = b''
+        request_headers = {'Host': self.host_header, 'Accept': 'application/json', 'Connection': 'keep-alive'}
+        if payload is not None:
+            body = json.dumps(payload).encode()
+            request_headers['Content-Type'] = 'application/json'
+        request_headers['Content-Length'] = str(len(body))
+        request_headers.update(headers or {})
+        head = f"{method} {self.prefix}{path} HTTP/1.1\r\n" + ''.join(
+            f"{name}: {value}\r\n" for name, value in request_headers.items()
+        ) + "\r\n"
+        message = head.encode('latin-1') + body
+
+        reused = self.writer is not None
+        while True:
+            try:
+                return await asyncio.wait_for(self._exchange(message, method), self.timeout)
+            except (ConnectionError, asyncio.IncompleteReadError) as error:
+                self.close()
+                # A kept-alive connection the server closed meanwhile: retry once on a new one
+                if not reused or getattr(error, 'partial', b''):
+                    raise
+                reused = False
+            except BaseException:
+                self.close()
+                raise
+
+    async def _exchange(self, message, method):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl or None)
+        self.writer.write(message)
+        await self.writer.drain()
+
+        status_line = await self.reader.readuntil(b'\r\n')
+        try:
+            _version, status, _reason = status_line.decode('latin-1').split(' ', 2)
+            status = int(status)
+        except ValueError:
+            raise HTTPError(f"Invalid status line: {status_line!r}")
+        headers = {}
+        while True:
+            line = await self.reader.readuntil(b'\r\n')
+            if line == b'\r\n':
+                break
+            name, _sep, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+            body = b''
+        elif headers.get('transfer-encoding', '').lower() == 'chunked':
+            body = await self._read_chunked()
+        elif 'content-length' in headers:
+            body = await self.reader.readexactly(int(headers['content-length']))
+        else:
+            body = await self.reader.read()
+            headers['connection'] = 'close'
+
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+        return Response(status, headers, body)
+
+    async def _read_chunked(self):
+        chunks = []
+        while True:
+            size = int((await self.reader.readuntil(b'\r\n')).split(b';')[0], 16)
+            if not size:
+                # Trailers end with an empty line
+                while await self.reader.readuntil(b'\r\n') != b'\r\n':
+                    pass
+                return b''.join(chunks)
+            chunks.append(await self.reader.readexactly(size))
+            await self.reader.readexactly(2)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
@@ -0,0 +1,83 @@
+"""
+Drive the API with concurrent virtual users.
+
+`run_load()` starts `workers` asyncio tasks, spread over `ramp_up` seconds.
+Each logs in as one of the `accounts`, then repeats weighted scenarios (see
+`loadtest.scenarios`) until the run ends, pausing up to `think` seconds
+between actions. A user without boards hands over to the next account.
+"""
+import asyncio
+import random
+import time
+
+from .client import HTTPClient
+from .scenarios import SCENARIOS, VirtualUser
+from .stats import Stats
+
+# Accounts a worker tries before giving up on finding one with boards
+MAX_LOGIN_ATTEMPTS = 5
+
+
+def parse_weights(text):
+    """`'open_board=50,comment=0'` -> weights of every scenario, defaults for the others"""
+    weights = {name: weight for name, (_scenario, weight) in SCENARIOS.items()}
+    for item in filter(None, (text or '').split(',')):
+        name, _sep, value = item.partition('=')
+        if name.strip() not in SCENARIOS:
+            raise ValueError(f"Unknown scenario {name!r}; choose from {', '.join(SCENARIOS)}.")
+        weights[name.strip()] = float(value)
+    if not any(weights.values()):
+        raise ValueError("At least one scenario needs a positive weight.")
+    return weights
+
+
+async def run_load(base_url, accounts, password, workers=10, duration=60.0, weights=None, think=1.0,
+                   ramp_up=0.0, seed=0, timeout=30.0, progress=None, interval=5.0):
+    """
+    Run the load test and return `Stats.summarize()` with the number of
+    `workers` that found boards to work on. `progress(stats, elapsed)` is
+    called every `interval` seconds.
+    """
+    weights = weights or parse_weights('')
+    names = [name for name, weight in weights.items() if weight > 0]
+    stats = Stats()
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    deadline = started + ramp_up + duration
+    active = []
+
+    async def worker(index):
+        rng = random.Random(seed * 100_003 + index)
+        await asyncio.sleep(ramp_up * index / max(workers, 1))
+        client = HTTPClient(base_url, timeout)
+        user = VirtualUser(client, stats, rng)
+        try:
+            for attempt in range(MAX_LOGIN_ATTEMPTS):
+                if await user.start(accounts[(index + attempt * workers) % len(accounts)], password):
+                    break
+            else:
+                return
+            active.append(index)
+            while loop.time() < deadline:
+                scenario = SCENARIOS[rng.choices(names, [weights[name] for name in names])[0]][0]
+                await scenario(user)
+                if think:
+                    await asyncio.sleep(rng.uniform(0, think))
+        finally:
+            client.close()
+
+    async def report():
+        while True:
+            await asyncio.sleep(interval)
+            progress(stats, loop.time() - started)
+
+    reporter = loop.create_task(report()) if progress else None
+    measured = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker(index) for index in range(workers)))
+    finally:
+        if reporter:
+            reporter.cancel()
+    summary = stats.summarize(time.perf_counter() - measured)
+    summary['workers'] = len(active)
+    return summary
@@ -0,0 +1,132 @@
+"""
+What a virtual user does.
+
+`VirtualUser` logs in through /auth/login/, lists its boards and keeps the
+last snapshot of each board it opened, revalidated with its ETag like the
+front end does. Each scenario is one user action; the runner picks them at
+random in proportion to `SCENARIOS` weights.
+"""
+import time
+
+from .client import HTTPError
+
+
+class VirtualUser:
+    def __init__(self, client, stats, rng):
+        self.client = client
+        self.stats = stats
+        self.rng = rng
+        self.token = None
+        self.boards = []
+        self.snapshots = {}
+        self.etags = {}
+
+    async def call(self, name, method, path, payload=None, headers=None, ok=()):
+        """
+        Send a request, recorded under `name`; returns the response, or None
+        when it failed (an error status not in `ok`, or no response at all).
+        """
+        if self.token:
+            headers = {'Authorization': f'Bearer {self.token}', **(headers or {})}
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, payload, headers)
+        except (OSError, EOFError, HTTPError) as error:
+            self.stats.record(name, time.perf_counter() - started, type(error).__name__)
+            return None
+        failed = response.status >= 400 and response.status not in ok
+        self.stats.record(name, time.perf_counter() - started, str(response.status) if failed else None)
+        return None if failed else response
+
+    async def start(self, email, password):
+        """Log in as `email` and load the user's boards; False if the user cannot work on any board"""
+        self.token = None
+        response = await self.call('POST /auth/login/', 'POST', '/auth/login/',
+                                   {'email': email, 'password': password})
+        if response is None:
+            return False
+        self.token = response.json()['access']
+        response = await self.call('GET /boards/', 'GET', '/boards/')
+        self.boards = [board['id'] for board in response.json()] if response is not None else []
+        return bool(self.boards)
+
+    def pick_board(self):
+        return self.rng.choice(self.boards)
+
+    async def snapshot(self, board_id, refresh=False):
+        """The board's snapshot, loaded when missing or `refresh`ed (304 keeps the copy)"""
+        if board_id in self.snapshots and not refresh:
+            return self.snapshots[board_id]
+        headers = {'If-None-Match': self.etags[board_id]} if board_id in self.etags else None
+        response = await self.call('GET /boards/{id}/snapshot/', 'GET', f'/boards/{board_id}/snapshot/', headers=headers)
+        if response is not None and response.status == 200:
+            self.snapshots[board_id] = response.json()
+            if 'etag' in response.headers:
+                self.etags[board_id] = response.headers['etag']
+        return self.snapshots.get(board_id)
+
+    async def pick_task(self):
+        """`(snapshot, list, task)` of a random task of a random board, or None"""
+        snapshot = await self.snapshot(self.pick_board())
+        lists = [list_data for list_data in (snapshot or {}).get('lists', []) if list_data['tasks']]
+        if not lists:
+            return None
+        list_data = self.rng.choice(lists)
+        return snapshot, list_data, self.rng.choice(list_data['tasks'])
+
+
+async def open_board(user):
+    """Open a board: reload its snapshot"""
+    await user.snapshot(user.pick_board(), refresh=True)
+
+
+async def move_card(user):
+    """Drag a card to a random place of a list of the same board"""
+    picked = await user.pick_task()
+    if picked is None:
+        return
+    snapshot, source, task = picked
+    target = user.rng.choice(snapshot['lists'])
+    position = user.rng.randint(1, len(target['tasks']) + 1)
+    response = await user.call('POST /tasks/{id}/move/', 'POST', f"/tasks/{task['id']}/move/",
+                               {'new_list': target['id'], 'new_position': position})
+    if response is not None:
+        source['tasks'].remove(task)
+        target['tasks'].insert(position - 1, task)
+
+
+async def toggle_completion(user):
+    """Tick or untick a card"""
+    picked = await user.pick_task()
+    if picked is None:
+        return
+    task = picked[2]
+    response = await user.call('POST /tasks/{id}/toggle-complete/', 'POST', f"/tasks/{task['id']}/toggle-complete/")
+    if response is not None:
+        task['is_completed'] = not task['is_completed']
+
+
+async def comment(user):
+    """Comment on a card"""
+    picked = await user.pick_task()
+    if picked is None:
+        return
+    task = picked[2]
+    await user.call('POST /tasks/{id}/comments/', 'POST', f"/tasks/{task['id']}/comments/",
+                    {'content': f"Load test comment {user.rng.randrange(10 ** 6)}"})
+
+
+async def poll_activities(user):
+    """Refresh the activity feed of a board"""
+    board_id = user.pick_board()
+    await user.call('GET /boards/{id}/activities/', 'GET', f'/boards/{board_id}/activities/')
+
+
+# Scenario name -> (coroutine function, default weight)
+SCENARIOS = {
+    'open_board': (open_board, 30),
+    'move_card': (move_card, 15),
+    'toggle_completion': (toggle_completion, 15),
+    'comment': (comment, 10),
+    'poll_activities': (poll_activities, 30),
+}
@@ -0,0 +1,78 @@
+"""
+Per-endpoint results of a load test: request count, throughput, error rate
+and latency percentiles. Endpoints are named after their URL pattern
+(e.g. `POST /tasks/{id}/move/`), so results add up across boards and tasks.
+"""
+from collections import Counter, defaultdict
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of sorted `values`"""
+    if not values:
+        return 0.0
+    index = max(0, min(len(values) - 1, round(percent / 100 * len(values) + 0.5) - 1))
+    return values[index]
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(Counter)
+
+    def record(self, name, seconds, error=None):
+        """One request to `name`, with the status code or exception name of a failure"""
+        self.latencies[name].append(seconds)
+        if error is not None:
+            self.errors[name][error] += 1
+
+    @property
+    def requests(self):
+        return sum(len(latencies) for latencies in self.latencies.values())
+
+    @property
+    def failures(self):
+        return sum(sum(errors.values()) for errors in self.errors.values())
+
+    def summarize(self, duration):
+        """`{'duration', 'endpoints': {name: results}, 'total': results}` of a run of `duration` seconds"""
+        endpoints = {name: self._results(latencies, self.errors[name], duration)
+                     for name, latencies in sorted(self.latencies.items())}
+        every = [latency for latencies in self.latencies.values() for latency in latencies]
+        errors = sum(self.errors.values(), Counter())
+        return {'duration': round(duration, 3), 'endpoints': endpoints,
+                'total': self._results(every, errors, duration)}
+
+    def _results(self, latencies, errors, duration):
+        latencies = sorted(latencies)
+        failed = sum(errors.values())
+        results = {
+            'requests': len(latencies),
+            'rps': round(len(latencies) / duration, 2) if duration else 0.0,
+            'errors': dict(errors),
+            'error_rate': round(failed / len(latencies), 4) if latencies else 0.0,
+        }
+        for percent in PERCENTILES:
+            results[f'p{percent}_ms'] = round(percentile(latencies, percent) * 1000, 2)
+        results['max_ms'] = round(latencies[-1] * 1000, 2) if latencies else 0.0
+        return results
+
+
+def format_report(summary):
+    """Text table of a `Stats.summarize()` result"""
+    columns = ['requests', 'rps', 'error_rate'] + [f'p{percent}_ms' for percent in PERCENTILES] + ['max_ms']
+    width = max([len(name) for name in summary['endpoints']] + [5])
+    lines = [f"{'endpoint':<{width}} " + ' '.join(f"{column:>10}" for column in columns)]
+    rows = list(summary['endpoints'].items()) + [('total', summary['total'])]
+    for name, results in rows:
+        cells = []
+        for column in columns:
+            value = results[column]
+            cells.append(f"{value:>10.2%}" if column == 'error_rate' else f"{value:>10}")
+        lines.append(f"{name:<{width}} " + ' '.join(cells))
+    for name, results in rows[:-1]:
+        if results['errors']:
+            lines.append(f"{name}: " + ', '.join(f"{error} x{count}" for error, count in results['errors'].items()))
+    lines.append(f"{summary['total']['requests']} requests in {summary['duration']:.1f}s")
+    return '\n'.join(lines)
@@ -0,0 +1,57 @@
+import asyncio
+from django.contrib.auth import get_user_model
+from django.test import LiveServerTestCase, override_settings
+from django.utils import timezone
+from boards.models import Board, BoardMembership
+
+User = get_user_model()
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class LoadTestFlowTests(LiveServerTestCase):
+    """The load generator against a live server"""
+
+    def setUp(self):
+        self.owner, self.member = [
+            User.objects.create_user(email=f'{name}@example.com', username=name, password='Pass123!',
+                                     is_active=True, email_verified_at=timezone.now())
+            for name in ('owner', 'member')
+        ]
+        self.board = Board.objects.create(title='Load', owner=self.owner)
+        BoardMembership.objects.create(board=self.board, user=self.member, role='member', status='accepted',
+                                       invited_by=self.owner)
+
+    def test_run_load_replays_every_scenario_without_errors(self):
+        """Workers log in, then open boards, move, toggle and comment cards and poll activities"""
+        from loadtest import SCENARIOS, format_report, run_load
+        from tasks.models import Task
+
+        for index, list_obj in enumerate(self.board.lists.all()):
+            Task.objects.create(list=list_obj, title=f'Task {index}', created_by=self.owner)
+            Task.objects.create(list=list_obj, title=f'Other {index}', created_by=self.owner)
+
+        # One worker: the live server threads share the test database connection, so
+        # concurrent transactions would collide there (not on a real server)
+        summary = asyncio.run(run_load(
+            f'{self.live_server_url}/api/v1', ['member@example.com'], 'Pass123!',
+            workers=1, duration=2.0, weights={name: 1 for name in SCENARIOS}, think=0, timeout=10,
+        ))
+
+        self.assertEqual(summary['workers'], 1, format_report(summary))
+        self.assertEqual(summary['total']['error_rate'], 0.0, format_report(summary))
+        self.assertEqual(set(summary['endpoints']), {
+            'POST /auth/login/', 'GET /boards/', 'GET /boards/{id}/snapshot/', 'POST /tasks/{id}/move/',
+            'POST /tasks/{id}/toggle-complete/', 'POST /tasks/{id}/comments/', 'GET /boards/{id}/activities/',
+        })
+        self.assertTrue(self.board.activities.filter(action='comment').exists())
+        self.assertGreater(summary['endpoints']['GET /boards/{id}/snapshot/']['p99_ms'], 0)
+
+    def test_unknown_accounts_start_no_worker(self):
+        """Failed logins are reported and no scenario runs"""
+        from loadtest import run_load
+
+        summary = asyncio.run(run_load(f'{self.live_server_url}/api/v1', ['nobody@example.com'], 'wrong',
+                                       workers=1, duration=0.5, think=0))
+
+        self.assertEqual(summary['workers'], 0)
+        self.assertEqual(summary['endpoints']['POST /auth/login/']['errors'], {'401': 5})
@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+class SearchConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "search"
+
+    def ready(self):
+        import search.signals
+        from search.backends import setup_search_index
+
+        # The engine-specific index lives outside the ORM; create it after the tables
+        post_migrate.connect(setup_search_index, sender=self)
@@ -0,0 +1,157 @@
+"""
+Full-text search backends over `SearchDocument`.
+
+- PostgreSQL: a GIN index on the weighted `tsvector` of title and body,
+  queried with `to_tsquery` and ranked with `ts_rank`.
+- SQLite: an FTS5 table mirroring the documents through triggers, queried
+  with MATCH and ranked with `bm25`.
+- Any other database: a LIKE scan; correct, but not an index.
+
+The backend matching the default database is picked automatically.
+Queries are reduced to their words, each matched as a prefix, all required.
+"""
+import re
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from .models import SearchDocument
+
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def query_terms(query, max_terms=8):
+    return WORD_RE.findall(query or '')[:max_terms]
+
+
+def in_clause(column, values):
+    return f"{column} IN ({', '.join(['%s'] * len(values))})", list(values)
+
+
+class LikeSearchBackend:
+    """Fallback without a full-text index"""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def setup(self):
+        pass
+
+    def search(self, terms, board_ids, kinds=None, limit=20):
+        """`[(document id, score)]`, best match first"""
+        from django.db.models import Q
+
+        documents = SearchDocument.objects.filter(board_id__in=board_ids)
+        if kinds:
+            documents = documents.filter(kind__in=kinds)
+        for term in terms:
+            documents = documents.filter(Q(title__icontains=term) | Q(body__icontains=term))
+        return [(pk, 0.0) for pk in documents.order_by('-updated_at').values_list('pk', flat=True)[:limit]]
+
+
+class PostgresSearchBackend(LikeSearchBackend):
+    index_name = 'searchdocument_fts'
+
+    @property
+    def config(self):
+        # 'simple' works for every language the app is translated to
+        return getattr(settings, 'SEARCH_CONFIG', 'simple')
+
+    def vector_sql(self):
+        # Must stay identical to the indexed expression
+        return (
+            f"(setweight(to_tsvector('{self.config}', coalesce(title, '')), 'A') || "
+            f"setweight(to_tsvector('{self.config}', coalesce(body, '')), 'B'))"
+        )
+
+    def setup(self):
+        table = SearchDocument._meta.db_table
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.index_name} ON {table} USING GIN ({self.vector_sql()})"
+            )
+
+    def search(self, terms, board_ids, kinds=None, limit=20):
+        table = SearchDocument._meta.db_table
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        where, params = in_clause('board_id', board_ids)
+        if kinds:
+            kind_where, kind_params = in_clause('kind', kinds)
+            where += f' AND {kind_where}'
+            params += kind_params
+        sql = (
+            f"SELECT id, ts_rank({self.vector_sql()}, query) AS score "
+            f"FROM {table}, to_tsquery('{self.config}', %s) AS query "
+            f"WHERE {where} AND {self.vector_sql()} @@ query "
+            f"ORDER BY score DESC, id DESC LIMIT %s"
+        )
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, [tsquery, *params, limit])
+            return cursor.fetchall()
+
+
+class SQLiteSearchBackend(LikeSearchBackend):
+    fts_table = 'search_searchdocument_fts'
+
+    def setup(self):
+        table = SearchDocument._meta.db_table
+        fts = self.fts_table
+        statements = [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+            f"title, body, content='{table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); "
+            f"INSERT INTO {fts}(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+        ]
+        with self.connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+    def search(self, terms, board_ids, kinds=None, limit=20):
+        table = SearchDocument._meta.db_table
+        fts = self.fts_table
+        match = ' '.join('"{}"*'.format(term.replace('"', '')) for term in terms)
+        where, params = in_clause('d.board_id', board_ids)
+        if kinds:
+            kind_where, kind_params = in_clause('d.kind', kinds)
+            where += f' AND {kind_where}'
+            params += kind_params
+        # bm25() is lower for better matches; titles weigh more than bodies
+        sql = (
+            f"SELECT d.id, -bm25({fts}, 4.0, 1.0) AS score "
+            f"FROM {fts} JOIN {table} d ON d.id = {fts}.rowid "
+            f"WHERE {fts} MATCH %s AND {where} "
+            f"ORDER BY score DESC, d.id DESC LIMIT %s"
+        )
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, [match, *params, limit])
+            return cursor.fetchall()
+
+
+_fts5_support = {}
+
+
+def _sqlite_has_fts5(connection):
+    if connection.alias not in _fts5_support:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+            _fts5_support[connection.alias] = bool(cursor.fetchone()[0])
+    return _fts5_support[connection.alias]
+
+
+def get_search_backend(using=DEFAULT_DB_ALIAS):
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        return PostgresSearchBackend(connection)
+    if connection.vendor == 'sqlite' and _sqlite_has_fts5(connection):
+        return SQLiteSearchBackend(connection)
+    return LikeSearchBackend(connection)
+
+
+def setup_search_index(using=DEFAULT_DB_ALIAS, **kwargs):
+    """post_migrate handler creating the engine-specific full-text index"""
+    get_search_backend(using).setup()
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from boards.models import Board
+from lists.models import List
+from search.backends import get_search_backend
+from search.models import SearchDocument
+from search.signals import document_for, index_documents
+from tasks.models import Task, TaskComment
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the search documents of every board, list, task and comment. "
+        "Run it once after installing the search app; signals keep the index in sync afterwards."
+    )
+
+    def handle(self, *args, **options):
+        querysets = [
+            Board.objects.all(),
+            List.objects.all(),
+            Task.objects.select_related('list'),
+            TaskComment.objects.select_related('task__list'),
+        ]
+        with transaction.atomic():
+            get_search_backend().setup()
+            SearchDocument.objects.all().delete()
+            total = 0
+            for queryset in querysets:
+                batch = []
+                for instance in queryset.order_by('pk').iterator(chunk_size=2000):
+                    batch.append(document_for(instance))
+                    if len(batch) >= 2000:
+                        total += len(index_documents(batch))
+                        batch = []
+                if batch:
+                    total += len(index_documents(batch))
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} search documents."))
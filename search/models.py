@@ -0,0 +1,40 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class SearchDocument(models.Model):
+    """
+    Searchable text of one board, list, task or comment.
+
+    A shadow table kept in sync by `search.signals`; the full-text index of
+    the database engine is built on top of it (see `search.backends`). The
+    foreign keys make the documents go away with the rows they describe,
+    including through cascades.
+    """
+    KIND_CHOICES = [
+        ('board', _("Board")),
+        ('list', _("List")),
+        ('task', _("Task")),
+        ('comment', _("Comment")),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    board = models.ForeignKey('boards.Board', on_delete=models.CASCADE, related_name='+')
+    list = models.ForeignKey('lists.List', on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    # The task itself for tasks, the commented task for comments
+    task = models.ForeignKey('tasks.Task', on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    title = models.CharField(max_length=255, blank=True)
+    body = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='searchdocument_kind_object'),
+        ]
+        indexes = [
+            models.Index(fields=['board', 'kind'], name='searchdocument_board_kind'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id}: {self.title}"
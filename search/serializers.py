@@ -0,0 +1,26 @@
+from rest_framework import serializers
+
+from .models import SearchDocument
+
+
+class SearchResultSerializer(serializers.ModelSerializer):
+    """
+    Serializer for search results.
+    - `id` is the id of the matched board, list, task or comment.
+    - `task` is set for tasks and comments, `snippet` is the start of the body.
+    """
+    type = serializers.CharField(source='kind', read_only=True)
+    id = serializers.IntegerField(source='object_id', read_only=True)
+    board_title = serializers.CharField(source='board.title', read_only=True)
+    snippet = serializers.SerializerMethodField()
+    score = serializers.SerializerMethodField()
+
+    class Meta:
+        model = SearchDocument
+        fields = ['type', 'id', 'board', 'board_title', 'task', 'title', 'snippet', 'score']
+
+    def get_snippet(self, obj):
+        return obj.body[:200]
+
+    def get_score(self, obj):
+        return round(getattr(obj, 'score', 0.0), 4)
@@ -0,0 +1,95 @@
+"""
+Keep `SearchDocument` in sync with the searchable models.
+
+Saves upsert the document with one INSERT ... ON CONFLICT, and saves that
+touch none of the indexed fields are skipped. Deleted rows take their
+documents with them through the documents' foreign keys.
+"""
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from boards.models import Board
+from lists.models import List
+from tasks.models import Task, TaskComment
+
+from .models import SearchDocument
+
+INDEXED_FIELDS = {
+    Board: {'title', 'description'},
+    List: {'title'},
+    Task: {'title', 'description', 'list'},
+    TaskComment: {'content'},
+}
+
+
+def document_for(instance):
+    """Unsaved `SearchDocument` describing `instance`"""
+    if isinstance(instance, Board):
+        return SearchDocument(kind='board', object_id=instance.pk, board_id=instance.pk,
+                              title=instance.title, body=instance.description or '')
+    if isinstance(instance, List):
+        return SearchDocument(kind='list', object_id=instance.pk, board_id=instance.board_id,
+                              list_id=instance.pk, title=instance.title)
+    if isinstance(instance, Task):
+        return SearchDocument(kind='task', object_id=instance.pk, board_id=instance.list.board_id,
+                              task_id=instance.pk, title=instance.title, body=instance.description or '')
+    return SearchDocument(kind='comment', object_id=instance.pk, board_id=instance.task.list.board_id,
+                          task_id=instance.task_id, body=instance.content)
+
+
+def index_documents(documents):
+    """Insert or update `documents` in a single query"""
+    return SearchDocument.objects.bulk_create(
+        documents, batch_size=500,
+        update_conflicts=True, unique_fields=['kind', 'object_id'],
+        update_fields=['board', 'list', 'task', 'title', 'body', 'updated_at'],
+    )
+
+
+@receiver(post_save, sender=Board)
+@receiver(post_save, sender=List)
+@receiver(post_save, sender=Task)
+@receiver(post_save, sender=TaskComment)
+def index_saved_object(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not INDEXED_FIELDS[sender] & set(update_fields):
+        return
+    document, = index_documents([document_for(instance)])
+    if sender is Task and not kwargs.get('created'):
+        # Comments follow their task to another board
+        SearchDocument.objects.filter(kind='comment', task=instance).exclude(
+            board_id=document.board_id).update(board_id=document.board_id)
+
+
+@receiver(post_delete, sender=TaskComment)
+def remove_deleted_comment(sender, instance, origin=None, **kwargs):
+    # Board, list and task documents reference their own row and are removed
+    # by the delete cascade; comment documents reference the commented task
+    deleted_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if issubclass(deleted_model, (Board, List, Task)):
+        return
+    SearchDocument.objects.filter(kind='comment', object_id=instance.pk).delete()
+
+
+def index_board(board_id, new_rows_only=False):
+    """
+    (Re)index a board and everything on it, e.g. after a bulk import. With
+    `new_rows_only`, only its lists, tasks and comments not yet stamped for
+    delta sync (`change_seq=0`, see boards.changes): the bulk-written ones.
+    """
+    objects = [
+        List.objects.filter(board_id=board_id),
+        Task.objects.filter(list__board_id=board_id).select_related('list'),
+        TaskComment.objects.filter(task__list__board_id=board_id).select_related('task__list'),
+    ]
+    if new_rows_only:
+        objects = [queryset.filter(change_seq=0) for queryset in objects]
+    objects.insert(0, Board.objects.filter(pk=board_id))
+    documents = []
+    for queryset in objects:
+        for instance in queryset.iterator(chunk_size=2000):
+            documents.append(document_for(instance))
+            if len(documents) >= 2000:
+                index_documents(documents)
+                documents = []
+    index_documents(documents)
@@ -0,0 +1,139 @@
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from boards.models import Board, BoardMembership
+from lists.models import List
+from tasks.models import Task, TaskComment
+from search.models import SearchDocument
+
+User = get_user_model()
+
+
+class SearchFlowTests(APITestCase):
+    """Full-text search flow tests"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.owner = User.objects.create_user(
+            email='owner@example.com', username='owner', password='Pass123!', is_active=True
+        )
+        self.member = User.objects.create_user(
+            email='member@example.com', username='member', password='Pass123!', is_active=True
+        )
+        self.outsider = User.objects.create_user(
+            email='outsider@example.com', username='outsider', password='Pass123!', is_active=True
+        )
+        self.board = Board.objects.create(title='Website relaunch', owner=self.owner)
+        BoardMembership.objects.create(
+            board=self.board, user=self.member, role='member', status='accepted', invited_by=self.owner
+        )
+        self.list = List.objects.create(board=self.board, title='Backlog', position=1)
+        self.title_task = Task.objects.create(
+            list=self.list, title='Deploy the staging server', position=1, created_by=self.owner
+        )
+        self.body_task = Task.objects.create(
+            list=self.list, title='Release notes', description='Mention the staging deploy', position=2,
+            created_by=self.owner
+        )
+        self.comment = TaskComment.objects.create(
+            task=self.body_task, user=self.member, content='Staging credentials are in the vault'
+        )
+
+        self.other_board = Board.objects.create(title='Private plans', owner=self.outsider)
+        other_list = List.objects.create(board=self.other_board, title='Ideas', position=1)
+        Task.objects.create(list=other_list, title='Staging secrets', position=1, created_by=self.outsider)
+
+        self.url = reverse('search:search')
+
+    def search(self, **params):
+        return self.client.get(self.url, params)
+
+    def test_search_ranks_matches_and_scopes_to_accessible_boards(self):
+        """Prefix matches across kinds, titles first, other boards hidden"""
+        self.client.force_authenticate(user=self.member)
+
+        response = self.search(q='stag dep')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['results']
+        self.assertEqual([(r['type'], r['id']) for r in results][:2],
+                         [('task', self.title_task.id), ('task', self.body_task.id)])
+        self.assertEqual(results[0]['board'], self.board.id)
+        self.assertEqual(results[0]['board_title'], 'Website relaunch')
+
+        response = self.search(q='staging')
+        found = {(r['type'], r['id']) for r in response.data['results']}
+        self.assertEqual(found, {('task', self.title_task.id), ('task', self.body_task.id),
+                                 ('comment', self.comment.id)})
+
+        comment_result = next(r for r in response.data['results'] if r['type'] == 'comment')
+        self.assertEqual(comment_result['task'], self.body_task.id)
+
+        response = self.search(q='staging', type='comment,board')
+        self.assertEqual([(r['type'], r['id']) for r in response.data['results']],
+                         [('comment', self.comment.id)])
+
+        # The outsider only sees their own board
+        self.client.force_authenticate(user=self.outsider)
+        response = self.search(q='staging')
+        self.assertEqual([r['board'] for r in response.data['results']], [self.other_board.id])
+
+    def test_search_index_follows_changes(self):
+        """Renames, deletions and cascades update the index"""
+        self.client.force_authenticate(user=self.owner)
+
+        self.title_task.title = 'Provision the database'
+        self.title_task.save()
+        self.assertEqual([r['id'] for r in self.search(q='provision').data['results']], [self.title_task.id])
+        self.assertNotIn(self.title_task.id, [r['id'] for r in self.search(q='staging', type='task').data['results']])
+
+        # Saves that do not touch indexed fields do not rewrite the document
+        with CaptureQueriesContext(connection) as queries:
+            self.title_task.save(update_fields=['position'])
+        self.assertFalse([q for q in queries.captured_queries if 'search_searchdocument' in q['sql']])
+
+        self.comment.delete()
+        self.assertFalse(SearchDocument.objects.filter(kind='comment').exists())
+
+        self.list.delete()
+        self.assertEqual(self.search(q='staging').data['results'], [])
+        self.assertEqual([r['type'] for r in self.search(q='relaunch').data['results']], ['board'])
+
+    def test_search_validation_and_rebuild(self):
+        """Empty queries and unknown types are rejected; the index can be rebuilt"""
+        self.client.force_authenticate(user=self.member)
+        self.assertEqual(self.search(q=' ?! ').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.search(q='staging', type='user').status_code, status.HTTP_400_BAD_REQUEST)
+
+        SearchDocument.objects.all().delete()
+        self.assertEqual(self.search(q='staging').data['results'], [])
+        call_command('rebuild_search_index', stdout=open('/dev/null', 'w'))
+        self.assertEqual(len(self.search(q='staging').data['results']), 3)
+
+    def test_import_into_a_board_indexes_only_the_new_rows(self):
+        """Cards imported into an existing board are searchable; the rest of the board is not reindexed"""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        statements = []
+
+        def record(execute, sql, params, many, context):
+            statements.append((sql, params))
+            return execute(sql, params, many, context)
+
+        self.client.force_authenticate(user=self.owner)
+        upload = SimpleUploadedFile('cards.csv', b'list,title,priority\nBacklog,Rotate staging keys,high\n')
+        with connection.execute_wrapper(record):
+            response = self.client.post(reverse('boards:board-import'), {'file': upload, 'board': self.board.id},
+                                        format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        imported = Task.objects.get(title='Rotate staging keys')
+        self.assertEqual([r['id'] for r in self.search(q='rotate').data['results']], [imported.id])
+        # One upsert, of the board and the imported task only
+        upserts = [params for sql, params in statements if sql.startswith('INSERT INTO "search_searchdocument"')]
+        self.assertEqual(len(upserts), 1)
+        self.assertIn('Rotate staging keys', upserts[0])
+        self.assertNotIn('Deploy the staging server', upserts[0])
@@ -0,0 +1,76 @@
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from boards.permissions import board_access
+
+from .backends import get_search_backend, query_terms
+from .models import SearchDocument
+from .serializers import SearchResultSerializer
+
+
+class SearchView(APIView):
+    """
+    View for searching everything the user can access.
+
+    Behaviour:
+    - GET: Return the boards, lists, tasks and comments matching every word of
+      `?q=` (each word also matches as a prefix), best match first.
+    - Titles weigh more than descriptions and comment text.
+    - `?type=` limits the results to some of board, list, task, comment (comma separated).
+    - `?limit=` sets the number of results (default `API_PAGE_SIZE`, at most `API_MAX_PAGE_SIZE`).
+    - Only boards the user owns or is an accepted member of are searched.
+
+    Endpoint: GET /api/v1/search/?q=
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter('q', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True),
+            openapi.Parameter('type', openapi.IN_QUERY, type=openapi.TYPE_STRING),
+            openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+        ],
+        responses={200: SearchResultSerializer(many=True), 400: 'Bad Request'}
+    )
+    def get(self, request):
+        terms = query_terms(request.query_params.get('q'))
+        if not terms:
+            return Response(
+                {"error": _("Enter at least one word to search for.")},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        kinds = [kind for kind in request.query_params.get('type', '').split(',') if kind]
+        valid_kinds = dict(SearchDocument.KIND_CHOICES)
+        if any(kind not in valid_kinds for kind in kinds):
+            return Response(
+                {"error": _("Type must be one of: %(types)s.") % {'types': ', '.join(valid_kinds)}},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        board_ids = board_access(request).board_ids()
+        if not board_ids:
+            return Response({'results': []}, status=status.HTTP_200_OK)
+
+        matches = get_search_backend().search(terms, board_ids, kinds, self.get_limit(request))
+        documents = SearchDocument.objects.select_related('board').in_bulk([pk for pk, _score in matches])
+        results = []
+        for pk, score in matches:
+            document = documents[pk]
+            document.score = score
+            results.append(document)
+        return Response({'results': SearchResultSerializer(results, many=True).data}, status=status.HTTP_200_OK)
+
+    def get_limit(self, request):
+        default = getattr(settings, 'API_PAGE_SIZE', 50)
+        maximum = getattr(settings, 'API_MAX_PAGE_SIZE', 200)
+        try:
+            limit = int(request.query_params.get('limit', default))
+        except (TypeError, ValueError):
+            return default
+        return max(1, min(limit, maximum))
@@ -5,13 +5,33 @@ from datetime import timedelta
 from django.db import transaction
 from django.db.models import F
 from django.utils.translation import gettext_lazy as _
+from core import ranking
+from core.counters import CounterFieldsMixin
 
 def get_default_due_date():
     """Return default due date: 7 days from now"""
     return timezone.now().date() + timedelta(days=7)
 
 
-class Task(models.Model):
+class TaskQuerySet(ranking.RankedQuerySet):
+    rank_group_field = 'list_id'
+
+    def with_related_data(self):
+        """
+        Preload everything the task serializers read:
+        list and board, creator and assignees with profiles.
+        Comment counts are stored on the task (`comments_count`).
+        """
+        from django.contrib.auth import get_user_model
+
+        assignees = get_user_model().objects.select_related('profile')
+        return (
+            self.select_related('list__board', 'created_by')
+            .prefetch_related(models.Prefetch('assigned_to', queryset=assignees))
+        )
+
+
+class Task(CounterFieldsMixin, models.Model):
     PRIORITY_CHOICES = [
         ('low', _('Low')),
         ('medium', _('Medium')),
@@ -27,24 +47,50 @@ class Task(models.Model):
     priority = models.CharField(max_length=10, choices=PRIORITY_CHOICES, default='medium')
     due_date = models.DateField(null=True, blank=True, default=get_default_due_date)    
     position = models.PositiveIntegerField(default=1)
+    # Sparse ordering key used when ORDERING_MODE == 'rank' (see core.ranking)
+    rank = models.BigIntegerField(default=0)
     is_completed = models.BooleanField(default=False)
     completed_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Board version of the last write to this row; drives delta sync (see boards.changes)
+    change_seq = models.PositiveBigIntegerField(default=0, editable=False)
+    # Comments of the task (see boards.counters)
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
+
+    counter_fields = ('comments_count',)
+    # `(list_id, is_completed)` as stored, so the list counters can tell what a save changes
+    stored_counts = None
+
+    objects = TaskQuerySet.as_manager()
     
     class Meta:
         ordering = ['position', 'created_at']
+        indexes = [
+            # Keyset pagination of the current user's tasks
+            models.Index(fields=['-created_at', '-id'], name='task_created_keyset'),
+            models.Index(fields=['list', 'rank'], name='task_list_rank'),
+            models.Index(fields=['list', 'change_seq'], name='task_list_change_seq'),
+        ]
     
-    def clean(self):
-        """Validate constraints before saving"""
-        # Skip validation for new objects that haven't been saved yet
-        if not self.pk:
-            return
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'list_id' in instance.__dict__ and 'is_completed' in instance.__dict__:
+            instance.stored_counts = (instance.list_id, instance.is_completed)
+        return instance
 
-        # Ensure all assigned users are members of the board
+    def validate_assignees(self, user_ids):
+        """
+        Ensure the users are the board owner or accepted members, in one query.
+        Run when assignees are added (see boards.signals), not on every save.
+        """
         board = self.list.board
-        invalid_users = [user for user in self.assigned_to.all() if not board.active_members.filter(user_id=user.id).exists()]
-        if invalid_users:
+        user_ids = set(user_ids) - {board.owner_id}
+        if not user_ids:
+            return
+        member_ids = set(board.active_members.filter(user_id__in=user_ids).values_list('user_id', flat=True))
+        if user_ids - member_ids:
             raise ValidationError(_('All assigned users must be members of this board.'))
     
     def save(self, *args, **kwargs):
@@ -54,6 +100,9 @@ class Task(models.Model):
                 models.Max('position')
             )['position__max']
             self.position = (last_position or 0) + 1
+
+        if not self.pk and not self.rank and ranking.rank_ordering_enabled():
+            self.rank = ranking.last_rank(Task.objects.filter(list_id=self.list_id))
         
         # Set completed_at 
         if self.is_completed and not self.completed_at:
@@ -68,6 +117,10 @@ class Task(models.Model):
         """Move task to a new position within the same list"""
         if new_position < 1:
             new_position = 1
+
+        if ranking.rank_ordering_enabled():
+            self._move_by_rank(self.list, new_position)
+            return
             
         if self.position == new_position:
             return
@@ -105,6 +158,10 @@ class Task(models.Model):
             if new_position is not None:
                 self.move_to_position(new_position)
             return
+
+        if ranking.rank_ordering_enabled():
+            self._move_by_rank(new_list, new_position)
+            return
         
         with transaction.atomic():
             old_list_id = self.list_id
@@ -134,6 +191,28 @@ class Task(models.Model):
             self.position = target_position
             self.save(update_fields=['list', 'position'])
 
+    def _move_by_rank(self, target_list, new_position=None):
+        """
+        Rank mode: place the task at `new_position` of `target_list`
+        (or at its end) by rewriting only this task's rank.
+        """
+        from .tasks import rebalance_task_ranks
+
+        list_id = target_list.id
+        siblings = Task.objects.filter(list_id=list_id).exclude(pk=self.pk)
+        with transaction.atomic():
+            ranking.move_by_rank(
+                self, siblings, new_position,
+                on_low_gap=lambda: transaction.on_commit(lambda: rebalance_task_ranks.delay(list_id)),
+            )
+            self.list = target_list
+            self.save(update_fields=['list', 'rank'])
+
+    @property
+    def display_position(self):
+        """1-based position shown by the API"""
+        return ranking.display_position(self)
+
     def mark_completed(self):
         """Mark task as completed"""
         self.is_completed = True
@@ -171,19 +250,29 @@ class TaskComment(models.Model):
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Board version of the last write to this row; drives delta sync (see boards.changes)
+    change_seq = models.PositiveBigIntegerField(default=0, editable=False)
     
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            # Keyset pagination of a task's comments
+            models.Index(fields=['task', 'created_at', 'id'], name='taskcomment_task_keyset'),
+            models.Index(fields=['task', 'change_seq'], name='taskcomment_task_change_seq'),
+        ]
     
     def clean(self):
-        """Validate that the user is a member of the board"""
+        """Validate that the user is the owner or a member of the board"""
+        board = self.task.board
         # active_members returns a queryset of BoardMembership entries
-        if not self.task.board.active_members.filter(user_id=self.user.id).exists():
+        if board.owner_id != self.user_id and not board.active_members.filter(user_id=self.user_id).exists():
             raise ValidationError(_('Only board members can comment.'))
     
     def save(self, *args, **kwargs):
         self.full_clean()
-        super().save(*args, **kwargs)
+        # The task's comment counter is adjusted by post_save in the same transaction
+        with transaction.atomic(using=kwargs.get('using'), savepoint=False):
+            super().save(*args, **kwargs)
     
     def __str__(self):
         return _("%(username)s - %(task_title)s") % {
@@ -1,13 +1,39 @@
 from rest_framework import serializers
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth import get_user_model
 from .models import Task, TaskComment
 from lists.models import List
 from accounts.serializers import ProfileSerializer
+from boards.permissions import board_access
 
 User = get_user_model()
 
 
+class AssignedUserSerializer(serializers.ModelSerializer):
+    """
+    Serializer for task assignees.
+    - Same shape as the entries of `assigned_users`.
+    - Expects `profile` to be loaded with select_related.
+    """
+    full_name = serializers.CharField(source='get_full_name', read_only=True)
+    initials = serializers.SerializerMethodField()
+    profile = serializers.SerializerMethodField()
+
+    class Meta:
+        model = User
+        fields = ['id', 'username', 'full_name', 'initials', 'profile']
+
+    def get_initials(self, obj):
+        if obj.get_full_name():
+            return ''.join([p[0] for p in obj.get_full_name().split()[:2]]).upper()
+        return obj.username[:2].upper() if obj.username else '??'
+
+    def get_profile(self, obj):
+        return ProfileSerializer(obj.profile, context=self.context).data if hasattr(obj, 'profile') else None
+
+
 class TaskListSerializer(serializers.ModelSerializer):
     """
     Serializer for listing tasks.
@@ -17,6 +43,7 @@ class TaskListSerializer(serializers.ModelSerializer):
     """
     assigned_to_usernames = serializers.SerializerMethodField()
     assigned_users = serializers.SerializerMethodField()
+    position = serializers.IntegerField(source='display_position', read_only=True)
     is_overdue = serializers.ReadOnlyField()
     
     class Meta:
@@ -30,24 +57,10 @@ class TaskListSerializer(serializers.ModelSerializer):
 
 
     def get_assigned_to_usernames(self, obj):
-        return list(obj.assigned_to.values_list('username', flat=True))
+        return [user.username for user in obj.assigned_to.all()]
     
     def get_assigned_users(self, obj):
-        return [
-            {
-                'id': user.id,
-                'username': user.username,
-                'full_name': user.get_full_name(),
-                'initials': self._get_initials(user),
-                'profile': ProfileSerializer(user.profile, context=self.context).data if hasattr(user, 'profile') else None
-            }
-            for user in obj.assigned_to.all()
-        ]
-    
-    def _get_initials(self, user):
-        if user.get_full_name():
-            return ''.join([p[0] for p in user.get_full_name().split()[:2]]).upper()
-        return user.username[:2].upper() if user.username else '??'
+        return AssignedUserSerializer(obj.assigned_to.all(), many=True, context=self.context).data
 
 
 class TaskDetailSerializer(serializers.ModelSerializer):
@@ -61,8 +74,9 @@ class TaskDetailSerializer(serializers.ModelSerializer):
     assigned_users = serializers.SerializerMethodField()
     created_by_username = serializers.CharField(source='created_by.username', read_only=True)
     list_title = serializers.CharField(source='list.title', read_only=True)
-    comments_count = serializers.SerializerMethodField()
-    board = serializers.IntegerField(source='board.id', read_only=True)
+    comments_count = serializers.IntegerField(read_only=True)
+    board = serializers.IntegerField(source='list.board_id', read_only=True)
+    position = serializers.IntegerField(source='display_position', read_only=True)
     is_overdue = serializers.ReadOnlyField()
     
     class Meta:
@@ -77,22 +91,33 @@ class TaskDetailSerializer(serializers.ModelSerializer):
         ]
     
     def get_assigned_to_usernames(self, obj):
-        return list(obj.assigned_to.values_list('username', flat=True))
+        return [user.username for user in obj.assigned_to.all()]
 
     def get_assigned_users(self, obj):
         """Get assigned users with profile data"""
-        users = obj.assigned_to.all()
-        return [{
-            'id': user.id,
-            'username': user.username,
-            'full_name': user.get_full_name(),
-            'initials': ''.join([p[0] for p in user.get_full_name().split()[:2]]).upper() if user.get_full_name() else user.username[:2].upper(),
-            'profile': ProfileSerializer(user.profile).data if hasattr(user, 'profile') else None
-        } for user in users]
+        return AssignedUserSerializer(obj.assigned_to.all(), many=True, context=self.context).data
+
+
+class TaskSnapshotSerializer(serializers.ModelSerializer):
+    """
+    Serializer for tasks inside a board snapshot.
+    - Assignees are referenced by id; user objects are sent once per snapshot.
+    - Expects `assigned_to` to be prefetched.
+    """
+    assigned_to = serializers.SerializerMethodField()
+    position = serializers.IntegerField(source='display_position', read_only=True)
+    is_overdue = serializers.ReadOnlyField()
 
-    def get_comments_count(self, obj):
-        """Calculate task comments count"""
-        return obj.comments.count()
+    class Meta:
+        model = Task
+        fields = [
+            'id', 'title', 'list', 'assigned_to',
+            'priority', 'due_date', 'position', 'is_completed',
+            'is_overdue',
+        ]
+
+    def get_assigned_to(self, obj):
+        return [user.id for user in obj.assigned_to.all()]
 
 
 class TaskCreateSerializer(serializers.ModelSerializer):
@@ -109,15 +134,11 @@ class TaskCreateSerializer(serializers.ModelSerializer):
     
     def validate_list(self, value):
         """Validate that user has access to the list"""
-        user = self.context['request'].user
-        board = value.board
-        
         # Check if user is board member or owner
-        if board.owner != user:
-            if not board.active_members.filter(user=user).exists():
-                raise serializers.ValidationError(
-                    _("You don't have access to this list.")
-                )
+        if not board_access(self.context['request']).can_view(value.board_id):
+            raise serializers.ValidationError(
+                _("You don't have access to this list.")
+            )
         return value
     
     
@@ -141,14 +162,10 @@ class TaskUpdateSerializer(serializers.ModelSerializer):
     
     def validate_assigned_to(self, value):
         """Validate that assigned users are board members"""
-        if value:
-            task = self.instance
-            board = task.list.board
-            invalid_users = [user for user in value if not board.active_members.filter(user=user).exists() and board.owner != user]
-            if invalid_users:
-                raise serializers.ValidationError(
-                    _("All assigned users must be members of this board.")
-                )
+        try:
+            self.instance.validate_assignees(user.id for user in value)
+        except DjangoValidationError as error:
+            raise serializers.ValidationError(error.messages)
         return value
 
 
@@ -167,15 +184,11 @@ class TaskMoveSerializer(serializers.Serializer):
     def validate_new_list(self, value):
         """Validate that user has access to the new list"""
         if value:
-            user = self.context['request'].user
-            board = value.board
-            
             # Check if user is board member or owner
-            if board.owner != user:
-                if not board.active_members.filter(user=user).exists():
-                    raise serializers.ValidationError(
-                        _("You don't have access to this list.")
-                    )
+            if not board_access(self.context['request']).can_view(value.board_id):
+                raise serializers.ValidationError(
+                    _("You don't have access to this list.")
+                )
         return value
     
     def validate(self, attrs):
@@ -191,6 +204,53 @@ class TaskMoveSerializer(serializers.Serializer):
         return attrs
 
 
+class TaskBatchOperationSerializer(serializers.Serializer):
+    """
+    Serializer for one operation of a task batch.
+    - move: `new_list` and/or `new_position`.
+    - complete: `is_completed` (defaults to true).
+    - assign: `assigned_to` replaces the task's assignees.
+    - delete: no extra fields.
+    """
+    OPERATION_CHOICES = ['move', 'complete', 'assign', 'delete']
+
+    op = serializers.ChoiceField(choices=OPERATION_CHOICES)
+    task = serializers.IntegerField()
+    new_list = serializers.IntegerField(required=False, allow_null=True)
+    new_position = serializers.IntegerField(required=False, min_value=1)
+    is_completed = serializers.BooleanField(required=False, default=True)
+    assigned_to = serializers.ListField(child=serializers.IntegerField(), required=False)
+
+    def validate(self, attrs):
+        """Check that each operation carries the fields it needs"""
+        op = attrs['op']
+        if op == 'move' and not attrs.get('new_list') and not attrs.get('new_position'):
+            raise serializers.ValidationError(
+                _("Either new_list or new_position must be provided.")
+            )
+        if op == 'assign' and 'assigned_to' not in attrs:
+            raise serializers.ValidationError(
+                {'assigned_to': _("This field is required.")}
+            )
+        return attrs
+
+
+class TaskBatchSerializer(serializers.Serializer):
+    """
+    Serializer for batch task operations.
+    - Accepts up to `TASK_BATCH_MAX_OPERATIONS` operations.
+    """
+    operations = TaskBatchOperationSerializer(many=True, allow_empty=False)
+
+    def validate_operations(self, value):
+        max_operations = getattr(settings, 'TASK_BATCH_MAX_OPERATIONS', 500)
+        if len(value) > max_operations:
+            raise serializers.ValidationError(
+                _("A batch cannot contain more than %(max)s operations.") % {'max': max_operations}
+            )
+        return value
+
+
 class TaskCommentSerializer(serializers.ModelSerializer):
     """
     Serializer for task comments.
@@ -211,15 +271,11 @@ class TaskCommentSerializer(serializers.ModelSerializer):
     
     def validate_task(self, value):
         """Validate that user has access to the task"""
-        user = self.context['request'].user
-        board = value.list.board
-        
         # Check if user is board member or owner
-        if board.owner != user:
-            if not board.active_members.filter(user=user).exists():
-                raise serializers.ValidationError(
-                    _("You don't have access to this task.")
-                )
+        if not board_access(self.context['request']).can_view(value.list.board_id):
+            raise serializers.ValidationError(
+                _("You don't have access to this task.")
+            )
         return value
     
     def create(self, validated_data):
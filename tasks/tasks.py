@@ -0,0 +1,16 @@
+from celery import shared_task
+from django.db import transaction
+
+from core import ranking
+
+
+@shared_task
+def rebalance_task_ranks(list_id):
+    """
+    Celery task to re-space the ranks of every task in a list
+    once the gaps between neighbours run low (rank ordering mode).
+    """
+    from .models import Task
+
+    with transaction.atomic():
+        return ranking.rebalance(Task.objects.select_for_update().filter(list_id=list_id))
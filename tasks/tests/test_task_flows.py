@@ -5,7 +5,7 @@ from django.utils import timezone
 from datetime import timedelta
 from boards.models import Board, BoardMembership
 from lists.models import List
-from tasks.models import Task
+from tasks.models import Task, TaskComment
 
 User = get_user_model()
 
@@ -150,6 +150,29 @@ class TaskFlowTests(APITestCase):
         
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         
+    def test_assignees_validated_in_one_query_when_added(self):
+        """Assignees are checked once per change, not per assignee on every save"""
+        from django.core.exceptions import ValidationError
+        from django.db import connection, transaction
+
+        task = Task.objects.create(title='Task', list=self.list1, created_by=self.owner, position=4)
+        task.assigned_to.add(self.owner, self.member1, self.member2)
+        with self.assertRaises(ValidationError), transaction.atomic():
+            task.assigned_to.add(self.non_member)
+        self.assertEqual(task.assigned_to.count(), 3)
+
+        task = Task.objects.with_related_data().get(pk=task.pk)
+        queries = []
+
+        def capture(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(capture):
+            task.title = 'Renamed'
+            task.save()
+        self.assertFalse([sql for sql in queries if 'boards_boardmembership' in sql])
+
     def test_update_task_due_date_and_priority(self):
         """Update due_date and priority"""
         task = Task.objects.create(
@@ -288,6 +311,30 @@ class TaskFlowTests(APITestCase):
         
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         
+    def test_comment_by_board_owner_and_members_only(self):
+        """The board owner (who has no membership row) and members can comment; others cannot"""
+        task = Task.objects.create(
+            title='Discussed Task',
+            list=self.list1,
+            created_by=self.member1,
+            position=5
+        )
+
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.post(f'/api/v1/tasks/{task.id}/comments/', {'content': 'From the owner'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        self.client.force_authenticate(user=self.member2)
+        response = self.client.post(f'/api/v1/tasks/{task.id}/comments/', {'content': 'From a member'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        self.client.force_authenticate(user=self.non_member)
+        response = self.client.post(f'/api/v1/tasks/{task.id}/comments/', {'content': 'From outside'})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.assertEqual(list(TaskComment.objects.filter(task=task).order_by('id').values_list('user_id', flat=True)),
+                         [self.owner.id, self.member2.id])
+        
     def test_delete_task_by_other_member_fails(self):
         """Delete task by other member: should be rejected (403)"""
         task = Task.objects.create(
@@ -325,3 +372,219 @@ class TaskFlowTests(APITestCase):
         # Try to move
         response = self.client.post(f'/api/v1/tasks/{task.id}/move/', {'new_position': 5})
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def _query_count(self, url):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context.captured_queries)
+
+    def test_task_list_query_count_stays_flat(self):
+        """Listing tasks: query count is the same for 10 and 1,000 tasks"""
+        def add_tasks(count, offset):
+            tasks = Task.objects.bulk_create([
+                Task(title=f'Task {offset + i}', list=self.list1, created_by=self.owner, position=offset + i + 1)
+                for i in range(count)
+            ])
+            Task.assigned_to.through.objects.bulk_create([
+                Task.assigned_to.through(task_id=task.id, customuser_id=user.id)
+                for task in tasks for user in (self.member1, self.member2)
+            ])
+
+        self.client.force_authenticate(user=self.member1)
+        list_url = f'/api/v1/tasks/lists/{self.list1.id}/'
+        my_tasks_url = '/api/v1/tasks/'
+
+        add_tasks(10, 0)
+        small_list, small_mine = self._query_count(list_url), self._query_count(my_tasks_url)
+
+        add_tasks(990, 10)
+        self.assertEqual(self._query_count(list_url), small_list)
+        self.assertEqual(self._query_count(my_tasks_url), small_mine)
+
+    def test_rank_mode_move_writes_one_row(self):
+        """Rank ordering mode: moving a task updates only that task"""
+        from django.db import connection
+        from django.test import override_settings
+        from django.test.utils import CaptureQueriesContext
+
+        with override_settings(ORDERING_MODE='rank'):
+            tasks = [Task.objects.create(title=f'Task {i}', list=self.list1, created_by=self.owner) for i in range(5)]
+            self.client.force_authenticate(user=self.member1)
+
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.post(f'/api/v1/tasks/{tasks[4].id}/move/', {'new_position': 1})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data['position'], 1)
+            # Besides the delta sync stamp of the moved row itself
+            updates = [q['sql'] for q in context.captured_queries
+                       if q['sql'].startswith('UPDATE "tasks_task"') and 'SET "change_seq"' not in q['sql']]
+            self.assertEqual(len(updates), 1)
+
+            # Move to another list in the middle
+            other = [Task.objects.create(title=f'Other {i}', list=self.list2, created_by=self.owner) for i in range(2)]
+            response = self.client.post(f'/api/v1/tasks/{tasks[0].id}/move/', {'new_list': self.list2.id, 'new_position': 2})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+            response = self.client.get(f'/api/v1/tasks/lists/{self.list1.id}/')
+            self.assertEqual([t['id'] for t in response.data], [tasks[4].id, tasks[1].id, tasks[2].id, tasks[3].id])
+            self.assertEqual([t['position'] for t in response.data], [1, 2, 3, 4])
+            response = self.client.get(f'/api/v1/tasks/lists/{self.list2.id}/')
+            self.assertEqual([t['id'] for t in response.data], [other[0].id, tasks[0].id, other[1].id])
+
+    def test_rank_mode_rebalances_when_gaps_run_out(self):
+        """Rank ordering mode: repeated inserts into the same gap keep the order"""
+        from django.test import override_settings
+
+        with override_settings(ORDERING_MODE='rank'):
+            first = Task.objects.create(title='First', list=self.list1, created_by=self.owner)
+            last = Task.objects.create(title='Last', list=self.list1, created_by=self.owner)
+            inserted = []
+            for i in range(40):
+                task = Task.objects.create(title=f'Inserted {i}', list=self.list1, created_by=self.owner)
+                task.move_to_position(2)
+                inserted.insert(0, task)
+
+            expected = [first.id] + [t.id for t in inserted] + [last.id]
+            ordered = list(Task.objects.filter(list=self.list1).in_display_order().values_list('id', flat=True))
+            self.assertEqual(ordered, expected)
+            ranks = list(Task.objects.filter(list=self.list1).in_display_order().values_list('rank', flat=True))
+            self.assertEqual(len(set(ranks)), len(ranks))
+
+    def test_rank_mode_batch_moves_rank_only_the_moved_rows(self):
+        """Rank ordering mode: batch moves give ranks to the moved rows and leave their siblings alone"""
+        from django.test import override_settings
+
+        with override_settings(ORDERING_MODE='rank'):
+            tasks = [Task.objects.create(title=f'Task {i}', list=self.list1, created_by=self.owner) for i in range(5)]
+            other = [Task.objects.create(title=f'Other {i}', list=self.list2, created_by=self.owner) for i in range(2)]
+            ranks = dict(Task.objects.values_list('id', 'rank'))
+            self.client.force_authenticate(user=self.member1)
+
+            operations = [
+                {'op': 'move', 'task': tasks[4].id, 'new_position': 2},
+                {'op': 'move', 'task': tasks[3].id, 'new_position': 3},
+                {'op': 'move', 'task': tasks[0].id, 'new_list': self.list2.id, 'new_position': 2},
+            ]
+            response = self.client.post('/api/v1/tasks/batch/', {'operations': operations}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+            moved = {tasks[4].id, tasks[3].id, tasks[0].id}
+            after = dict(Task.objects.values_list('id', 'rank'))
+            self.assertEqual({task_id for task_id in after if after[task_id] != ranks[task_id]}, moved)
+            response = self.client.get(f'/api/v1/tasks/lists/{self.list1.id}/')
+            self.assertEqual([t['id'] for t in response.data], [tasks[4].id, tasks[3].id, tasks[1].id, tasks[2].id])
+            response = self.client.get(f'/api/v1/tasks/lists/{self.list2.id}/')
+            self.assertEqual([t['id'] for t in response.data], [other[0].id, tasks[0].id, other[1].id])
+
+            # No integer left between the neighbours: the list is re-spaced, keeping the order
+            Task.objects.filter(pk=tasks[2].id).update(rank=after[tasks[3].id] + 1)
+            response = self.client.get(f'/api/v1/tasks/lists/{self.list1.id}/')
+            self.assertEqual([t['id'] for t in response.data], [tasks[4].id, tasks[3].id, tasks[2].id, tasks[1].id])
+            response = self.client.post('/api/v1/tasks/batch/', {'operations': [
+                {'op': 'move', 'task': tasks[1].id, 'new_position': 3},
+            ]}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            response = self.client.get(f'/api/v1/tasks/lists/{self.list1.id}/')
+            self.assertEqual([t['id'] for t in response.data], [tasks[4].id, tasks[3].id, tasks[1].id, tasks[2].id])
+
+    def test_batch_operations(self):
+        """Batch endpoint applies valid operations and reports per-item errors"""
+        tasks = [Task.objects.create(title=f'Task {i}', list=self.list1, created_by=self.member1) for i in range(6)]
+        owner_task = Task.objects.create(title='Owner task', list=self.list1, created_by=self.owner)
+        other_board = Board.objects.create(title='Other Board', owner=self.non_member)
+        other_list = List.objects.create(board=other_board, title='Other', position=4)
+        foreign_task = Task.objects.create(title='Foreign', list=other_list, created_by=self.non_member)
+
+        self.client.force_authenticate(user=self.member1)
+        operations = [
+            {'op': 'complete', 'task': tasks[0].id},
+            {'op': 'complete', 'task': tasks[1].id},
+            {'op': 'move', 'task': tasks[2].id, 'new_list': self.list2.id},
+            {'op': 'move', 'task': tasks[5].id, 'new_position': 1},
+            {'op': 'assign', 'task': tasks[3].id, 'assigned_to': [self.member1.id, self.member2.id]},
+            {'op': 'assign', 'task': tasks[4].id, 'assigned_to': [self.non_member.id]},
+            {'op': 'delete', 'task': tasks[4].id},
+            {'op': 'delete', 'task': owner_task.id},
+            {'op': 'complete', 'task': foreign_task.id},
+            {'op': 'move', 'task': tasks[0].id, 'new_list': other_list.id},
+            {'op': 'complete', 'task': tasks[4].id},
+        ]
+        response = self.client.post('/api/v1/tasks/batch/', {'operations': operations}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [result['status'] for result in response.data['results']],
+            ['ok', 'ok', 'ok', 'ok', 'ok', 'error', 'ok', 'error', 'error', 'error', 'error']
+        )
+
+        self.assertEqual(Task.objects.filter(pk__in=[tasks[0].id, tasks[1].id], is_completed=True).count(), 2)
+        self.assertIsNotNone(Task.objects.get(pk=tasks[0].id).completed_at)
+        self.assertEqual(Task.objects.get(pk=tasks[2].id).list_id, self.list2.id)
+        self.assertEqual(
+            set(Task.objects.get(pk=tasks[3].id).assigned_to.values_list('id', flat=True)),
+            {self.member1.id, self.member2.id}
+        )
+        self.assertFalse(Task.objects.filter(pk=tasks[4].id).exists())
+        self.assertTrue(Task.objects.filter(pk=owner_task.id).exists())
+        self.assertFalse(Task.objects.get(pk=foreign_task.id).is_completed)
+
+        # Deleted tasks leave a gap, as with single deletes
+        ordered = list(Task.objects.filter(list=self.list1).order_by('position').values_list('id', 'position'))
+        self.assertEqual(ordered, [
+            (tasks[5].id, 1), (tasks[0].id, 2), (tasks[1].id, 3), (tasks[3].id, 4), (owner_task.id, 6)
+        ])
+
+    def test_batch_operations_take_effect_in_request_order(self):
+        """A move after a delete in the same list sees the list without the deleted task"""
+        tasks = [Task.objects.create(title=f'Task {i}', list=self.list1, created_by=self.member1) for i in range(4)]
+        self.client.force_authenticate(user=self.member1)
+
+        operations = [
+            {'op': 'delete', 'task': tasks[0].id},
+            {'op': 'move', 'task': tasks[3].id, 'new_position': 2},
+            {'op': 'delete', 'task': tasks[1].id},
+        ]
+        response = self.client.post('/api/v1/tasks/batch/', {'operations': operations}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([result['status'] for result in response.data['results']], ['ok', 'ok', 'ok'])
+        # [1, 3, 2] after the move, then task 1 deleted: a gap as with single deletes
+        ordered = list(Task.objects.filter(list=self.list1).order_by('position').values_list('id', 'position'))
+        self.assertEqual(ordered, [(tasks[3].id, 2), (tasks[2].id, 3)])
+
+    def test_batch_query_count_stays_flat(self):
+        """Batch endpoint runs the same number of queries for 10 or 100 tasks"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from boards.models import BoardDailyStats, Tombstone
+
+        def run_batch(count):
+            tasks = [Task.objects.create(title=f'Task {i}', list=self.list1, created_by=self.member1) for i in range(count)]
+            doomed = [Task.objects.create(title=f'Old {i}', list=self.list2, created_by=self.member1) for i in range(count)]
+            for task in doomed:
+                TaskComment.objects.create(task=task, user=self.member1, content='Soon gone')
+            operations = []
+            for task in tasks:
+                operations.append({'op': 'complete', 'task': task.id})
+                operations.append({'op': 'move', 'task': task.id, 'new_list': self.list3.id})
+            operations += [{'op': 'delete', 'task': task.id} for task in doomed]
+            self.client.force_authenticate(user=self.member1)
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.post('/api/v1/tasks/batch/', {'operations': operations}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return len(context.captured_queries)
+
+        small = run_batch(10)
+        self.assertEqual(run_batch(100), small)
+        self.assertEqual(Task.objects.filter(list=self.list3, is_completed=True).count(), 110)
+
+        # The deletes are still recorded, once per batch
+        self.assertFalse(Task.objects.filter(list=self.list2).exists())
+        self.list2.refresh_from_db()
+        self.assertEqual(self.list2.tasks_count, 0)
+        self.assertEqual(Tombstone.objects.filter(board=self.board, kind='task').count(), 110)
+        self.board.refresh_from_db()
+        self.assertFalse(Tombstone.objects.filter(change_seq__gt=self.board.version).exists())
+        self.assertEqual(BoardDailyStats.objects.get(board=self.board).deleted, 110)
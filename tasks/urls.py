@@ -1,7 +1,7 @@
 from django.urls import path
 from .views import (
     TaskListView, TaskDetailView, TaskMoveView, TaskToggleCompleteView,
-    UserTasksView, TaskCommentsView, TaskCommentDetailView
+    UserTasksView, TaskCommentsView, TaskCommentDetailView, TaskBatchView
 )
 
 app_name = 'tasks'
@@ -10,6 +10,7 @@ urlpatterns = [
     # Task CRUD operations
     path('', UserTasksView.as_view(), name='user-tasks'),  # GET: list user's assigned tasks
     path('<int:pk>/', TaskDetailView.as_view(), name='task-detail'),  # GET/PATCH/DELETE: task detail
+    path('batch/', TaskBatchView.as_view(), name='task-batch'),  # POST: bulk move/complete/assign/delete
     
     # Task actions (as sub-resources)
     path('<int:pk>/move/', TaskMoveView.as_view(), name='task-move'),  # POST: move task
@@ -1,3 +1,5 @@
+from collections import Counter
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
@@ -5,6 +7,8 @@ from rest_framework.exceptions import PermissionDenied, ValidationError, NotFoun
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 
@@ -12,10 +16,19 @@ from .models import Task, TaskComment
 from .serializers import (
     TaskListSerializer, TaskDetailSerializer, TaskCreateSerializer,
     TaskUpdateSerializer, TaskMoveSerializer, TaskCommentSerializer,
-    TaskCommentUpdateSerializer
+    TaskCommentUpdateSerializer, TaskBatchSerializer
 )
 from lists.models import List
+from core import ranking
+from core.pagination import KeysetPagination
+from core.conditional import board_etag, not_modified, with_etag
 from boards.models import Board, BoardMembership
+from boards.changes import delete_in_bulk, record_deletions, stamp_changes
+from boards.counters import recount
+from boards.stats import record_task_stats
+from boards.activity import record_activity
+from boards.events import publish_event
+from boards.permissions import MANAGER_ROLES, board_access
 
 User = get_user_model()
 
@@ -29,21 +42,21 @@ class TaskListView(APIView):
     - POST: Create a new task in the specified list.
     - Only board members can access tasks.
     - Tasks are ordered by position.
+    - GET sends the board version as ETag and answers a matching
+      If-None-Match with 304.
     
     Endpoint: GET/POST /api/v1/lists/{list_id}/tasks/
     """
     permission_classes = [permissions.IsAuthenticated]
     
-    def get_list_with_access_check(self, list_id, user):
+    def get_list_with_access_check(self, list_id, request):
         """Get list and verify user has access to it"""
         try:
             list_obj = List.objects.get(id=list_id)
-            board = list_obj.board
             
             # Check if user is board owner or member
-            if board.owner != user:
-                if not board.active_members.filter(user=user).exists():
-                    raise PermissionDenied(_("You don't have access to this list."))
+            if not board_access(request).can_view(list_obj.board_id):
+                raise PermissionDenied(_("You don't have access to this list."))
             
             return list_obj
         except List.DoesNotExist:
@@ -52,11 +65,20 @@ class TaskListView(APIView):
     @swagger_auto_schema(responses={200: TaskListSerializer(many=True)})
     def get(self, request, list_id):
         """Return all tasks in the list"""
-        list_obj = self.get_list_with_access_check(list_id, request.user)
+        etag = None
+        board_id, version = List.objects.filter(pk=list_id).values_list('board_id', 'board__version').first() or (None, None)
+        if board_id is not None and board_access(request).can_view(board_id):
+            # is_overdue moves on with the date
+            etag = board_etag(f'tasks-{list_id}-{timezone.localdate().isoformat()}', version)
+            cached = not_modified(request, etag)
+            if cached:
+                return cached
+
+        list_obj = self.get_list_with_access_check(list_id, request)
         
-        tasks = Task.objects.filter(list=list_obj).order_by('position', 'created_at')
+        tasks = Task.objects.filter(list=list_obj).with_related_data().with_ordinal_position().in_display_order()
         serializer = TaskListSerializer(tasks, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return with_etag(Response(serializer.data, status=status.HTTP_200_OK), etag)
     
     @swagger_auto_schema(
         request_body=TaskCreateSerializer,
@@ -64,7 +86,7 @@ class TaskListView(APIView):
     )
     def post(self, request, list_id):
         """Create a new task in the list"""
-        list_obj = self.get_list_with_access_check(list_id, request.user)
+        list_obj = self.get_list_with_access_check(list_id, request)
         
         # Add list to request data
         data = request.data.copy()
@@ -74,6 +96,14 @@ class TaskListView(APIView):
         
         if serializer.is_valid():
             task = serializer.save()
+            record_activity(
+                board=list_obj.board_id,
+                action='create',
+                user=request.user,
+                description=_("Task '%(title)s' created in '%(list)s' by %(user)s") % {
+                    'title': task.title, 'list': list_obj.title, 'user': request.user
+                }
+            )
             response_serializer = TaskDetailSerializer(task)
             return Response(response_serializer.data, status=status.HTTP_201_CREATED)
         
@@ -94,16 +124,14 @@ class TaskDetailView(APIView):
     """
     permission_classes = [permissions.IsAuthenticated]
     
-    def get_task_with_access_check(self, pk, user):
+    def get_task_with_access_check(self, pk, request):
         """Get task and verify user has access to it"""
         try:
-            task = Task.objects.get(pk=pk)
-            board = task.list.board
+            task = Task.objects.with_related_data().get(pk=pk)
             
             # Check if user is board owner or member
-            if board.owner != user:
-                if not board.active_members.filter(user=user).exists():
-                    raise PermissionDenied(_("You don't have access to this task."))
+            if not board_access(request).can_view(task.list.board_id):
+                raise PermissionDenied(_("You don't have access to this task."))
             
             return task
         except Task.DoesNotExist:
@@ -112,19 +140,25 @@ class TaskDetailView(APIView):
     @swagger_auto_schema(responses={200: TaskDetailSerializer})
     def get(self, request, pk):
         """Return task details"""
-        task = self.get_task_with_access_check(pk, request.user)
+        task = self.get_task_with_access_check(pk, request)
         serializer = TaskDetailSerializer(task)
         return Response(serializer.data, status=status.HTTP_200_OK)
     
     @swagger_auto_schema(request_body=TaskUpdateSerializer, responses={200: TaskDetailSerializer, 400: _("Bad Request")})
     def patch(self, request, pk):
         """Update task information"""
-        task = self.get_task_with_access_check(pk, request.user)
+        task = self.get_task_with_access_check(pk, request)
         
         serializer = TaskUpdateSerializer(task, data=request.data, partial=True)
         
         if serializer.is_valid():
             task = serializer.save()
+            record_activity(
+                board=task.list.board_id,
+                action='update',
+                user=request.user,
+                description=_("Task '%(title)s' updated by %(user)s") % {'title': task.title, 'user': request.user}
+            )
             response_serializer = TaskDetailSerializer(task)
             return Response(response_serializer.data, status=status.HTTP_200_OK)
         
@@ -133,24 +167,13 @@ class TaskDetailView(APIView):
     @swagger_auto_schema(responses={204: _("No Content"), 403: _("Forbidden")})
     def delete(self, request, pk):
         """Delete task (creator or board owner/admin only)"""
-        task = self.get_task_with_access_check(pk, request.user)
-        user = request.user
-        board = task.list.board
+        task = self.get_task_with_access_check(pk, request)
         
         # Check delete permission (creator, board owner, or admin)
-        can_delete = False
-        if task.created_by == user or board.owner == user:
-            can_delete = True
-        else:
-            # Check if user is admin
-            try:
-                membership = BoardMembership.objects.get(
-                    board=board, user=user, status='accepted'
-                )
-                if membership.role == 'admin':
-                    can_delete = True
-            except BoardMembership.DoesNotExist:
-                pass
+        can_delete = (
+            task.created_by_id == request.user.id
+            or board_access(request).can_manage(task.list.board_id)
+        )
         
         if not can_delete:
             return Response(
@@ -158,6 +181,12 @@ class TaskDetailView(APIView):
                 status=status.HTTP_403_FORBIDDEN
             )
         
+        record_activity(
+            board=task.list.board_id,
+            action='delete',
+            user=request.user,
+            description=_("Task '%(title)s' deleted by %(user)s") % {'title': task.title, 'user': request.user}
+        )
         task.delete()
         return Response(
             {"message": _("Task deleted successfully")},
@@ -170,7 +199,7 @@ class UserTasksView(APIView):
     View for listing tasks assigned to the authenticated user.
     
     Behaviour:
-    - GET: Return all tasks assigned to the current user.
+    - GET: Return tasks assigned to the current user, newest first, one cursor page at a time.
     - Can filter by completion status, priority, due date.
     - Only shows tasks from boards user has access to.
     
@@ -184,13 +213,13 @@ class UserTasksView(APIView):
         user = request.user
         
         # Get all boards user has access to
-        user_boards = user.all_boards
+        user_boards = board_access(request).board_ids()
         
         # Filter tasks assigned to user in accessible boards
         tasks = Task.objects.filter(
             assigned_to=user,
-            list__board__in=user_boards
-        ).order_by('-created_at')
+            list__board_id__in=user_boards
+        ).with_related_data().with_ordinal_position(whole_groups=False)
         
         # Apply filters
         is_completed = request.query_params.get('is_completed')
@@ -210,8 +239,10 @@ class UserTasksView(APIView):
                 is_completed=False
             )
         
-        serializer = TaskListSerializer(tasks, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(tasks, request, view=self)
+        serializer = TaskListSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
 
 class TaskCommentsView(APIView):
@@ -219,7 +250,7 @@ class TaskCommentsView(APIView):
     View for listing and creating task comments.
     
     Behaviour:
-    - GET: Return all comments for the task.
+    - GET: Return comments for the task, oldest first, one cursor page at a time.
     - POST: Create a new comment on the task.
     - Only board members can access comments.
     
@@ -227,16 +258,14 @@ class TaskCommentsView(APIView):
     """
     permission_classes = [permissions.IsAuthenticated]
     
-    def get_task_with_access_check(self, task_id, user):
+    def get_task_with_access_check(self, task_id, request):
         """Get task and verify user has access to it"""
         try:
-            task = Task.objects.get(id=task_id)
-            board = task.list.board
+            task = Task.objects.select_related('list').get(id=task_id)
             
             # Check if user is board owner or member
-            if board.owner != user:
-                if not board.active_members.filter(user=user).exists():
-                    raise PermissionDenied(_("You don't have access to this task."))
+            if not board_access(request).can_view(task.list.board_id):
+                raise PermissionDenied(_("You don't have access to this task."))
             
             return task
         except Task.DoesNotExist:
@@ -245,11 +274,13 @@ class TaskCommentsView(APIView):
     @swagger_auto_schema(responses={200: TaskCommentSerializer(many=True)})
     def get(self, request, task_id):
         """Return all comments for the task"""
-        task = self.get_task_with_access_check(task_id, request.user)
+        task = self.get_task_with_access_check(task_id, request)
         
-        comments = TaskComment.objects.filter(task=task).order_by('created_at')
-        serializer = TaskCommentSerializer(comments, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        comments = TaskComment.objects.filter(task=task).select_related('user', 'task')
+        paginator = KeysetPagination(descending=False)
+        page = paginator.paginate_queryset(comments, request, view=self)
+        serializer = TaskCommentSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
     
     @swagger_auto_schema(
         request_body=TaskCommentSerializer,
@@ -257,12 +288,18 @@ class TaskCommentsView(APIView):
     )
     def post(self, request, task_id):
         """Create a new comment on the task"""
-        task = self.get_task_with_access_check(task_id, request.user)
+        task = self.get_task_with_access_check(task_id, request)
         
         serializer = TaskCommentSerializer(data=request.data, context={'request': request})
         
         if serializer.is_valid():
             comment = serializer.save(task=task)
+            record_activity(
+                board=task.list.board_id,
+                action='comment',
+                user=request.user,
+                description=_("%(user)s commented on task '%(title)s'") % {'user': request.user, 'title': task.title}
+            )
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -300,23 +337,21 @@ class TaskMoveView(APIView):
     def post(self, request, pk):
         """Move task to new list/position"""
         try:
-            task = Task.objects.get(pk=pk)
+            task = Task.objects.select_related('list__board').get(pk=pk)
         except Task.DoesNotExist:
             return Response(
                 {"error": _("Task not found.")},
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        user = request.user
         board = task.list.board
         
         # Check access permission
-        if board.owner != user:
-            if not board.active_members.filter(user=user).exists():
-                return Response(
-                    {"error": _("You don't have access to this task.")},
-                    status=status.HTTP_403_FORBIDDEN
-                )
+        if not board_access(request).can_view(board):
+            return Response(
+                {"error": _("You don't have access to this task.")},
+                status=status.HTTP_403_FORBIDDEN
+            )
         
         serializer = TaskMoveSerializer(data=request.data, context={'request': request})
         
@@ -336,7 +371,16 @@ class TaskMoveView(APIView):
                 elif new_position:
                     # Moving within same list
                     task.move_to_position(new_position)
-                
+
+                record_activity(
+                    board=board,
+                    action='move',
+                    user=request.user,
+                    description=_("Task '%(title)s' moved to '%(list)s' by %(user)s") % {
+                        'title': task.title, 'list': task.list.title, 'user': request.user
+                    }
+                )
+                task = Task.objects.with_related_data().get(pk=task.pk)
                 response_serializer = TaskDetailSerializer(task)
                 return Response(response_serializer.data, status=status.HTTP_200_OK)
                 
@@ -381,23 +425,21 @@ class TaskToggleCompleteView(APIView):
     def post(self, request, pk):
         """Toggle task completion status"""
         try:
-            task = Task.objects.get(pk=pk)
+            task = Task.objects.select_related('list__board').get(pk=pk)
         except Task.DoesNotExist:
             return Response(
                 {"error": _("Task not found.")},
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        user = request.user
         board = task.list.board
         
         # Check access permission
-        if board.owner != user:
-            if not board.active_members.filter(user=user).exists():
-                return Response(
-                    {"error": _("You don't have access to this task.")},
-                    status=status.HTTP_403_FORBIDDEN
-                )
+        if not board_access(request).can_view(board):
+            return Response(
+                {"error": _("You don't have access to this task.")},
+                status=status.HTTP_403_FORBIDDEN
+            )
         
         if task.is_completed:
             task.mark_incomplete()
@@ -405,7 +447,18 @@ class TaskToggleCompleteView(APIView):
         else:
             task.mark_completed()
             message = _("Task marked as completed")
+        record_activity(
+            board=board,
+            action='update',
+            user=request.user,
+            description=_("Task '%(title)s' marked as %(state)s by %(user)s") % {
+                'title': task.title,
+                'state': _("completed") if task.is_completed else _("incomplete"),
+                'user': request.user,
+            }
+        )
         
+        task = Task.objects.with_related_data().get(pk=task.pk)
         response_serializer = TaskDetailSerializer(task)
         return Response({
             "message": message,
@@ -413,6 +466,325 @@ class TaskToggleCompleteView(APIView):
         }, status=status.HTTP_200_OK)
 
 
+class TaskBatchView(APIView):
+    """
+    View for applying many task operations in a single request.
+
+    Behaviour:
+    - POST: Apply a list of `move`, `complete`, `assign` and `delete` operations.
+    - Board access is checked once per board instead of once per task.
+    - Same rules as the single-task endpoints: members can move, complete and
+      assign (to board members only); only the task creator, board owner or
+      admin can delete.
+    - Valid operations are applied together in one transaction with bulk
+      UPDATEs; invalid ones are skipped and reported in the results.
+    - Operations take effect in request order. Only moves and deletes depend
+      on each other (through positions), so the moves are replayed with the
+      deletes between them; affected lists are renumbered once.
+
+    Endpoint: POST /api/v1/tasks/batch/
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        request_body=TaskBatchSerializer,
+        responses={
+            200: openapi.Response(
+                description="Per-operation results",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'results': openapi.Schema(
+                            type=openapi.TYPE_ARRAY,
+                            items=openapi.Schema(type=openapi.TYPE_OBJECT)
+                        )
+                    }
+                )
+            ),
+            400: _("Bad Request")
+        }
+    )
+    def post(self, request):
+        """Validate and apply a batch of task operations"""
+        serializer = TaskBatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        operations = serializer.validated_data['operations']
+        user = request.user
+
+        tasks = Task.objects.select_related('list__board').in_bulk(
+            {operation['task'] for operation in operations}
+        )
+        target_lists = List.objects.select_related('board').in_bulk(
+            {operation['new_list'] for operation in operations if operation.get('new_list')}
+        )
+        boards = {task.list.board for task in tasks.values()}
+        boards |= {list_obj.board for list_obj in target_lists.values()}
+        roles = board_access(request).roles
+        assignable = self.get_assignable_users(operations, boards)
+
+        results = []
+        accepted = []
+        deleted = set()
+        for index, operation in enumerate(operations):
+            error = self.check_operation(operation, user, tasks, target_lists, roles, assignable, deleted)
+            result = {'index': index, 'op': operation['op'], 'task': operation['task']}
+            if error:
+                result.update({'status': 'error', 'error': error})
+            else:
+                result['status'] = 'ok'
+                accepted.append(operation)
+                if operation['op'] == 'delete':
+                    deleted.add(operation['task'])
+            results.append(result)
+
+        with transaction.atomic():
+            self.apply_operations(accepted, tasks)
+            # Bulk queries bypass the model signals that bump board versions,
+            # stamp rows for delta sync and publish change events (deletes
+            # are recorded by `delete_tasks`)
+            board_ids = {tasks[operation['task']].list.board_id for operation in accepted}
+            if board_ids:
+                Board.objects.filter(pk__in=board_ids).bump_version()
+            updated = {operation['task'] for operation in accepted if operation['task'] not in deleted}
+            if updated:
+                stamp_changes(Task.objects.filter(pk__in=updated))
+            # ... and the task counters of the lists they changed tasks in
+            counted_lists = {tasks[operation['task']].list_id for operation in accepted
+                             if operation['op'] in ('complete', 'move', 'delete')}
+            counted_lists |= {operation['new_list'] for operation in accepted if operation.get('new_list')}
+            if counted_lists:
+                recount(List, List.objects.filter(pk__in=counted_lists))
+            for task_id in updated:
+                publish_event(tasks[task_id].list.board_id, 'task', 'updated', tasks[task_id])
+
+            counts = Counter(tasks[operation['task']].list.board_id for operation in accepted)
+            for board_id, count in counts.items():
+                record_activity(
+                    board=board_id,
+                    action='update',
+                    user=request.user,
+                    description=_("%(count)s tasks changed in one batch by %(user)s") % {
+                        'count': count, 'user': request.user
+                    }
+                )
+
+        return Response({'results': results}, status=status.HTTP_200_OK)
+
+    def get_assignable_users(self, operations, boards):
+        """Set of (board_id, user_id) pairs that tasks may be assigned to"""
+        user_ids = {
+            user_id
+            for operation in operations if operation['op'] == 'assign'
+            for user_id in operation['assigned_to']
+        }
+        if not user_ids:
+            return set()
+        assignable = {(board.id, board.owner_id) for board in boards}
+        assignable.update(BoardMembership.objects.filter(
+            board__in=boards, user_id__in=user_ids, status='accepted'
+        ).values_list('board_id', 'user_id'))
+        return assignable
+
+    def check_operation(self, operation, user, tasks, target_lists, roles, assignable, deleted):
+        """Return an error message for an operation that cannot be applied, or None"""
+        task = tasks.get(operation['task'])
+        if task is None or task.id in deleted:
+            return _("Task not found.")
+
+        board_id = task.list.board_id
+        if board_id not in roles:
+            return _("You don't have access to this task.")
+
+        if operation['op'] == 'move' and operation.get('new_list'):
+            new_list = target_lists.get(operation['new_list'])
+            if new_list is None:
+                return _("List not found.")
+            if new_list.board_id != board_id:
+                return _("Cannot move task to a list in a different board.")
+
+        if operation['op'] == 'assign':
+            if any((board_id, user_id) not in assignable for user_id in operation['assigned_to']):
+                return _("All assigned users must be members of this board.")
+
+        if operation['op'] == 'delete':
+            if task.created_by_id != user.id and roles[board_id] not in MANAGER_ROLES:
+                return _("Only the task creator, board owner, or admin can delete this task.")
+
+        return None
+
+    def apply_operations(self, operations, tasks):
+        """Apply already validated operations with bulk queries"""
+        now = timezone.now()
+        completed = {}
+        assignees = {}
+        moves = []
+        deletes = set()
+        for operation in operations:
+            if operation['op'] == 'complete':
+                completed[operation['task']] = operation['is_completed']
+            elif operation['op'] == 'assign':
+                assignees[operation['task']] = set(operation['assigned_to'])
+            elif operation['op'] == 'move':
+                moves.append(operation)
+            else:
+                deletes.add(operation['task'])
+
+        done = [task_id for task_id, value in completed.items() if value]
+        undone = [task_id for task_id, value in completed.items() if not value]
+        if done:
+            Task.objects.filter(pk__in=done, is_completed=False).update(
+                is_completed=True, completed_at=now, updated_at=now
+            )
+        if undone:
+            Task.objects.filter(pk__in=undone, is_completed=True).update(
+                is_completed=False, completed_at=None, updated_at=now
+            )
+        # The bulk updates bypass the signals that feed the daily board stats
+        transitions = Counter(
+            (tasks[task_id].list.board_id, 'completed' if value else 'reopened')
+            for task_id, value in completed.items() if tasks[task_id].is_completed != value
+        )
+        for (board_id, field), count in transitions.items():
+            record_task_stats(board_id, **{field: count})
+
+        if assignees:
+            Assignment = Task.assigned_to.through
+            Assignment.objects.filter(task_id__in=assignees).delete()
+            Assignment.objects.bulk_create([
+                Assignment(task_id=task_id, customuser_id=user_id)
+                for task_id, user_ids in assignees.items()
+                for user_id in user_ids
+            ])
+            Task.objects.filter(pk__in=assignees).update(updated_at=now)
+
+        if moves:
+            # Deletes are replayed with the moves, which they shift
+            self.apply_moves([operation for operation in operations if operation['op'] in ('move', 'delete')],
+                             tasks, now)
+
+        if deletes:
+            self.delete_tasks(deletes)
+
+    def delete_tasks(self, task_ids):
+        """
+        Delete tasks in one go, recording their tombstones, daily stats and
+        change events per batch instead of through the per-row delete signals.
+        The list counters are recounted by the caller.
+        """
+        queryset = Task.objects.filter(pk__in=task_ids)
+        # Read after the other operations of the batch, which may have moved or completed them
+        deleted = list(queryset.values_list('id', 'list_id', 'list__board_id', 'is_completed'))
+        delete_in_bulk(queryset)
+        record_deletions('task', [(task_id, board_id) for task_id, _list_id, board_id, _done in deleted])
+        open_tasks = Counter(board_id for _task_id, _list_id, board_id, is_completed in deleted if not is_completed)
+        for board_id, count in open_tasks.items():
+            record_task_stats(board_id, deleted=count)
+        for task_id, list_id, board_id, _is_completed in deleted:
+            publish_event(board_id, 'task', 'deleted', Task(pk=task_id), list=list_id)
+
+    def apply_moves(self, operations, tasks, now):
+        """
+        Replay the moves, and the deletes between them, in request order on
+        the in-memory order of every affected list, then write the new list,
+        position (rank in rank mode) in one bulk UPDATE. The deleted rows are
+        left to `delete_tasks`.
+        """
+        moves = [operation for operation in operations if operation['op'] == 'move']
+        list_ids = {tasks[move['task']].list_id for move in moves}
+        list_ids |= {move['new_list'] for move in moves if move.get('new_list')}
+        rows = Task.objects.filter(list_id__in=list_ids).in_display_order().only(
+            'id', 'list_id', 'position', 'rank', 'updated_at'
+        )
+        rows_by_id = {row.id: row for row in rows}
+        orders = {list_id: [] for list_id in list_ids}
+        for row in rows_by_id.values():
+            orders[row.list_id].append(row.id)
+
+        moved = set()
+        deleted = set()
+        for operation in operations:
+            row = rows_by_id.get(operation['task'])
+            if row is None:
+                # A delete in a list no move touches
+                continue
+            if operation['op'] == 'delete':
+                # Its slot stays (a gap, as with single deletes) until a move renumbers the list
+                deleted.add(row.id)
+                continue
+            source = orders[row.list_id]
+            source.remove(row.id)
+            row.list_id = operation.get('new_list') or row.list_id
+            siblings = orders[row.list_id]
+            for order in (source, siblings):
+                order[:] = [task_id for task_id in order if task_id not in deleted]
+            position = operation.get('new_position')
+            if position is None:
+                siblings.append(row.id)
+            else:
+                siblings.insert(position - 1, row.id)
+            moved.add(row.id)
+
+        if ranking.rank_ordering_enabled():
+            fields = ['list', 'rank', 'updated_at']
+            changed = self.rank_moved_rows(orders, rows_by_id, moved)
+        else:
+            fields = ['list', 'position', 'updated_at']
+            changed = []
+            for order in orders.values():
+                for index, task_id in enumerate(order, start=1):
+                    row = rows_by_id[task_id]
+                    if task_id in moved or row.position != index:
+                        row.position = index
+                        changed.append(row)
+        changed = [row for row in changed if row.id not in deleted]
+        for row in changed:
+            if row.id in moved:
+                row.updated_at = now
+        Task.objects.bulk_update(changed, fields, batch_size=500)
+
+    def rank_moved_rows(self, orders, rows_by_id, moved):
+        """
+        Rank mode: give each run of moved rows evenly spaced ranks between its
+        neighbours, without touching the other rows (see core.ranking). A list
+        with no integer left for a run is re-spaced; one whose gaps get narrow
+        is rebalanced in the background, as single moves do.
+        """
+        from .tasks import rebalance_task_ranks
+
+        changed = []
+        narrow = set()
+        for list_id, order in orders.items():
+            ranked = []
+            start = 0
+            while start < len(order):
+                if order[start] not in moved:
+                    start += 1
+                    continue
+                end = start
+                while end < len(order) and order[end] in moved:
+                    end += 1
+                before = rows_by_id[order[start - 1]].rank if start else None
+                after = rows_by_id[order[end]].rank if end < len(order) else None
+                ranks = ranking.ranks_between(before, after, end - start)
+                if ranks is None:
+                    for index, task_id in enumerate(order, start=1):
+                        rows_by_id[task_id].rank = index * ranking.RANK_GAP
+                    ranked = order
+                    break
+                if ranking.needs_rebalance(before, ranks[0], ranks[1] if len(ranks) > 1 else after):
+                    narrow.add(list_id)
+                for task_id, rank in zip(order[start:end], ranks):
+                    rows_by_id[task_id].rank = rank
+                ranked += order[start:end]
+                start = end
+            changed += [rows_by_id[task_id] for task_id in ranked]
+        for list_id in narrow:
+            transaction.on_commit(lambda list_id=list_id: rebalance_task_ranks.delay(list_id))
+        return changed
+
+
 class TaskCommentDetailView(APIView):
     """
     View for retrieving, updating or deleting a specific comment.
@@ -422,36 +794,34 @@ class TaskCommentDetailView(APIView):
     - PATCH: Update comment content (author only).
     - DELETE: Delete the comment (author or board owner/admin only).
     
-    Endpoint: GET/PATCH/DELETE /api/v1/comments/{pk}/
+    Endpoint: GET/PATCH/DELETE /api/v1/tasks/{task_id}/comments/{pk}/
     """
     permission_classes = [permissions.IsAuthenticated]
     
-    def get_comment_with_access_check(self, pk, user):
+    def get_comment_with_access_check(self, task_id, pk, request):
         """Get comment and verify user has access to it"""
         try:
-            comment = TaskComment.objects.get(pk=pk)
-            board = comment.task.list.board
+            comment = TaskComment.objects.select_related('task__list').get(pk=pk, task_id=task_id)
             
             # Check if user is board owner or member
-            if board.owner != user:
-                if not board.active_members.filter(user=user).exists():
-                    raise PermissionDenied(_("You don't have access to this comment."))
+            if not board_access(request).can_view(comment.task.list.board_id):
+                raise PermissionDenied(_("You don't have access to this comment."))
             
             return comment
         except TaskComment.DoesNotExist:
             raise NotFound(_("Comment not found."))
     
     @swagger_auto_schema(responses={200: TaskCommentSerializer})
-    def get(self, request, pk):
+    def get(self, request, task_id, pk):
         """Return comment details"""
-        comment = self.get_comment_with_access_check(pk, request.user)
+        comment = self.get_comment_with_access_check(task_id, pk, request)
         serializer = TaskCommentSerializer(comment)
         return Response(serializer.data, status=status.HTTP_200_OK)
     
     @swagger_auto_schema(request_body=TaskCommentUpdateSerializer, responses={200: TaskCommentSerializer, 400: _("Bad Request"), 403: _("Forbidden")})
-    def patch(self, request, pk):
+    def patch(self, request, task_id, pk):
         """Update comment content (author only)"""
-        comment = self.get_comment_with_access_check(pk, request.user)
+        comment = self.get_comment_with_access_check(task_id, pk, request)
         
         if comment.user != request.user:
             return Response(
@@ -463,32 +833,29 @@ class TaskCommentDetailView(APIView):
         
         if serializer.is_valid():
             comment = serializer.save()
+            record_activity(
+                board=comment.task.list.board_id,
+                action='update',
+                user=request.user,
+                description=_("%(user)s edited a comment on task '%(title)s'") % {
+                    'user': request.user, 'title': comment.task.title
+                }
+            )
             response_serializer = TaskCommentSerializer(comment)
             return Response(response_serializer.data, status=status.HTTP_200_OK)
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     @swagger_auto_schema(responses={204: _("No Content"), 403: _("Forbidden")})
-    def delete(self, request, pk):
+    def delete(self, request, task_id, pk):
         """Delete comment (author or board owner/admin only)"""
-        comment = self.get_comment_with_access_check(pk, request.user)
-        user = request.user
-        board = comment.task.list.board
+        comment = self.get_comment_with_access_check(task_id, pk, request)
         
         # Check delete permission (author, board owner, or admin)
-        can_delete = False
-        if comment.user == user or board.owner == user:
-            can_delete = True
-        else:
-            # Check if user is admin
-            try:
-                membership = BoardMembership.objects.get(
-                    board=board, user=user, status='accepted'
-                )
-                if membership.role == 'admin':
-                    can_delete = True
-            except BoardMembership.DoesNotExist:
-                pass
+        can_delete = (
+            comment.user_id == request.user.id
+            or board_access(request).can_manage(comment.task.list.board_id)
+        )
         
         if not can_delete:
             return Response(
@@ -496,6 +863,14 @@ class TaskCommentDetailView(APIView):
                 status=status.HTTP_403_FORBIDDEN
             )
         
+        record_activity(
+            board=comment.task.list.board_id,
+            action='delete',
+            user=request.user,
+            description=_("%(user)s deleted a comment on task '%(title)s'") % {
+                'user': request.user, 'title': comment.task.title
+            }
+        )
         comment.delete()
         return Response(
             {"message": _("Comment deleted successfully")},